@@ -0,0 +1,139 @@
+"""
+Admission control - ağır (tarama/analiz) ve hafif endpoint'ler için ayrı
+eşzamanlılık havuzları. Ağır havuz doluysa istekler sınırlı bir kuyrukta
+belirli bir süre bekler; kuyruk da doluysa hemen 503 döndürülür.
+"""
+import asyncio
+import math
+from typing import Dict, Any, Optional
+
+from .config import settings
+
+
+# Tarama ve analiz yapan, dış API çağıran endpoint'ler
+HEAVY_PATH_PREFIXES = (
+    "/initial-scan",
+    "/detailed-scan",
+    "/platform-search",
+    "/self-scan",
+    "/analyze-image",
+    "/api/profile-analysis/",
+    "/api/osint/",
+    "/api/google/",
+)
+
+# Ağır prefix altında olsa da ucuz olan endpoint'ler
+LIGHT_PATH_EXCEPTIONS = (
+    "/api/profile-analysis/health",
+    "/api/profile-analysis/ethical-guidelines",
+    "/api/profile-analysis/supported-platforms",
+    "/api/osint/stage1/health",
+    "/api/osint/stage2/health",
+    "/api/google/apis/status",
+)
+
+
+class AdmissionPool:
+    """Sınırlı bekleme kuyruğu olan eşzamanlılık havuzu"""
+
+    def __init__(self, name: str, max_concurrency: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.waiting = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.timed_out_total = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphore event loop içinde oluşturulmalı
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def acquire(self) -> bool:
+        """Slot al; kuyruk dolu veya süre aşıldıysa False döner"""
+        semaphore = self._get_semaphore()
+
+        if not semaphore.locked():
+            await semaphore.acquire()
+            self.active += 1
+            self.admitted_total += 1
+            return True
+
+        if self.waiting >= self.queue_size:
+            self.rejected_total += 1
+            return False
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out_total += 1
+            return False
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        self.admitted_total += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._get_semaphore().release()
+
+    @property
+    def retry_after(self) -> int:
+        """Retry-After başlığı için saniye cinsinden tahmini bekleme"""
+        return max(1, math.ceil(self.queue_timeout))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "waiting": self.waiting,
+            "queue_size": self.queue_size,
+            "utilization": round(self.active / self.max_concurrency, 3),
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "timed_out_total": self.timed_out_total,
+        }
+
+
+class AdmissionController:
+    """İstek yolunu ağır/hafif havuza yönlendirir"""
+
+    def __init__(self):
+        self.pools = {
+            "heavy": AdmissionPool(
+                "heavy",
+                settings.heavy_max_concurrency,
+                settings.heavy_queue_size,
+                settings.heavy_queue_timeout_s,
+            ),
+            "light": AdmissionPool(
+                "light",
+                settings.light_max_concurrency,
+                settings.light_queue_size,
+                settings.light_queue_timeout_s,
+            ),
+        }
+
+    def classify(self, path: str) -> str:
+        if path.startswith(LIGHT_PATH_EXCEPTIONS):
+            return "light"
+        if path.startswith(HEAVY_PATH_PREFIXES):
+            return "heavy"
+        return "light"
+
+    def pool_for(self, path: str) -> AdmissionPool:
+        return self.pools[self.classify(path)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+
+admission_controller = AdmissionController()
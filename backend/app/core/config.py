@@ -16,6 +16,66 @@ class Settings(BaseModel):
     access_token_exp_minutes: int = int(os.getenv("ACCESS_TOKEN_EXP_MIN", "60"))
     email_verify_exp_hours: int = int(os.getenv("EMAIL_VERIFY_EXP_H", "24"))
     sqlite_url: str = os.getenv("SQLITE_URL", "sqlite:///./data.db")
+    # SQLite baglanti ayarlari (her baglantida PRAGMA olarak uygulanir)
+    sqlite_journal_mode: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    # cache_size baglanti basinadir (havuzlar toplam ~150 baglanti acabilir); okumalar
+    # paylasilan mmap/OS sayfa onbellegine dayanir, bu yuzden baglanti onbellegi kucuk
+    sqlite_cache_size_kb: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(4 * 1024)))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    # Baglanti havuzu: 0 ise HANDLER_WORKERS + ANYIO_THREAD_LIMIT; okuma havuzu ayridir
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "0"))
+    db_read_pool_size: int = int(os.getenv("DB_READ_POOL_SIZE", "0"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "8"))
+    db_pool_timeout_s: float = float(os.getenv("DB_POOL_TIMEOUT_S", "10"))
+    # Async engine (audit, auth): bos ise SQLITE_URL'den turetilir (sqlite+aiosqlite, postgresql+asyncpg, mysql+aiomysql)
+    async_database_url: str | None = os.getenv("ASYNC_DATABASE_URL") or None
+    db_async_pool_size: int = int(os.getenv("DB_ASYNC_POOL_SIZE", "16"))
+    # Audit loglari gunluk ("day") veya haftalik ("week") tablolara bolunur
+    audit_partition_period: str = os.getenv("AUDIT_PARTITION_PERIOD", "day")
+    # FTS5 tokenizer'i (audit arama); diacritics kaldirilir: "sahin" -> "Şahin" ile eslesir
+    audit_fts_tokenizer: str = os.getenv("AUDIT_FTS_TOKENIZER", "unicode61 remove_diacritics 2")
+    # Saklama isleri: id araliklariyla parca parca silme, partiler arasi bekleme
+    retention_batch_size: int = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+    retention_batch_pause_ms: int = int(os.getenv("RETENTION_BATCH_PAUSE_MS", "50"))
+    # Parti yazma kilidini bundan uzun tutarsa parti boyutu yarilanir
+    retention_max_lock_ms: int = int(os.getenv("RETENTION_MAX_LOCK_MS", "50"))
+    # Ilk calisma acilistan bu kadar sonra (acilista temizlik yapilmaz)
+    retention_initial_delay_s: int = int(os.getenv("RETENTION_INITIAL_DELAY_S", "600"))
+    # Rota/dakika ozetleri: audit kayitlari bu aralikla artimli islenir
+    rollup_interval_s: int = int(os.getenv("ROLLUP_INTERVAL_S", "60"))
+    rollup_batch_size: int = int(os.getenv("ROLLUP_BATCH_SIZE", "5000"))
+    rollup_retention_days: int = int(os.getenv("ROLLUP_RETENTION_DAYS", "90"))
+    # /audit uclari (kayitlar, ozetler, arama) X-Admin-Token basligiyla bu degeri ister; bos ise uclar kapali
+    audit_admin_token: str = os.getenv("AUDIT_ADMIN_TOKEN", "")
+    # Tarama gecmisi: sonuc JSON'u zlib ile sikistirilip sifrelenir
+    scan_history_compress_level: int = int(os.getenv("SCAN_HISTORY_COMPRESS_LEVEL", "6"))
+    scan_history_retention_days: int = int(os.getenv("SCAN_HISTORY_RETENTION_DAYS", "30"))
+    # Artimli tarama tazelik politikalari (sn): bu sureden yeni kaynak sonuclari yeniden sorgulanmaz
+    scan_fresh_social_s: int = int(os.getenv("SCAN_FRESH_SOCIAL_S", "86400"))
+    scan_fresh_web_s: int = int(os.getenv("SCAN_FRESH_WEB_S", "86400"))
+    scan_fresh_images_s: int = int(os.getenv("SCAN_FRESH_IMAGES_S", "604800"))
+    # WebArchive: sure dolunca yalnizca son snapshot'tan sonrakiler (CDX from=) cekilir
+    scan_fresh_archive_s: int = int(os.getenv("SCAN_FRESH_ARCHIVE_S", "86400"))
+    # HIBP: katalog degismedikce sorgulanmaz, ama en gec bu surede bir
+    scan_fresh_hibp_max_s: int = int(os.getenv("SCAN_FRESH_HIBP_MAX_S", "2592000"))
+    hibp_catalog_ttl_s: int = int(os.getenv("HIBP_CATALOG_TTL_S", "3600"))
+    # Footprint izleme: onayli kimlikler kendi araliklariyla artimli yeniden taranir
+    monitoring_enabled: bool = os.getenv("MONITORING_ENABLED", "true").lower() in ("1", "true", "yes")
+    monitor_tick_s: int = int(os.getenv("MONITOR_TICK_S", "30"))
+    # Tur basina en fazla bu kadar kimlik (sirayla) taranir
+    monitor_max_per_tick: int = int(os.getenv("MONITOR_MAX_PER_TICK", "5"))
+    monitor_min_interval_h: int = int(os.getenv("MONITOR_MIN_INTERVAL_H", "6"))
+    monitor_default_interval_h: int = int(os.getenv("MONITOR_DEFAULT_INTERVAL_H", "24"))
+    # Sonraki calisma araligin +/- bu orani kadar kaydirilir (yigilmayi onler)
+    monitor_jitter_fraction: float = float(os.getenv("MONITOR_JITTER_FRACTION", "0.1"))
+    # Upstream basina dakikalik dis istek tavani (istek basina bir token)
+    monitor_rate_search_per_min: int = int(os.getenv("MONITOR_RATE_SEARCH_PER_MIN", "10"))
+    monitor_rate_webarchive_per_min: int = int(os.getenv("MONITOR_RATE_WEBARCHIVE_PER_MIN", "15"))
+    monitor_rate_hibp_per_min: int = int(os.getenv("MONITOR_RATE_HIBP_PER_MIN", "10"))
+    # Her dis istek bir token harcar; kova bossa en fazla bu kadar beklenir, sonra grup ertelenir
+    monitor_rate_max_wait_s: int = int(os.getenv("MONITOR_RATE_MAX_WAIT_S", "30"))
     cors_origins: list[str] = [o for o in os.getenv("CORS_ORIGINS", "*").split(",") if o]
     offline_mode: bool = os.getenv("OFFLINE_MODE", "false").lower() in ("1", "true", "yes")
     google_api_key: str | None = os.getenv("GOOGLE_API_KEY")
@@ -30,6 +90,65 @@ class Settings(BaseModel):
     google_youtube_api_key: str | None = os.getenv("GOOGLE_YOUTUBE_API_KEY")
     google_vision_api_key: str | None = os.getenv("GOOGLE_VISION_API_KEY")
 
+    # Admission control - agir (tarama/analiz) ve hafif endpoint havuzlari
+    heavy_max_concurrency: int = int(os.getenv("HEAVY_MAX_CONCURRENCY", "8"))
+    heavy_queue_size: int = int(os.getenv("HEAVY_QUEUE_SIZE", "16"))
+    heavy_queue_timeout_s: float = float(os.getenv("HEAVY_QUEUE_TIMEOUT_S", "5"))
+    light_max_concurrency: int = int(os.getenv("LIGHT_MAX_CONCURRENCY", "64"))
+    light_queue_size: int = int(os.getenv("LIGHT_QUEUE_SIZE", "128"))
+    light_queue_timeout_s: float = float(os.getenv("LIGHT_QUEUE_TIMEOUT_S", "2"))
+
+    # Bloklayan isler icin thread havuzlari ve event loop stall dedektoru
+    handler_workers: int = int(os.getenv("HANDLER_WORKERS", "16"))
+    io_workers: int = int(os.getenv("IO_WORKERS", "32"))
+    cpu_workers: int = int(os.getenv("CPU_WORKERS", str(os.cpu_count() or 2)))
+    crypto_workers: int = int(os.getenv("CRYPTO_WORKERS", "4"))
+    # Senkron (def) endpoint'ler icin AnyIO thread limiti (varsayilan 40)
+    anyio_thread_limit: int = int(os.getenv("ANYIO_THREAD_LIMIT", "40"))
+    loop_monitor_interval_ms: int = int(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+    loop_stall_threshold_ms: int = int(os.getenv("LOOP_STALL_THRESHOLD_MS", "250"))
+
+    # Sifreli konfigurasyon blob'larinin saklandigi dosya (bos ise sadece bellekte)
+    encrypted_config_path: str = os.getenv("ENCRYPTED_CONFIG_PATH", "./encrypted_config.json")
+    encryption_bulk_max_items: int = int(os.getenv("ENCRYPTION_BULK_MAX_ITEMS", "100"))
+
+    # Gorsel yukleme: maksimum boyut, bellekte tutulacak kisim ve EXIF icin okunan ilk baytlar
+    image_max_upload_bytes: int = int(os.getenv("IMAGE_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+    image_spool_memory_bytes: int = int(os.getenv("IMAGE_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+    image_spool_dir: str | None = os.getenv("IMAGE_SPOOL_DIR")
+    image_header_bytes: int = int(os.getenv("IMAGE_HEADER_BYTES", str(128 * 1024)))
+    image_max_pixels: int = int(os.getenv("IMAGE_MAX_PIXELS", str(50_000_000)))
+    # Gorsel analiz surec havuzu: surec sayisi, bekleyen is siniri, gorev zaman asimi, yenileme
+    image_engine_workers: int = int(os.getenv("IMAGE_ENGINE_WORKERS", str(os.cpu_count() or 2)))
+    image_engine_max_pending: int = int(os.getenv("IMAGE_ENGINE_MAX_PENDING", "32"))
+    image_engine_task_timeout_s: float = float(os.getenv("IMAGE_ENGINE_TASK_TIMEOUT_S", "30"))
+    image_engine_recycle_after: int = int(os.getenv("IMAGE_ENGINE_RECYCLE_AFTER", "500"))
+    # Yenilenen/zaman asimina ugrayan havuzun surecleri bu sureden sonra hala yasiyorsa sonlandirilir
+    image_engine_kill_grace_s: float = float(os.getenv("IMAGE_ENGINE_KILL_GRACE_S", "5"))
+    # Toplu analiz: istek/arsiv basina dosya sayisi ve arsiv boyutu siniri
+    image_batch_max_files: int = int(os.getenv("IMAGE_BATCH_MAX_FILES", "200"))
+    image_archive_max_bytes: int = int(os.getenv("IMAGE_ARCHIVE_MAX_BYTES", str(200 * 1024 * 1024)))
+    # Toplu istek govdesinin tamami (tum dosyalar + arsivler) icin sinir
+    image_batch_max_total_bytes: int = int(os.getenv("IMAGE_BATCH_MAX_TOTAL_BYTES", str(256 * 1024 * 1024)))
+    # Yuklenen gorsellerin pHash'leri benzerlik indeksine eklensin mi
+    image_index_uploads: bool = os.getenv("IMAGE_INDEX_UPLOADS", "true").lower() in ("1", "true", "yes")
+
+    # Uzak gorsel metadata: Range ile okunan ilk baytlar ve tam indirme siniri
+    remote_image_range_bytes: int = int(os.getenv("REMOTE_IMAGE_RANGE_BYTES", str(64 * 1024)))
+    remote_image_max_bytes: int = int(os.getenv("REMOTE_IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+    remote_image_timeout_s: float = float(os.getenv("REMOTE_IMAGE_TIMEOUT_S", "8"))
+    # Bu sureden eski uzak kayitlar ETag/Last-Modified ile yeniden dogrulanir
+    remote_image_cache_ttl_s: float = float(os.getenv("REMOTE_IMAGE_CACHE_TTL_S", "3600"))
+
+    # Profil fotografi korelasyonu: avatar boyut siniri ve pHash/dHash eslesme esigi (64 bit uzerinden)
+    avatar_max_bytes: int = int(os.getenv("AVATAR_MAX_BYTES", str(2 * 1024 * 1024)))
+    photo_match_max_distance: int = int(os.getenv("PHOTO_MATCH_MAX_DISTANCE", "6"))
+
+    # Icerik adresli gorsel onbellegi (hash, metadata, Vision): bellek LRU + disk (bos ise sadece bellekte)
+    image_cache_memory_items: int = int(os.getenv("IMAGE_CACHE_MEMORY_ITEMS", "4096"))
+    image_cache_dir: str = os.getenv("IMAGE_CACHE_DIR", "./image_cache")
+    image_cache_disk_max_bytes: int = int(os.getenv("IMAGE_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+
 
 settings = Settings()
 
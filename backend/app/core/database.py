@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from .config import settings
 
@@ -7,9 +11,118 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(settings.sqlite_url, connect_args={"check_same_thread": False} if settings.sqlite_url.startswith("sqlite") else {})
+def sqlite_pragmas() -> Dict[str, Any]:
+    """Her bağlantıda uygulanan SQLite ayarları (config'ten)"""
+    return {
+        # WAL: okuyucular yazıcıyı, yazıcı okuyucuları bloklamaz
+        "journal_mode": settings.sqlite_journal_mode,
+        # WAL ile NORMAL: commit'te fsync yok, checkpoint'te var; çökmede veri bozulmaz
+        "synchronous": settings.sqlite_synchronous,
+        # Negatif değer KiB cinsinden; bağlantı başına ayrılır, sıcak sayfalar
+        # bağlantılar arasında paylaşılan mmap'ten okunur
+        "cache_size": -settings.sqlite_cache_size_kb,
+        "mmap_size": settings.sqlite_mmap_size,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "temp_store": "MEMORY",
+    }
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any], read_only: bool = False) -> None:
+    """Bağlantı açılışında PRAGMA'ları çalıştıran event"""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(url: str, tuned: bool = True, read_only: bool = False, **pool_options: Any) -> Engine:
+    """
+    SQLite için check_same_thread kapalı, havuzu boyutlandırılmış ve (tuned ise)
+    PRAGMA'ları uygulanmış engine. read_only bağlantılar query_only ile açılır.
+    """
+    if not url.startswith("sqlite"):
+        return create_engine(url, **pool_options)
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **pool_options)
+    apply_sqlite_pragmas(engine, sqlite_pragmas() if tuned else {}, read_only=read_only)
+    return engine
+
+
+def _is_file_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and ":memory:" not in url and url.rstrip("/") not in ("sqlite:", "sqlite+pysqlite:")
+
+
+def _pool_options(size: int) -> Dict[str, Any]:
+    if not _is_file_sqlite(settings.sqlite_url):
+        # Bellek içi veritabanı: SQLAlchemy'nin varsayılan havuzu kullanılır
+        return {}
+    return {
+        "pool_size": size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_s,
+    }
+
+
+# Havuz: bloklayan DB işleri handlers havuzunda ve senkron endpoint'lerin
+# AnyIO thread'lerinde çalışır; her biri aynı anda bir bağlantı tutabilir.
+_default_pool_size = settings.handler_workers + settings.anyio_thread_limit
+
+engine = create_db_engine(settings.sqlite_url, **_pool_options(settings.db_pool_size or _default_pool_size))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sorgu endpoint'leri için ayrı havuz: okumalar yazma havuzunu tüketmez,
+# query_only sayesinde yanlışlıkla yazma denemesi hata verir
+read_engine = (
+    create_db_engine(
+        settings.sqlite_url,
+        read_only=True,
+        **_pool_options(settings.db_read_pool_size or _default_pool_size),
+    )
+    if _is_file_sqlite(settings.sqlite_url)
+    else engine
+)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+# Senkron URL sürücüsü -> async karşılığı
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_url(url: str) -> str:
+    """SQLITE_URL'den async sürücülü URL (örn. sqlite:/// -> sqlite+aiosqlite:///)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.drivername in ASYNC_DRIVERS.values() or backend not in ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str, **pool_options: Any) -> AsyncEngine:
+    """Async engine; SQLite'ta senkron engine ile aynı PRAGMA'lar uygulanır"""
+    if not url.startswith("sqlite"):
+        return create_async_engine(url, **pool_options)
+    engine = create_async_engine(url, **pool_options)
+    apply_sqlite_pragmas(engine.sync_engine, sqlite_pragmas())
+    return engine
+
+
+# Event loop üzerinden yapılan DB işleri (audit, auth) için: sorgu beklenirken loop bloklanmaz
+async_engine = create_async_db_engine(
+    settings.async_database_url or async_url(settings.sqlite_url),
+    **_pool_options(settings.db_async_pool_size),
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
 
 def get_db():
     db = SessionLocal()
@@ -19,10 +132,28 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """Salt okunur oturum (sorgu/listeleme endpoint'leri)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """Async endpoint'ler için AsyncSession"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db() -> None:
     # Modelleri import ederek metadata'ya kaydolmalarini sagla
     from ..models import user as _user  # noqa: F401
     from ..models import audit as _audit  # noqa: F401
+    from ..models import image_hash as _image_hash  # noqa: F401
+    from ..models import retention as _retention  # noqa: F401
+    from ..models import rollup as _rollup  # noqa: F401
+    from ..models import scan_history as _scan_history  # noqa: F401
+    from ..models import monitoring as _monitoring  # noqa: F401
     Base.metadata.create_all(bind=engine)
-
-
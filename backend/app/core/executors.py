@@ -0,0 +1,134 @@
+"""
+Merkezi executor kaydı - isimli, ayardan boyutlanan paylaşımlı thread havuzları.
+
+Havuzlar:
+- handlers: async endpoint'lerden gönderilen bloklayan servis çağrıları
+- io: servislerin içindeki paralel HTTP fan-out işleri (yaprak görevler)
+- cpu: görsel işleme gibi CPU ağırlıklı işler
+- crypto: KDF ve Fernet işlemleri
+
+handlers havuzundaki bir görev io havuzuna iş gönderip bekleyebilir; io
+görevleri başka havuzu beklemez, böylece havuzlar arası kilitlenme olmaz.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from .config import settings
+
+
+T = TypeVar("T")
+
+
+class InstrumentedThreadPoolExecutor(ThreadPoolExecutor):
+    """Kuyruk derinliği ve kullanım oranı raporlayan ThreadPoolExecutor"""
+
+    def __init__(self, name: str, max_workers: int):
+        super().__init__(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self.name = name
+        self.max_workers = max_workers
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future:
+        with self._stats_lock:
+            self.submitted += 1
+        return super().submit(self._track, fn, *args, **kwargs)
+
+    def _track(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._stats_lock:
+            self.started += 1
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            with self._stats_lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            active = self.started - self.completed
+            queued = self.submitted - self.started
+            return {
+                "max_workers": self.max_workers,
+                "active": active,
+                "queue_depth": queued,
+                "utilization": round(active / self.max_workers, 3),
+                "submitted_total": self.submitted,
+                "completed_total": self.completed,
+                "failed_total": self.failed,
+            }
+
+
+class ExecutorRegistry:
+    """Uygulama ömrü boyunca yaşayan isimli havuzlar"""
+
+    def __init__(self):
+        self._executors: Dict[str, InstrumentedThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def pool_sizes() -> Dict[str, int]:
+        return {
+            "handlers": settings.handler_workers,
+            "io": settings.io_workers,
+            "cpu": settings.cpu_workers,
+            "crypto": settings.crypto_workers,
+        }
+
+    def start(self) -> None:
+        """Tüm havuzları başlangıçta oluştur"""
+        for name in self.pool_sizes():
+            self.get(name)
+        print(f"[OK] Executor havuzlari hazir: {self.pool_sizes()}")
+
+    def get(self, name: str) -> InstrumentedThreadPoolExecutor:
+        executor = self._executors.get(name)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(name)
+                if executor is None:
+                    sizes = self.pool_sizes()
+                    if name not in sizes:
+                        raise KeyError(f"Bilinmeyen executor: {name}")
+                    executor = InstrumentedThreadPoolExecutor(name, max(1, sizes[name]))
+                    self._executors[name] = executor
+        return executor
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: executor.stats() for name, executor in list(self._executors.items())}
+
+
+executor_registry = ExecutorRegistry()
+
+
+def get_executor(name: str) -> InstrumentedThreadPoolExecutor:
+    """İsimli havuzu getir (başlatılmadıysa oluşturur)"""
+    return executor_registry.get(name)
+
+
+async def run_blocking(pool: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Senkron fonksiyonu isimli havuzda çalıştır ve sonucu bekle"""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(pool), call)
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Tüm havuzları kapat"""
+    executor_registry.shutdown(wait=wait)
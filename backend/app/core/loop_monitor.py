@@ -0,0 +1,57 @@
+"""
+Event loop stall dedektörü.
+Periyodik olarak uyuyup gecikmeyi ölçer; eşik aşılırsa loglar.
+"""
+import asyncio
+from typing import Any, Dict, Optional
+
+from .config import settings
+
+
+class LoopStallMonitor:
+    """Event loop'u bloklayan senkron kodu tespit eder"""
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25):
+        self.interval = interval
+        self.threshold = threshold
+        self.stall_count = 0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - started - self.interval
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if lag > self.threshold:
+                self.stall_count += 1
+                print(f"[!] Event loop {lag * 1000:.0f}ms bloklandi (esik {self.threshold * 1000:.0f}ms)")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": int(self.threshold * 1000),
+            "stall_count": self.stall_count,
+            "max_lag_ms": int(self.max_lag * 1000),
+        }
+
+
+loop_monitor = LoopStallMonitor(
+    interval=settings.loop_monitor_interval_ms / 1000,
+    threshold=settings.loop_stall_threshold_ms / 1000,
+)
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -11,17 +13,46 @@ from .routers import profile_analysis
 from .routers import osint
 from .routers import google_apis
 from .routers import encryption
+from .routers import audit
+from .routers import history
+from .routers import monitoring
 from .services.cleanup import start_scheduler
 from .core.config import settings
-from .core.database import init_db
-from .middleware import AuditAndRateLimitMiddleware
+from .core.database import init_db, engine, async_engine
+from .middleware import AuditAndRateLimitMiddleware, AdmissionControlMiddleware
+from .core.admission import admission_controller
+from .core.executors import executor_registry
+from .core.loop_monitor import loop_monitor
+from .services.image_engine import image_engine
+from .services.image_cache import image_cache
+from .services.retention import retention_stats
+from .services.audit_rollups import route_rollup_job
+from .services.monitoring import monitor_scheduler
+from .services.audit_partitions import upgrade_audit_schema
+from .services.image_index import upgrade_hash_schema
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    executor_registry.start()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.anyio_thread_limit
+    loop_monitor.start()
+    image_engine.start()
+    yield
+    await loop_monitor.stop()
+    image_engine.shutdown()
+    executor_registry.shutdown()
+    await async_engine.dispose()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Dijital Ayak Izi API", version="0.1.0")
+    app = FastAPI(title="Dijital Ayak Izi API", version="0.1.0", lifespan=lifespan)
 
     # Uygulama istek almadan once tablolar olussun
     init_db()
+    with engine.begin() as conn:
+        upgrade_audit_schema(conn)
+        upgrade_hash_schema(conn)
 
     app.add_middleware(
         CORSMiddleware,
@@ -31,12 +62,41 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Admission control audit middleware'inin icinde calisir; 503'ler de loglanir
+    app.add_middleware(AdmissionControlMiddleware)
     app.add_middleware(AuditAndRateLimitMiddleware, rate_limit_per_minute=60)
 
     @app.get("/health")
     def health_check():
         return {"status": "ok"}
 
+    @app.get("/health/admission")
+    def admission_stats():
+        return admission_controller.stats()
+
+    @app.get("/health/loop")
+    def loop_stats():
+        return loop_monitor.stats()
+
+    @app.get("/health/executors")
+    def executor_stats():
+        stats = executor_registry.stats()
+        stats["image_engine"] = image_engine.stats()
+        stats["image_cache"] = image_cache.stats()
+        return stats
+
+    @app.get("/health/retention")
+    def retention_health():
+        return retention_stats()
+
+    @app.get("/health/rollups")
+    def rollup_health():
+        return route_rollup_job.stats()
+
+    @app.get("/health/monitoring")
+    def monitoring_health():
+        return monitor_scheduler.stats()
+
     app.include_router(auth.router, prefix="/auth", tags=["auth"])
     app.include_router(selfscan.router, tags=["selfscan"])
     app.include_router(image.router, tags=["image"])
@@ -44,6 +104,10 @@ def create_app() -> FastAPI:
     app.include_router(osint.router, prefix="/api/osint", tags=["osint"])
     app.include_router(google_apis.router, tags=["google-apis"])
     app.include_router(encryption.router, tags=["encryption"])
+    if settings.audit_admin_token:
+        app.include_router(audit.router, tags=["audit"])
+    app.include_router(history.router, tags=["history"])
+    app.include_router(monitoring.router, tags=["monitoring"])
     
     # Static files (React build)
     static_dir = os.path.join(os.path.dirname(__file__), "static")
@@ -3,8 +3,20 @@ from collections import defaultdict
 from typing import Callable
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
-from .core.database import SessionLocal
-from .services.audit import write_audit_log
+from starlette.types import ASGIApp, Receive, Scope, Send
+from .core.admission import AdmissionController, admission_controller
+from .core.database import AsyncSessionLocal
+from .services.audit import write_audit_log_async
+
+
+# Hiçbir rotayla eşleşmeyen istekler (404) tek rollup anahtarında toplanır
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(request: Request) -> str:
+    """Eşleşen rotanın şablonu ile "METHOD /path/{param}"; ham yol sınırsız sayıda anahtar üretir"""
+    path = getattr(request.scope.get("route"), "path", None)
+    return f"{request.method} {path or UNMATCHED_ROUTE}"
 
 
 class AuditAndRateLimitMiddleware(BaseHTTPMiddleware):
@@ -30,17 +42,17 @@ class AuditAndRateLimitMiddleware(BaseHTTPMiddleware):
         duration_ms = int((time.time() - start) * 1000)
 
         try:
-            db = SessionLocal()
-            try:
-                write_audit_log(
+            async with AsyncSessionLocal() as db:
+                await write_audit_log_async(
                     db=db,
                     action=f"{request.method} {request.url.path}",
                     ip=client_ip,
-                    detail=f"status={response.status_code} durationMs={duration_ms}",
+                    detail="",
                     user_id=None,
+                    status=response.status_code,
+                    duration_ms=duration_ms,
+                    route=route_template(request),
                 )
-            finally:
-                db.close()
         except Exception:
             # Audit yazimi kritik degil, tablo hazir degilse veya hata varsa yut
             pass
@@ -48,3 +60,33 @@ class AuditAndRateLimitMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class AdmissionControlMiddleware:
+    """Ağır/hafif havuz bazlı admission control ve load shedding.
+
+    Saf ASGI middleware olarak yazıldı; slot, streaming yanıtlar dahil
+    yanıt gövdesi tamamen gönderilene kadar tutulur.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        pool = self.controller.pool_for(scope.get("path", ""))
+        if not await pool.acquire():
+            response = Response(
+                "Service Unavailable - sunucu yogun, lutfen daha sonra tekrar deneyin",
+                status_code=503,
+                headers={"Retry-After": str(pool.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release()
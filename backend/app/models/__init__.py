@@ -1,2 +1,2 @@
-__all__ = ["user", "audit"]
+__all__ = ["user", "audit", "image_hash", "retention", "rollup", "scan_history", "monitoring"]
 
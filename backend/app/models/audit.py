@@ -1,4 +1,4 @@
-from sqlalchemy import String, DateTime, Integer
+from sqlalchemy import String, DateTime, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 
@@ -6,13 +6,26 @@ from ..core.database import Base
 
 
 class AuditLog(Base):
+    """
+    Bölümleme öncesi audit kayıtları. Yeni kayıtlar günlük/haftalık bölüm
+    tablolarına yazılır (services/audit_partitions.py).
+    """
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_created_at_action", "created_at", "action"),
+        Index("ix_audit_logs_ip_created_at", "ip", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int | None] = mapped_column(Integer, index=True, nullable=True)
     action: Mapped[str] = mapped_column(String(128))
     ip: Mapped[str] = mapped_column(String(64))
     detail: Mapped[str] = mapped_column(String(1024))
+    # HTTP istek kayıtlarının yapılandırılmış alanları (diğer olaylarda boş)
+    status: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    duration_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Eşleşen rota şablonu, orn. "GET /history/{scan_id}" (rollup anahtarı)
+    route: Mapped[str | None] = mapped_column(String(128), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 
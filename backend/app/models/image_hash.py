@@ -0,0 +1,29 @@
+from sqlalchemy import BigInteger, Integer, String, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+
+from ..core.database import Base
+
+
+class ImageHashEntry(Base):
+    """
+    Benzerlik indeksine eklenen 64-bit algısal hash'ler.
+    Kalıcı kayıt burada; Hamming aramaları bu tablodan kurulan bellek içi
+    multi-index yapısıyla yapılır (services/image_index.py).
+    """
+    __tablename__ = "image_hashes"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    # SQLite INTEGER işaretli 64-bit; hash işaretli olarak saklanır
+    phash: Mapped[int] = mapped_column(BigInteger)
+    # Hash'i üreten decode yolunun sürümü (image_analyze.HASH_VERSION); sürümü
+    # kolondan önce eklenmiş satırlar 1 (tam çözünürlük decode) sayılır
+    hash_version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+    sha256: Mapped[str] = mapped_column(String(64), default="")
+    source: Mapped[str] = mapped_column(String(32))
+    ref: Mapped[str] = mapped_column(String(1024))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_image_hashes_source_ref_version_phash", "source", "ref", "hash_version", "phash", unique=True),
+    )
@@ -0,0 +1,52 @@
+from sqlalchemy import String, Boolean, DateTime, Index, Integer, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+
+from ..core.database import Base
+
+
+class MonitoredIdentity(Base):
+    """
+    Periyodik yeniden taramaya onay vermiş kimlikler. Tarama girdileri
+    (isim, e-posta, linkler) şifreli tutulur; zamanlayıcı next_run_at
+    indeksinden vadesi gelenleri seçer (services/monitoring.py).
+    """
+    __tablename__ = "monitored_identities"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    identity_hash: Mapped[str] = mapped_column(String(64), unique=True)
+    subject_encrypted: Mapped[str] = mapped_column(Text)
+    subject_salt: Mapped[str] = mapped_column(String(32))
+    interval_s: Mapped[int] = mapped_column(Integer)
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True)
+    next_run_at: Mapped[datetime] = mapped_column(DateTime)
+    last_run_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_scan_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    consecutive_failures: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_monitored_identities_enabled_next_run", "enabled", "next_run_at"),
+    )
+
+
+class MonitorNotification(Base):
+    """İzlenen kimlikte yeni sonuç bulunduğunda oluşan bildirim (UI yoklar)"""
+    __tablename__ = "monitor_notifications"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    monitor_id: Mapped[int] = mapped_column(Integer)
+    identity_hash: Mapped[str] = mapped_column(String(64))
+    scan_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    previous_scan_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    added_count: Mapped[int] = mapped_column(Integer, default=0)
+    removed_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Eklenen sonuçların türe göre sayıları (JSON), örn. {"breach": 1, "social": 2}
+    added_types: Mapped[str] = mapped_column(String(512), default="{}")
+    risk_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    read_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_monitor_notifications_identity_id", "identity_hash", "id"),
+    )
@@ -0,0 +1,21 @@
+from sqlalchemy import String, DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+
+from ..core.database import Base
+
+
+class RetentionProgress(Base):
+    """
+    Parça parça silme yapan saklama işlerinin ilerlemesi. Her parti silme ile
+    aynı işlemde güncellenir; iş yarıda kesilirse kaldığı id'den devam eder.
+    """
+    __tablename__ = "retention_progress"
+
+    job: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Bu id'ye kadar (dahil) satırlar işlendi
+    cursor: Mapped[int] = mapped_column(Integer, default=0)
+    threshold: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    rows_deleted: Mapped[int] = mapped_column(Integer, default=0)
+    status: Mapped[str] = mapped_column(String(16), default="idle")
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,47 @@
+from sqlalchemy import String, DateTime, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+
+from ..core.database import Base
+
+
+class RouteRollup(Base):
+    """
+    Audit kayıtlarından türetilen rota/dakika özetleri. Gecikme histogramı
+    sabit kovalarla tutulur (le_N: N ms ve altı, le_inf: üst sınır yok);
+    kovalar dakikalar arasında toplanabilir (services/audit_rollups.py).
+    """
+    __tablename__ = "route_rollups"
+
+    route: Mapped[str] = mapped_column(String(128), primary_key=True)
+    minute: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    # status >= 500
+    error_count: Mapped[int] = mapped_column(Integer, default=0)
+    duration_sum_ms: Mapped[int] = mapped_column(Integer, default=0)
+    duration_max_ms: Mapped[int] = mapped_column(Integer, default=0)
+    le_5: Mapped[int] = mapped_column(Integer, default=0)
+    le_10: Mapped[int] = mapped_column(Integer, default=0)
+    le_25: Mapped[int] = mapped_column(Integer, default=0)
+    le_50: Mapped[int] = mapped_column(Integer, default=0)
+    le_100: Mapped[int] = mapped_column(Integer, default=0)
+    le_250: Mapped[int] = mapped_column(Integer, default=0)
+    le_500: Mapped[int] = mapped_column(Integer, default=0)
+    le_1000: Mapped[int] = mapped_column(Integer, default=0)
+    le_2500: Mapped[int] = mapped_column(Integer, default=0)
+    le_5000: Mapped[int] = mapped_column(Integer, default=0)
+    le_10000: Mapped[int] = mapped_column(Integer, default=0)
+    le_inf: Mapped[int] = mapped_column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ix_route_rollups_minute", "minute"),
+    )
+
+
+class RollupWatermark(Base):
+    """Her audit tablosu için özetlere işlenmiş son id"""
+    __tablename__ = "rollup_watermarks"
+
+    source: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_id: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,35 @@
+from sqlalchemy import String, DateTime, Index, Integer, LargeBinary
+from sqlalchemy.orm import Mapped, deferred, mapped_column
+from datetime import datetime
+
+from ..core.database import Base
+
+
+class ScanRecord(Base):
+    """
+    Tamamlanan taramaların geçmişi. Listeleme ve karşılaştırma yalnızca
+    metadata kolonlarını okur; sonuç JSON'u sıkıştırılıp şifrelenmiş olarak
+    `payload`'da durur ve sadece istendiğinde açılır (services/scan_history.py).
+    """
+    __tablename__ = "scan_history"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # E-posta/isim/profil URL'inin tuzlu hash'i; düz kimlik saklanmaz
+    identity_hash: Mapped[str] = mapped_column(String(64))
+    stage: Mapped[str] = mapped_column(String(32))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    duration_ms: Mapped[int] = mapped_column(Integer, default=0)
+    result_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    risk_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    risk_level: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    # Sonuç linklerinin özeti: payload açmadan "sonuçlar değişti mi" sorusu için
+    results_digest: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    codec: Mapped[str] = mapped_column(String(16), default="zlib")
+    payload_size: Mapped[int] = mapped_column(Integer, default=0)
+    payload_salt: Mapped[str] = mapped_column(String(32))
+    payload: Mapped[bytes] = deferred(mapped_column(LargeBinary))
+
+    __table_args__ = (
+        Index("ix_scan_history_identity_stage_id", "identity_hash", "stage", "id"),
+        Index("ix_scan_history_created_at", "created_at"),
+    )
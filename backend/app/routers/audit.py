@@ -0,0 +1,97 @@
+import hmac
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import get_read_db
+from ..services.audit_partitions import decode_cursor, query_audit_logs, search_audit_logs
+from ..services.audit_rollups import query_rollups
+
+
+def require_admin_token(x_admin_token: str | None = Header(None)) -> None:
+    """Audit kayitlari IP ve kisisel detay icerir: yalnizca yonetici token'i ile"""
+    if not settings.audit_admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.audit_admin_token):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Yonetici token'i gerekli")
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+# Bir yanitta en fazla bu kadar pencere
+MAX_ROLLUP_WINDOWS = 1440
+
+
+@router.get("/audit")
+def list_audit_logs(
+    start: datetime | None = Query(None, description="Bu zamandan itibaren (UTC, dahil)"),
+    end: datetime | None = Query(None, description="Bu zamana kadar (UTC, haric)"),
+    action: str | None = Query(None, max_length=128, description="Eylem oneki, orn. 'GET /api/osint'"),
+    ip: str | None = Query(None, max_length=64),
+    status_code: int | None = Query(None, alias="status", ge=100, le=599),
+    cursor: str | None = Query(None, description="Onceki yanittaki next_cursor"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+):
+    """Audit kayitlari, en yeniden eskiye; sonraki sayfa icin next_cursor kullanilir"""
+    if start and end and start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start, end'den once olmali")
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    rows, next_cursor = query_audit_logs(
+        db.connection(),
+        start=start,
+        end=end,
+        action_prefix=action,
+        ip=ip,
+        status=status_code,
+        after=after,
+        limit=limit,
+    )
+    return {"count": len(rows), "items": rows, "next_cursor": next_cursor}
+
+
+@router.get("/audit/rollups")
+def audit_rollups(
+    route: str | None = Query(None, max_length=128, description="Rota sablonu, orn. 'GET /history/{scan_id}'; bos ise tum rotalar"),
+    start: datetime | None = Query(None, description="Varsayilan: end'den bir saat once"),
+    end: datetime | None = Query(None, description="Varsayilan: simdi (UTC)"),
+    step: int = Query(1, ge=1, le=1440, description="Pencere boyu (dakika)"),
+    db: Session = Depends(get_read_db),
+):
+    """Dakikalik ozetlerden pencere basina sayi, hata orani ve gecikme yuzdelikleri"""
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(hours=1)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start, end'den once olmali")
+    if (end - start) / timedelta(minutes=step) > MAX_ROLLUP_WINDOWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"En fazla {MAX_ROLLUP_WINDOWS} pencere; step'i buyutun veya araligi daraltin",
+        )
+    return query_rollups(db.connection(), start, end, route=route, step_minutes=step)
+
+
+@router.get("/audit/search")
+def search_audit(
+    q: str = Query(..., min_length=1, max_length=256, description='Kelimeler, "tirnakli ifade", onek* (orn. ahmet* "github.com/ahmet")'),
+    start: datetime | None = Query(None),
+    end: datetime | None = Query(None),
+    order: str = Query(
+        "rank",
+        pattern="^(rank|recent)$",
+        description="rank: bolumler yeniden eskiye, her bolum icinde bm25 (skorlar bolumler arasi karsilastirilamaz)",
+    ),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+):
+    """Audit eylem ve detaylarinda tam metin arama"""
+    if start and end and start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start, end'den once olmali")
+    items = search_audit_logs(db.connection(), q, start=start, end=end, order=order, limit=limit)
+    return {"query": q, "count": len(items), "items": items}
@@ -1,10 +1,13 @@
 """
 API şifreleme router'ı
 """
+import asyncio
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Any
-from ..services.encryption import get_encrypted_config, get_decrypted_config, encrypt_api_key, decrypt_api_key
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List
+from ..core.config import settings
+from ..core.executors import run_blocking
+from ..services.encryption import get_encrypted_config, get_decrypted_config, encrypt_api_key, decrypt_api_key, KDF_PBKDF2
 
 router = APIRouter(prefix="/api/encryption", tags=["Encryption"])
 
@@ -18,6 +21,15 @@ class DecryptRequest(BaseModel):
     encrypted_data: str
     salt: str
     password: str
+    kdf: str = KDF_PBKDF2  # /config/encrypted blob'lari icin "hkdf"
+
+
+class BulkEncryptRequest(BaseModel):
+    items: List[EncryptRequest] = Field(min_length=1, max_length=settings.encryption_bulk_max_items)
+
+
+class BulkDecryptRequest(BaseModel):
+    items: List[DecryptRequest] = Field(min_length=1, max_length=settings.encryption_bulk_max_items)
 
 
 @router.post("/encrypt")
@@ -26,7 +38,7 @@ async def encrypt_key(request: EncryptRequest):
     API anahtarını şifrele
     """
     try:
-        result = encrypt_api_key(request.api_key, request.password)
+        result = await run_blocking("crypto", encrypt_api_key, request.api_key, request.password)
         if result.get("error"):
             raise HTTPException(status_code=400, detail=result["error"])
         
@@ -45,7 +57,7 @@ async def decrypt_key(request: DecryptRequest):
     Şifrelenmiş API anahtarını çöz
     """
     try:
-        result = decrypt_api_key(request.encrypted_data, request.salt, request.password)
+        result = await run_blocking("crypto", decrypt_api_key, request.encrypted_data, request.salt, request.password, request.kdf)
         if result.get("error"):
             raise HTTPException(status_code=400, detail=result["error"])
         
@@ -57,13 +69,75 @@ async def decrypt_key(request: DecryptRequest):
         raise HTTPException(status_code=500, detail=f"Çözme hatası: {str(e)}")
 
 
+@router.post("/encrypt/bulk")
+async def encrypt_keys_bulk(request: BulkEncryptRequest):
+    """
+    Birden çok API anahtarını tek istekte şifrele.
+    Öğeler crypto havuzunda paralel işlenir, sonuçlar giriş sırasıyla döner;
+    hatalı bir öğe tüm isteği düşürmez.
+    """
+    results = await asyncio.gather(*[
+        run_blocking("crypto", encrypt_api_key, item.api_key, item.password)
+        for item in request.items
+    ], return_exceptions=True)
+
+    items = []
+    for index, result in enumerate(results):
+        if isinstance(result, Exception):
+            result = {"encrypted": "", "salt": "", "error": str(result)}
+        items.append({
+            "index": index,
+            "success": not result.get("error"),
+            "encrypted": result.get("encrypted", ""),
+            "salt": result.get("salt", ""),
+            "error": result.get("error")
+        })
+
+    return {
+        "success": all(item["success"] for item in items),
+        "count": len(items),
+        "failed": sum(1 for item in items if not item["success"]),
+        "items": items
+    }
+
+
+@router.post("/decrypt/bulk")
+async def decrypt_keys_bulk(request: BulkDecryptRequest):
+    """
+    Birden çok şifrelenmiş anahtarı tek istekte çöz.
+    Sonuçlar giriş sırasıyla döner; öğe bazlı hatalar ayrı raporlanır.
+    """
+    results = await asyncio.gather(*[
+        run_blocking("crypto", decrypt_api_key, item.encrypted_data, item.salt, item.password, item.kdf)
+        for item in request.items
+    ], return_exceptions=True)
+
+    items = []
+    for index, result in enumerate(results):
+        if isinstance(result, Exception):
+            result = {"decrypted": "", "error": str(result)}
+        items.append({
+            "index": index,
+            "success": not result.get("error"),
+            "decrypted": result.get("decrypted", ""),
+            "error": result.get("error")
+        })
+
+    return {
+        "success": all(item["success"] for item in items),
+        "count": len(items),
+        "failed": sum(1 for item in items if not item["success"]),
+        "items": items
+    }
+
+
 @router.get("/config/encrypted")
 async def get_encrypted_config_endpoint():
     """
     Şifrelenmiş konfigürasyonu getir
     """
     try:
-        config = get_encrypted_config()
+        config = await run_blocking("crypto", get_encrypted_config)
         return {
             "success": True,
             "encrypted_config": config
@@ -78,7 +152,7 @@ async def get_decrypted_config_endpoint():
     Çözülmüş konfigürasyonu getir
     """
     try:
-        config = get_decrypted_config()
+        config = await run_blocking("crypto", get_decrypted_config)
         return {
             "success": True,
             "decrypted_config": config
@@ -93,7 +167,7 @@ async def encryption_status():
     Şifreleme durumunu kontrol et
     """
     try:
-        encrypted_config = get_encrypted_config()
+        encrypted_config = await run_blocking("crypto", get_encrypted_config)
         
         status = {}
         for key, data in encrypted_config.items():
@@ -4,6 +4,7 @@ Google API'leri için router endpoint'leri
 from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
+from ..core.executors import run_blocking
 from ..services.google_apis import (
     search_youtube_videos, 
     search_google_places, 
@@ -39,7 +40,7 @@ async def search_youtube(request: YouTubeSearchRequest):
     YouTube'da video arama
     """
     try:
-        results = search_youtube_videos(request.query, request.max_results)
+        results = await run_blocking("handlers", search_youtube_videos, request.query, request.max_results)
         return {
             "success": True,
             "query": request.query,
@@ -56,7 +57,7 @@ async def search_places(request: PlacesSearchRequest):
     Google Places ile yer arama
     """
     try:
-        results = search_google_places(request.query, request.location, request.radius)
+        results = await run_blocking("handlers", search_google_places, request.query, request.location, request.radius)
         return {
             "success": True,
             "query": request.query,
@@ -74,7 +75,7 @@ async def analyze_image(request: ImageAnalysisRequest):
     Google Vision API ile görsel analiz
     """
     try:
-        analysis = analyze_image_with_vision(request.image_url)
+        analysis = await run_blocking("handlers", analyze_image_with_vision, request.image_url)
         return {
             "success": True,
             "image_url": request.image_url,
@@ -90,7 +91,7 @@ async def get_location_info(request: GeolocationRequest):
     Google Geocoding API ile adres bilgisi
     """
     try:
-        location_info = get_geolocation_info(request.address)
+        location_info = await run_blocking("handlers", get_geolocation_info, request.address)
         return {
             "success": True,
             "address": request.address,
@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from ..core.database import get_read_db
+from ..services.scan_history import compare_scans, get_scan, identity_hash, list_scans
+from ..services.security import verified_email
+
+
+router = APIRouter()
+
+
+def _identity(email: str | None, full_name: str | None, profile_url: str | None) -> str:
+    try:
+        return identity_hash(email=email, full_name=full_name, profile_url=profile_url)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _payload_identity(
+    verify_token: str | None, email: str | None, full_name: str | None, profile_url: str | None,
+) -> str:
+    """
+    Sifreli sonuclar yalnizca sahibine: kimlik, dogrulama token'indaki e-postadan
+    alinir. E-posta/isim bilinmesi sahiplik kaniti degildir.
+    """
+    owner = verified_email(verify_token)
+    if owner is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Sonuclar icin X-Verify-Token (e-posta dogrulama token'i) gerekli",
+        )
+    identity = identity_hash(email=owner)
+    if (email or full_name or profile_url) and _identity(email, full_name, profile_url) != identity:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token bu kimlige ait degil")
+    return identity
+
+
+@router.get("/history")
+def scan_history(
+    email: str | None = Query(None, max_length=255),
+    full_name: str | None = Query(None, max_length=255),
+    profile_url: str | None = Query(None, max_length=1024),
+    stage: str | None = Query(None, pattern="^(initial|detailed|platform|profile)$"),
+    before_id: int | None = Query(None, ge=1, description="Onceki sayfanin son id'si"),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+):
+    """Kimligin tarama gecmisi (yalnizca metadata; sonuclar /history/{id} ile)"""
+    identity = _identity(email, full_name, profile_url)
+    items = list_scans(db, identity, stage=stage, before_id=before_id, limit=limit)
+    return {
+        "count": len(items),
+        "items": items,
+        "next_before_id": items[-1]["id"] if len(items) == limit else None,
+    }
+
+
+@router.get("/history/compare")
+def compare_history(
+    base: int = Query(..., ge=1, description="Eski tarama id'si"),
+    other: int = Query(..., ge=1, description="Yeni tarama id'si"),
+    include_results: bool = Query(False, description="Eklenen/kaybolan linkler (payload acilir)"),
+    email: str | None = Query(None, max_length=255),
+    full_name: str | None = Query(None, max_length=255),
+    profile_url: str | None = Query(None, max_length=1024),
+    verify_token: str | None = Header(None, alias="X-Verify-Token"),
+    db: Session = Depends(get_read_db),
+):
+    """Iki kayit da verilen kimlige ait olmali; degilse 404. Sonuclar icin token gerekir"""
+    if include_results:
+        identity = _payload_identity(verify_token, email, full_name, profile_url)
+    else:
+        identity = _identity(email, full_name, profile_url)
+    comparison = compare_scans(db, base, other, include_results=include_results, identity=identity)
+    if comparison is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarama bulunamadi")
+    return comparison
+
+
+@router.get("/history/{scan_id}")
+def scan_detail(
+    scan_id: int,
+    include_result: bool = Query(False, description="Sifreli sonucu cozup dondur"),
+    email: str | None = Query(None, max_length=255),
+    full_name: str | None = Query(None, max_length=255),
+    profile_url: str | None = Query(None, max_length=1024),
+    verify_token: str | None = Header(None, alias="X-Verify-Token"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Kayit verilen kimlige ait degilse 404 (id tahminiyle baskasinin taramasi okunamaz).
+    Sifreli sonuc yalnizca X-Verify-Token ile sahibine acilir; yoksa metadata doner.
+    """
+    if include_result:
+        identity = _payload_identity(verify_token, email, full_name, profile_url)
+    else:
+        identity = _identity(email, full_name, profile_url)
+    scan = get_scan(db, scan_id, include_payload=include_result, identity=identity)
+    if scan is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarama bulunamadi")
+    return scan
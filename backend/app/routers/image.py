@@ -1,18 +1,193 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
+import json
+from typing import List
 
-from ..services.image_analyze import analyze_image
+from fastapi import APIRouter, Depends, Request, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import get_read_db
+from ..core.executors import run_blocking
+from ..services.image_analyze import HASH_VERSION, normalize_hash_kinds
+from ..services.image_batch import ImageBatch, is_archive, upload_limit
+from ..services.image_engine import image_engine, ImageEngineBusy, ImageEngineTimeout
+from ..services.image_index import SOURCE_UPLOAD, MAX_DISTANCE, find_similar, index_image_hashes
+from ..services.image_metadata import extract_header_metadata
+from ..services.image_upload import stream_uploads, UploadTooLarge, InvalidUpload
 
 
 router = APIRouter()
 
+# Govde elle (streaming) okundugu icin dosya alani OpenAPI'ye ayrica bildirilir
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+        "required": True,
+    }
+}
+
+BATCH_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "files": {"type": "array", "items": {"type": "string", "format": "binary"}},
+                    },
+                    "required": ["files"],
+                }
+            }
+        },
+        "required": True,
+    }
+}
+
+
+HASHES_QUERY = Query(
+    None,
+    description="Ek hash'ler: 'all' veya virgullu liste (phash, dhash, ahash, whash, colorhash)",
+)
+
+
+async def index_uploads(entries):
+    """Analiz edilen yuklemelerin pHash'lerini benzerlik indeksine ekle"""
+    if settings.image_index_uploads and entries:
+        await run_blocking("handlers", index_image_hashes, entries)
+
 
-@router.post("/analyze-image")
-async def analyze_image_upload(file: UploadFile = File(...)):
+def parse_hashes(hashes: str | None):
     try:
-        content = await file.read()
-        info = analyze_image(content)
-        return info
+        return normalize_hash_kinds(hashes)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/analyze-image", openapi_extra=UPLOAD_OPENAPI)
+async def analyze_image_upload(request: Request, hashes: str | None = HASHES_QUERY):
+    hash_kinds = parse_hashes(hashes)
+    exif_by_upload = {}
+
+    def on_header(upload, header):
+        # Ilk baytlar gelir gelmez metadata cpu havuzunda ayristirilir (govde okunmaya
+        # devam eder); isci surece sadece ozet gider.
+        # Metadata basliga sigmadiysa None kalir ve isci dosyanin kendisini okur.
+        try:
+            exif_by_upload[id(upload)] = extract_header_metadata(header, header_complete=False)
+        except Exception:
+            exif_by_upload[id(upload)] = None
+
+    upload = None
+    try:
+        async for item in stream_uploads(request, max_files=1, on_header=on_header):
+            upload = item
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except InvalidUpload:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Gecersiz veya desteklenmeyen goruntu")
+
+    if upload is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Dosya bulunamadi")
+
+    try:
+        info = await image_engine.analyze_upload(upload, exif=exif_by_upload.get(id(upload)), hashes=hash_kinds)
+    except ImageEngineBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, int(settings.image_engine_task_timeout_s)))},
+        )
+    except ImageEngineTimeout as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Gecersiz veya desteklenmeyen goruntu")
+    finally:
+        upload.close()
+
+    await index_uploads([(info["phash"], SOURCE_UPLOAD, upload.filename, upload.sha256)])
+    return info
+
+
+@router.post("/analyze-image/batch", openapi_extra=BATCH_UPLOAD_OPENAPI)
+async def analyze_image_batch(request: Request, hashes: str | None = HASHES_QUERY):
+    """
+    Coklu dosya veya zip/tar arsivi analizi; sonuclar NDJSON olarak tamamlandikca doner.
+    Analiz govde okunurken baslar, yanit govdenin tamami alindiktan sonra akar.
+    """
+    max_files = settings.image_batch_max_files
+    batch = ImageBatch(image_engine, concurrency=image_engine.workers, hashes=parse_hashes(hashes))
 
+    try:
+        async for upload in stream_uploads(
+            request,
+            max_files=max_files,
+            max_total_bytes=settings.image_batch_max_total_bytes,
+            max_bytes_for=upload_limit,
+            skip_oversize=True,
+        ):
+            if upload.error is not None:
+                batch.add_error(upload.filename, upload.error)
+                upload.close()
+            elif is_archive(upload):
+                try:
+                    await batch.add_archive(upload, max_members=max_files)
+                finally:
+                    upload.close()
+            else:
+                await batch.add(upload)
+    except UploadTooLarge as e:
+        batch.cancel()
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except InvalidUpload as e:
+        batch.cancel()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except BaseException:
+        batch.cancel()
+        raise
+
+    if batch.files == 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Dosya bulunamadi")
+
+    async def ndjson():
+        indexed = []
+        async for line in batch.results():
+            if line.get("status") == "ok" and "duplicate_of" not in line:
+                indexed.append((line["result"]["phash"], SOURCE_UPLOAD, line["filename"], line["sha256"]))
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+        await index_uploads(indexed)
 
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.get("/image/similar")
+def similar_images(
+    phash: str = Query(..., description="64-bit pHash (16 hex karakter), analiz yanitindaki hash_version ile uretilmis"),
+    max_distance: int = Query(8, ge=0, le=MAX_DISTANCE),
+    limit: int = Query(50, ge=1, le=500),
+    source: str | None = Query(None, description="upload veya scan"),
+    sha256: List[str] = Query([], description="Sahip olunan dosyalarin sha256'lari (analiz yanitindan); yalnizca bunlarin ayrintilari doner"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Indekslenmis hash'ler arasinda Hamming mesafesi max_distance icindekiler.
+    Baskalarinin kayitlari icin yalnizca mesafe ve opak id doner.
+    """
+    try:
+        matches = find_similar(db, phash, max_distance=max_distance, limit=limit, source=source, owned_sha256=sha256)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {
+        "phash": phash.lower(),
+        "hash_version": HASH_VERSION,
+        "max_distance": max_distance,
+        "count": len(matches),
+        "matches": matches,
+    }
@@ -0,0 +1,100 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import get_db, get_read_db
+from ..services.monitoring import (
+    get_monitor, list_notifications, mark_notification_read, monitor_info, remove_monitor, upsert_monitor,
+)
+from ..services.scan_history import identity_hash
+from ..services.security import verified_email
+
+
+router = APIRouter()
+
+
+class MonitorRequest(BaseModel):
+    full_name: str = Field(..., min_length=1, max_length=255)
+    email: str | None = Field(None, max_length=255)
+    confirmed_links: List[str] = []
+    interval_hours: int = Field(settings.monitor_default_interval_h, ge=settings.monitor_min_interval_h, le=24 * 30)
+    # Periyodik yeniden tarama acik onay ister
+    consent: bool = False
+
+
+def _verified_owner(verify_token: str | None = Header(None, alias="X-Verify-Token")) -> str:
+    """
+    Izleme kaydi yalnizca e-posta sahibine aittir: onay/kimlik istemcinin beyanina
+    degil, /register'in verdigi imzali dogrulama token'ina dayanir
+    """
+    email = verified_email(verify_token)
+    if email is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Izleme icin X-Verify-Token (e-posta dogrulama token'i) gerekli",
+        )
+    return email
+
+
+def _identity(owner: str = Depends(_verified_owner)) -> str:
+    return identity_hash(email=owner)
+
+
+@router.post("/monitoring")
+def enroll_monitoring(req: MonitorRequest, owner: str = Depends(_verified_owner), db: Session = Depends(get_db)):
+    """
+    Kimligi periyodik izlemeye al (veya araligini/linklerini guncelle). Yalnizca
+    dogrulanmis e-posta ile; isimle (e-postasiz) kayit kabul edilmez
+    """
+    if not req.consent:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Izleme icin onay gerekli")
+    if req.email and req.email.strip().lower() != owner:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token bu e-postaya ait degil")
+    monitor = upsert_monitor(db, req.full_name, owner, req.confirmed_links, req.interval_hours * 3600)
+    return monitor_info(monitor)
+
+
+@router.get("/monitoring")
+def monitoring_status(identity: str = Depends(_identity), db: Session = Depends(get_read_db)):
+    monitor = get_monitor(db, identity)
+    if monitor is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Izleme kaydi bulunamadi")
+    return monitor_info(monitor)
+
+
+@router.delete("/monitoring")
+def leave_monitoring(identity: str = Depends(_identity), db: Session = Depends(get_db)):
+    """Izlemeden cik; sifreli tarama girdileri silinir"""
+    if not remove_monitor(db, identity):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Izleme kaydi bulunamadi")
+    return {"removed": True}
+
+
+@router.get("/monitoring/notifications")
+def monitoring_notifications(
+    identity: str = Depends(_identity),
+    after_id: int | None = Query(None, ge=0, description="Yalnizca bu id'den yeni bildirimler (yoklama)"),
+    unread_only: bool = Query(False),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+):
+    items = list_notifications(db, identity, after_id=after_id, unread_only=unread_only, limit=limit)
+    return {
+        "count": len(items),
+        "items": items,
+        "last_id": max((item["id"] for item in items), default=after_id),
+    }
+
+
+@router.post("/monitoring/notifications/{notification_id}/read")
+def read_notification(
+    notification_id: int,
+    identity: str = Depends(_identity),
+    db: Session = Depends(get_db),
+):
+    if not mark_notification_read(db, identity, notification_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bildirim bulunamadi")
+    return {"read": True}
@@ -7,6 +7,9 @@ import time
 import re
 from urllib.parse import quote_plus
 
+from ..core.executors import run_blocking
+from ..services.photo_correlation import correlate_profile_photos
+
 router = APIRouter()
 
 class Stage1SearchRequest(BaseModel):
@@ -25,6 +28,8 @@ class CandidateProfile(BaseModel):
     profile_url: str
     profile_pic_url: str = None
     snippet: str
+    cluster_id: str = None
+    similarity: float = None
 
 class GoogleDorkingService:
     def __init__(self):
@@ -81,8 +86,10 @@ class GoogleDorkingService:
                 continue
         
         # Remove duplicates and return top results
-        unique_candidates = self._deduplicate_candidates(candidates)
-        return unique_candidates[:10]  # Return top 10 results
+        unique_candidates = self._deduplicate_candidates(candidates)[:10]
+        # Ayni profil fotografini kullanan adaylari kumele
+        correlate_profile_photos(unique_candidates, url_key="profile_pic_url")
+        return unique_candidates
     
     def _mock_search_results(self, query: str, firstName: str, lastName: str) -> List[Dict[str, Any]]:
         """Mock search results for development"""
@@ -272,7 +279,9 @@ deep_analysis = DeepAnalysisService()
 async def stage1_search_profiles(request: Stage1SearchRequest):
     """Stage 1: Search for potential profiles using Google dorking"""
     try:
-        candidates = google_dorking.search_profiles(
+        candidates = await run_blocking(
+            "handlers",
+            google_dorking.search_profiles,
             request.firstName,
             request.lastName,
             request.city
@@ -288,7 +297,9 @@ async def stage1_search_profiles(request: Stage1SearchRequest):
 async def stage2_deep_analysis(request: Stage2AnalysisRequest):
     """Stage 2: Perform deep analysis on selected profile"""
     try:
-        analysis_results = deep_analysis.analyze_profile(
+        analysis_results = await run_blocking(
+            "handlers",
+            deep_analysis.analyze_profile,
             request.profile_url,
             request.source,
             request.name
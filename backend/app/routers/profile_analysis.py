@@ -8,6 +8,7 @@ from typing import Any, List, Optional
 from pydantic import BaseModel, HttpUrl, validator
 import time
 import hashlib
+import secrets
 from datetime import datetime, timedelta
 
 from ..services.profile_analysis import (
@@ -20,14 +21,9 @@ from ..services.profile_analysis import (
     list_public_photos
 )
 from ..services.audit import log_audit_event
-from ..services.encryption import (
-    encryption_service, 
-    audit_logger, 
-    consent_manager, 
-    secure_storage,
-    retention_service
-)
+from ..services.scan_history import STAGE_PROFILE, identity_hash, record_scan
 from ..core.config import settings
+from ..core.executors import run_blocking
 
 
 router = APIRouter()
@@ -144,7 +140,7 @@ async def search_social_media_endpoint(
             pass
         
         # Sosyal medya araması
-        profiles = search_social_media(request.name, request.platform)
+        profiles = await run_blocking("handlers", search_social_media, request.name, request.platform)
         
         processing_time = time.time() - start_time
         
@@ -184,7 +180,7 @@ async def analyze_profile_endpoint(
     ⚠️ ETİK UYARI: Bu araç sadece kendi profillerinizi veya açık onay verilen profilleri analiz etmek için kullanılmalıdır.
     """
     start_time = time.time()
-    session_token = encryption_service.generate_session_token()
+    session_token = secrets.token_urlsafe(32)
     
     try:
         # Audit log
@@ -200,19 +196,23 @@ async def analyze_profile_endpoint(
         print(f"[API] Profil analizi başladı: {request.profile_url}")
         
         # Profil analizi
-        analysis_result = analyze_profile(str(request.profile_url))
-        
-        # Veriyi güvenli şekilde sakla (30 gün)
-        data_id = f"profile_analysis_{int(start_time)}_{session_token[:8]}"
-        secure_storage.store_data(
-            data_id=data_id,
-            data=analysis_result,
-            user_id=session_token,
-            ip_address="127.0.0.1"  # Gerçek IP adresi middleware'den alınabilir
-        )
+        analysis_result = await run_blocking("handlers", analyze_profile, str(request.profile_url))
         
         processing_time = time.time() - start_time
         
+        # Sonucu şifreli tarama geçmişine yaz (SCAN_HISTORY_RETENTION_DAYS kadar saklanır)
+        risk = analysis_result.get("risk_assessment") or {}
+        analysis_result["scan_id"] = await run_blocking(
+            "io",
+            record_scan,
+            STAGE_PROFILE,
+            identity_hash(profile_url=str(request.profile_url)),
+            analysis_result,
+            int(processing_time * 1000),
+            risk.get("risk_score"),
+            risk.get("risk_level"),
+        )
+        
         print(f"[API] Profil analizi tamamlandı: {processing_time:.2f}s")
         
         return ProfileAnalysisResponse(
@@ -244,7 +244,7 @@ async def fetch_profile_details_endpoint(
     try:
         print(f"[API] Profil detayları çekiliyor: {request.profile_url}")
         
-        details = fetch_profile_details(str(request.profile_url))
+        details = await run_blocking("handlers", fetch_profile_details, str(request.profile_url))
         
         return {
             "success": True,
@@ -274,7 +274,7 @@ async def reverse_image_search_endpoint(
     try:
         print(f"[API] Ters görsel arama başladı: {request.image_url}")
         
-        results = reverse_image_search(str(request.image_url))
+        results = await run_blocking("handlers", reverse_image_search, str(request.image_url))
         
         return {
             "success": True,
@@ -304,7 +304,7 @@ async def discover_other_accounts_endpoint(
     try:
         print(f"[API] Diğer hesaplar keşfediliyor: {request.username}")
         
-        accounts = discover_other_accounts(request.username)
+        accounts = await run_blocking("handlers", discover_other_accounts, request.username)
         
         return {
             "success": True,
@@ -364,7 +364,7 @@ async def list_public_photos_endpoint(
     try:
         print(f"[API] Halka açık fotoğraflar listeleniyor: {request.profile_url}")
         
-        photos = list_public_photos(str(request.profile_url))
+        photos = await run_blocking("handlers", list_public_photos, str(request.profile_url))
         
         return {
             "success": True,
@@ -1,10 +1,17 @@
+import time
+
 from fastapi import APIRouter, HTTPException, status
 from typing import Any, List
 from pydantic import BaseModel
 
+from ..core.executors import run_blocking
 from ..schemas.selfscan import SelfScanRequest
 from ..services.selfscan import initial_scan, detailed_scan
+from ..services.incremental_scan import incremental_detailed_scan
 from ..services.risk import score_results, classify
+from ..services.scan_history import (
+    STAGE_DETAILED, STAGE_INITIAL, STAGE_PLATFORM, identity_hash, latest_scan_result, record_scan,
+)
 
 
 router = APIRouter()
@@ -14,6 +21,8 @@ class DetailedScanRequest(BaseModel):
     full_name: str
     email: str | None = None
     confirmed_links: List[str] = []
+    # Son detayli taramaya gore yalnizca tazeligi gecmis kaynaklari sorgula, fark dondur
+    incremental: bool = False
 
 class PlatformSearchRequest(BaseModel):
     full_name: str
@@ -21,15 +30,26 @@ class PlatformSearchRequest(BaseModel):
     platform: str | None = None
 
 
+async def _record(stage: str, req: Any, result: dict, started: float) -> None:
+    """Sonucu tarama gecmisine yaz; kaydin id'si yanita scan_id olarak eklenir"""
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    result['scan_id'] = await run_blocking(
+        "io", record_scan, stage, identity_hash(email=req.email, full_name=req.full_name),
+        result, duration_ms, result.get('risk_score'), result.get('risk_level'),
+    )
+
+
 @router.post("/initial-scan")
-def do_initial_scan(req: SelfScanRequest) -> dict[str, Any]:
+async def do_initial_scan(req: SelfScanRequest) -> dict[str, Any]:
     """İlk aşama: Hızlı tarama ve onaylama"""
     try:
+        started = time.perf_counter()
         print(f"[>>] Initial scan basladi: {req.full_name} / {req.email}")
-        result = initial_scan(req.full_name, req.email)
+        result = await run_blocking("handlers", initial_scan, req.full_name, req.email)
         s = score_results(result.get('results', []))
         result['risk_score'] = s
         result['risk_level'] = classify(s)
+        await _record(STAGE_INITIAL, req, result, started)
         print(f"[OK] Initial scan tamamlandi: {len(result.get('results', []))} sonuc, risk: {s}")
         return result
     except Exception as e:
@@ -40,15 +60,25 @@ def do_initial_scan(req: SelfScanRequest) -> dict[str, Any]:
 
 
 @router.post("/detailed-scan")
-def do_detailed_scan(req: DetailedScanRequest) -> dict[str, Any]:
+async def do_detailed_scan(req: DetailedScanRequest) -> dict[str, Any]:
     """Detaylı tarama: Onaylanan linkler için derinlemesine analiz"""
     try:
+        started = time.perf_counter()
         print(f"[>>] Detailed scan basladi: {req.full_name} / {req.email}")
         print(f"[>>] Confirmed links: {req.confirmed_links}")
-        result = detailed_scan(req.full_name, req.email, req.confirmed_links)
+        if req.incremental:
+            previous = await run_blocking(
+                "io", latest_scan_result, identity_hash(email=req.email, full_name=req.full_name), STAGE_DETAILED
+            )
+            result = await run_blocking(
+                "handlers", incremental_detailed_scan, req.full_name, req.email, req.confirmed_links, previous
+            )
+        else:
+            result = await run_blocking("handlers", detailed_scan, req.full_name, req.email, req.confirmed_links)
         s = score_results(result.get('results', []))
         result['risk_score'] = s
         result['risk_level'] = classify(s)
+        await _record(STAGE_DETAILED, req, result, started)
         print(f"[OK] Detailed scan tamamlandi: {len(result.get('results', []))} sonuc, risk: {s}")
         return result
     except Exception as e:
@@ -59,11 +89,12 @@ def do_detailed_scan(req: DetailedScanRequest) -> dict[str, Any]:
 
 
 @router.post("/platform-search")
-def do_platform_search(req: PlatformSearchRequest) -> dict[str, Any]:
+async def do_platform_search(req: PlatformSearchRequest) -> dict[str, Any]:
     """Platform bazlı arama: Belirli bir platformda arama yapar"""
     try:
+        started = time.perf_counter()
         print(f"[>>] Platform search basladi: {req.full_name} / {req.email} / {req.platform}")
-        result = detailed_scan(req.full_name, req.email, [])
+        result = await run_blocking("handlers", detailed_scan, req.full_name, req.email, [])
         
         # Platform filtresi uygula
         if req.platform:
@@ -76,6 +107,7 @@ def do_platform_search(req: PlatformSearchRequest) -> dict[str, Any]:
         s = score_results(result.get('results', []))
         result['risk_score'] = s
         result['risk_level'] = classify(s)
+        await _record(STAGE_PLATFORM, req, result, started)
         print(f"[OK] Platform search tamamlandi: {len(result.get('results', []))} sonuc, risk: {s}")
         return result
     except Exception as e:
@@ -86,8 +118,8 @@ def do_platform_search(req: PlatformSearchRequest) -> dict[str, Any]:
 
 
 @router.post("/self-scan")
-def do_self_scan(req: SelfScanRequest) -> dict[str, Any]:
+async def do_self_scan(req: SelfScanRequest) -> dict[str, Any]:
     """Backward compatibility için eski endpoint"""
-    return do_initial_scan(req)
+    return await do_initial_scan(req)
 
 
@@ -1,34 +1,54 @@
 from typing import Optional, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ..models.audit import AuditLog
-from ..core.database import SessionLocal
+from ..core.database import AsyncSessionLocal
+from .audit_partitions import insert_audit_log, insert_audit_log_async
 import json
 
 
-def write_audit_log(db: Session, action: str, ip: str, detail: str, user_id: Optional[int] = None) -> None:
-    log = AuditLog(user_id=user_id, action=action, ip=ip, detail=detail)
-    db.add(log)
+def write_audit_log(
+    db: Session,
+    action: str,
+    ip: str,
+    detail: str,
+    user_id: Optional[int] = None,
+    status: Optional[int] = None,
+    duration_ms: Optional[int] = None,
+    route: Optional[str] = None,
+) -> None:
+    """Kaydı günün (haftanın) audit bölümüne yaz"""
+    insert_audit_log(
+        db, action=action, ip=ip, detail=detail, user_id=user_id, status=status, duration_ms=duration_ms, route=route
+    )
     db.commit()
 
 
+async def write_audit_log_async(
+    db: AsyncSession,
+    action: str,
+    ip: str,
+    detail: str,
+    user_id: Optional[int] = None,
+    status: Optional[int] = None,
+    duration_ms: Optional[int] = None,
+    route: Optional[str] = None,
+) -> None:
+    """write_audit_log'un async karşılığı; commit beklenirken event loop serbest kalır"""
+    await insert_audit_log_async(
+        db, action=action, ip=ip, detail=detail, user_id=user_id, status=status, duration_ms=duration_ms, route=route
+    )
+    await db.commit()
+
+
 async def log_audit_event(action: str, details: Dict[str, Any], user_id: Optional[int] = None, ip_address: str = "127.0.0.1") -> None:
     """Async audit logging function"""
-    db = SessionLocal()
-    try:
-        detail_str = json.dumps(details, ensure_ascii=False)
-        log = AuditLog(
-            user_id=user_id,
-            action=action,
-            ip=ip_address,
-            detail=detail_str
-        )
-        db.add(log)
-        db.commit()
-        print(f"[AUDIT] {action}: {detail_str}")
-    except Exception as e:
-        print(f"[AUDIT ERROR] {action}: {str(e)}")
-        db.rollback()
-    finally:
-        db.close()
+    async with AsyncSessionLocal() as db:
+        try:
+            detail_str = json.dumps(details, ensure_ascii=False)
+            await write_audit_log_async(db, action=action, ip=ip_address, detail=detail_str, user_id=user_id)
+            print(f"[AUDIT] {action}: {detail_str}")
+        except Exception as e:
+            print(f"[AUDIT ERROR] {action}: {str(e)}")
+            await db.rollback()
 
 
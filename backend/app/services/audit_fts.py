@@ -0,0 +1,123 @@
+"""
+Audit kayıtları için SQLite FTS5 tam metin indeksi.
+
+Her audit tablosunun (bölüm veya eski tablo) yanında `<tablo>_fts` adlı,
+içeriği tablonun kendisi olan (external content) bir FTS5 tablosu tutulur;
+action ve detail kolonları indekslenir. INSERT/UPDATE/DELETE tetikleyicileri
+indeksi tabloyla aynı işlemde günceller, uygulama kodunun yazım yolunu
+değiştirmesi gerekmez. Bölüm DROP edildiğinde FTS tablosu da silinir.
+
+FTS5 derlenmemiş SQLite'ta indeks oluşturulmaz, arama LIKE ile yapılır.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import Table, and_, column, func, literal, literal_column, or_, select, table as table_clause, text
+from sqlalchemy.engine import Connection
+
+from ..core.config import settings
+
+
+FTS_SUFFIX = "_fts"
+_TERM = re.compile(r'"([^"]*)"|(\S+)')
+# FTS5 sorgu sözdiziminde özel anlamı olan karakterler
+_SPECIAL = re.compile(r'["*^():{}+\-]')
+_available: dict = {}
+
+
+def fts_table_name(name: str) -> str:
+    return f"{name}{FTS_SUFFIX}"
+
+
+def fts_available(conn: Connection) -> bool:
+    """Bağlantının SQLite'ı FTS5 ile derlenmiş mi (veritabanı başına bir kez bakılır)"""
+    if conn.dialect.name != "sqlite":
+        return False
+    key = conn.engine.url.database
+    if key not in _available:
+        options = {row[0] for row in conn.exec_driver_sql("PRAGMA compile_options")}
+        _available[key] = "ENABLE_FTS5" in options
+    return _available[key]
+
+
+def create_fts(conn: Connection, table: Table) -> None:
+    """Tablonun FTS5 indeksini ve senkron tetikleyicilerini oluştur (varsa dokunmaz)"""
+    if not fts_available(conn):
+        return
+    quote = conn.dialect.identifier_preparer.quote
+    name = table.name
+    fts = fts_table_name(name)
+    exists = conn.dialect.has_table(conn, fts)
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {quote(fts)} USING fts5("
+        f"action, detail, content={quote(name)}, content_rowid='id', "
+        f"tokenize='{settings.audit_fts_tokenizer}', prefix='2 3')"
+    ))
+    insert_row = f"INSERT INTO {quote(fts)}(rowid, action, detail) VALUES (new.id, new.action, new.detail);"
+    delete_row = (
+        f"INSERT INTO {quote(fts)}({quote(fts)}, rowid, action, detail) "
+        f"VALUES ('delete', old.id, old.action, old.detail);"
+    )
+    triggers = {
+        "ai": f"AFTER INSERT ON {quote(name)} BEGIN {insert_row} END",
+        "ad": f"AFTER DELETE ON {quote(name)} BEGIN {delete_row} END",
+        "au": f"AFTER UPDATE ON {quote(name)} BEGIN {delete_row} {insert_row} END",
+    }
+    for suffix, body in triggers.items():
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {quote(f'{fts}_{suffix}')} {body}"))
+    if not exists:
+        # Tetikleyicilerden önce yazılmış satırlar
+        conn.execute(text(f"INSERT INTO {quote(fts)}({quote(fts)}) VALUES ('rebuild')"))
+
+
+def drop_fts(conn: Connection, name: str) -> None:
+    """FTS tablosunu sil (tetikleyiciler ana tabloyla birlikte silinir)"""
+    if fts_available(conn):
+        conn.execute(text(f"DROP TABLE IF EXISTS {conn.dialect.identifier_preparer.quote(fts_table_name(name))}"))
+
+
+def to_match_query(query: str) -> Optional[str]:
+    """
+    Kullanıcı sorgusunu güvenli FTS5 MATCH ifadesine çevir:
+    kelimeler AND ile birleşir, "tırnaklı ifade" sıralı eşleşir,
+    sonda * önek araması yapar. Kullanılabilir terim yoksa None.
+    """
+    terms = []
+    for phrase, word in _TERM.findall(query):
+        if phrase:
+            words = _SPECIAL.sub(" ", phrase).split()
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+            continue
+        prefix = word.endswith("*")
+        words = _SPECIAL.sub(" ", word).split()
+        if not words:
+            continue
+        # "github.com/ali" gibi terimler tokenizer'da bölünür: ifade olarak ara
+        term = '"' + " ".join(words) + '"'
+        terms.append(term + ("*" if prefix else ""))
+    return " ".join(terms) or None
+
+
+def like_terms(query: str) -> list:
+    """FTS5 yoksa LIKE ile aranacak terimler (önek/ifade işaretleri atılır)"""
+    return [(phrase or word).rstrip("*") for phrase, word in _TERM.findall(query) if (phrase or word).rstrip("*")]
+
+
+def fts_select(table: Table, match: str):
+    """Tek tablo için eşleşen id'ler ve bm25 skoru (küçük = daha alakalı)"""
+    fts = table_clause(fts_table_name(table.name), column("rowid"))
+    fts_name = literal_column(f'"{fts_table_name(table.name)}"')
+    return (
+        select(fts.c.rowid.label("id"), func.bm25(fts_name).label("score"))
+        .select_from(fts)
+        .where(fts_name.op("MATCH")(literal(match)))
+    )
+
+
+def like_filter(table: Table, terms: list):
+    """Her terim action veya detail içinde geçmeli"""
+    return and_(*(
+        or_(table.c.action.contains(term, autoescape=True), table.c.detail.contains(term, autoescape=True))
+        for term in terms
+    ))
@@ -0,0 +1,410 @@
+"""
+Zaman bölümlü audit log depolama.
+
+Her gün (veya ISO hafta) için ayrı bir tablo tutulur: audit_logs_d20261019,
+audit_logs_w2026_42. Yazımlar kaydın zamanına ait bölüme gider. Saklama
+süresi dolan bölümler tek bir DROP TABLE ile silinir; satır satır DELETE
+yapılmaz, yazma kilidi kısa süre tutulur. Zaman aralığı sorguları yalnızca
+aralıkla kesişen bölümleri okur.
+
+Bölümlemeden önce yazılmış kayıtlar eski audit_logs tablosunda kalır
+(models/audit.py) ve sorgulara dahil edilir.
+"""
+import base64
+import json
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, MetaData, String, Table, and_, inspect, insert, literal, literal_column, or_,
+    select, text, union_all,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateIndex, CreateTable, DropTable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.audit import AuditLog
+from .audit_fts import create_fts, drop_fts, fts_available, fts_select, like_filter, like_terms, to_match_query
+
+
+PARTITION_PREFIX = "audit_logs_"
+LEGACY_TABLE = AuditLog.__tablename__
+_PARTITION_NAME = re.compile(r"^audit_logs_(?:d(\d{8})|w(\d{4})_(\d{2}))$")
+
+_metadata = MetaData()
+_tables: Dict[str, Table] = {}
+# Bu süreçte varlığı doğrulanmış (veritabanı, bölüm) çiftleri; her yazımda CREATE denenmez
+_created: set = set()
+_lock = threading.Lock()
+
+
+def partition_name(ts: datetime, period: Optional[str] = None) -> str:
+    """Zaman damgasının düştüğü bölüm tablosunun adı"""
+    period = period or settings.audit_partition_period
+    if period == "week":
+        year, week, _ = ts.isocalendar()
+        return f"{PARTITION_PREFIX}w{year}_{week:02d}"
+    return f"{PARTITION_PREFIX}d{ts:%Y%m%d}"
+
+
+def partition_bounds(name: str) -> Optional[Tuple[datetime, datetime]]:
+    """Bölümün [başlangıç, bitiş) aralığı; bölüm adı değilse None"""
+    match = _PARTITION_NAME.match(name)
+    if not match:
+        return None
+    day, year, week = match.groups()
+    if day:
+        start = datetime.strptime(day, "%Y%m%d")
+        return start, start + timedelta(days=1)
+    start = datetime.fromisocalendar(int(year), int(week), 1)
+    return start, start + timedelta(days=7)
+
+
+def partition_table(name: str) -> Table:
+    """Bölüm tablosunun tanımı (AuditLog ile aynı kolonlar, tabloya özel indeks adları)"""
+    with _lock:
+        table = _tables.get(name)
+        if table is None:
+            table = Table(
+                name,
+                _metadata,
+                Column("id", Integer, primary_key=True),
+                Column("user_id", Integer, nullable=True),
+                Column("action", String(128)),
+                Column("ip", String(64)),
+                Column("detail", String(1024)),
+                Column("status", Integer, nullable=True),
+                Column("duration_ms", Integer, nullable=True),
+                Column("route", String(128), nullable=True),
+                Column("created_at", DateTime, default=datetime.utcnow),
+                Index(f"ix_{name}_created_at_action", "created_at", "action"),
+                Index(f"ix_{name}_ip_created_at", "ip", "created_at"),
+                Index(f"ix_{name}_user_id", "user_id"),
+            )
+            _tables[name] = table
+        return table
+
+
+def _add_missing_columns(conn: Connection, table: Table) -> None:
+    """Eski şemayla oluşturulmuş tabloya sonradan eklenen (nullable) kolonları ekle"""
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    quote = conn.dialect.identifier_preparer.quote
+    for column in table.columns:
+        if column.name not in existing:
+            conn.execute(text(
+                f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(conn.dialect)}"
+            ))
+
+
+def _upgrade_table(conn: Connection, table: Table) -> None:
+    _add_missing_columns(conn, table)
+    for index in table.indexes:
+        conn.execute(CreateIndex(index, if_not_exists=True))
+    create_fts(conn, table)
+
+
+def _create_partition(conn: Connection, name: str) -> None:
+    # IF NOT EXISTS: başka süreç aynı anda oluşturuyorsa hata vermez
+    table = partition_table(name)
+    conn.execute(CreateTable(table, if_not_exists=True))
+    _upgrade_table(conn, table)
+
+
+def upgrade_audit_schema(conn: Connection) -> None:
+    """Mevcut bölümlere ve eski tabloya yeni kolon ve indeksleri ekle (açılışta)"""
+    if inspect(conn).has_table(LEGACY_TABLE):
+        _upgrade_table(conn, AuditLog.__table__)
+    for name in list_partitions(conn):
+        _upgrade_table(conn, partition_table(name))
+        _created.add((conn.engine.url.database, name))
+
+
+def ensure_partition(conn: Connection, name: str) -> Table:
+    """
+    Bölümü yoksa çağıranın işlemi içinde oluştur (SQLite'ta DDL işlemseldir;
+    ayrı bağlantı, işlemin tuttuğu yazma kilidini beklerdi).
+    """
+    key = (conn.engine.url.database, name)
+    if key not in _created:
+        _create_partition(conn, name)
+        _created.add(key)
+    return partition_table(name)
+
+
+def _is_missing_table(error: OperationalError) -> bool:
+    return "no such table" in str(error.orig)
+
+
+def _row(action: str, ip: str, detail: str, user_id: Optional[int], fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "action": action,
+        "ip": ip,
+        "detail": detail,
+        "status": fields.get("status"),
+        "duration_ms": fields.get("duration_ms"),
+        "route": fields.get("route"),
+        "created_at": fields.get("created_at") or datetime.utcnow(),
+    }
+
+
+def _insert(conn: Connection, row: Dict[str, Any]) -> None:
+    name = partition_name(row["created_at"])
+    try:
+        conn.execute(insert(ensure_partition(conn, name)).values(**row))
+    except OperationalError as e:
+        if not _is_missing_table(e):
+            raise
+        # Oluşturan işlem geri alınmış: önbellek bayat, yeniden oluştur
+        _created.discard((conn.engine.url.database, name))
+        conn.execute(insert(ensure_partition(conn, name)).values(**row))
+
+
+def insert_audit_log(
+    db: Session,
+    action: str,
+    ip: str,
+    detail: str,
+    user_id: Optional[int] = None,
+    status: Optional[int] = None,
+    duration_ms: Optional[int] = None,
+    created_at: Optional[datetime] = None,
+    route: Optional[str] = None,
+) -> None:
+    """Kaydı zamanına ait bölüme yaz (commit çağırana aittir)"""
+    fields = {"status": status, "duration_ms": duration_ms, "created_at": created_at, "route": route}
+    _insert(db.connection(), _row(action, ip, detail, user_id, fields))
+
+
+async def insert_audit_log_async(
+    db: AsyncSession,
+    action: str,
+    ip: str,
+    detail: str,
+    user_id: Optional[int] = None,
+    status: Optional[int] = None,
+    duration_ms: Optional[int] = None,
+    created_at: Optional[datetime] = None,
+    route: Optional[str] = None,
+) -> None:
+    """insert_audit_log'un async karşılığı"""
+    fields = {"status": status, "duration_ms": duration_ms, "created_at": created_at, "route": route}
+    conn = await db.connection()
+    await conn.run_sync(_insert, _row(action, ip, detail, user_id, fields))
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    """Veritabanındaki bölüm tabloları, zamana göre sıralı"""
+    names = [name for name in inspect(conn).get_table_names() if partition_bounds(name)]
+    return sorted(names, key=lambda name: partition_bounds(name)[0])
+
+
+def partitions_for_range(
+    conn: Connection,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[str]:
+    """[start, end) aralığıyla kesişen bölümler"""
+    selected = []
+    for name in list_partitions(conn):
+        low, high = partition_bounds(name)
+        if (start is None or high > start) and (end is None or low < end):
+            selected.append(name)
+    return selected
+
+
+def select_audit_logs(
+    conn: Connection,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    include_legacy: bool = True,
+):
+    """
+    Aralıktaki kayıtlar için UNION ALL sorgusu (sadece ilgili bölümler).
+    Her satırda kaydın geldiği tablo `partition` kolonunda döner; id'ler
+    bölüm içinde tekildir. Hiç bölüm yoksa None.
+    """
+    selects = [_table_select(table, start, end) for table in _tables_for_range(conn, start, end, include_legacy)]
+    if not selects:
+        return None
+    return selects[0] if len(selects) == 1 else union_all(*selects)
+
+
+def _tables_for_range(
+    conn: Connection,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    include_legacy: bool,
+) -> List[Table]:
+    tables = [partition_table(name) for name in partitions_for_range(conn, start, end)]
+    if include_legacy and inspect(conn).has_table(LEGACY_TABLE):
+        tables.insert(0, AuditLog.__table__)
+    return tables
+
+
+def _table_select(table: Table, start: Optional[datetime], end: Optional[datetime]):
+    stmt = select(
+        table.c.id,
+        table.c.user_id,
+        table.c.action,
+        table.c.ip,
+        table.c.detail,
+        table.c.status,
+        table.c.duration_ms,
+        table.c.route,
+        table.c.created_at,
+        literal(table.name).label("partition"),
+    )
+    if start is not None:
+        stmt = stmt.where(table.c.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(table.c.created_at < end)
+    return stmt
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Sayfanın son satırından opak keyset imleci"""
+    key = {"t": row["created_at"].isoformat(), "p": row["partition"], "i": row["id"]}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """encode_cursor'ın tersi; geçersiz imleçte ValueError"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {"created_at": datetime.fromisoformat(key["t"]), "partition": str(key["p"]), "id": int(key["i"])}
+    except Exception:
+        raise ValueError("Gecersiz imlec")
+
+
+def _before_cursor(table: Table, after: Dict[str, Any]):
+    """
+    (created_at, partition, id) azalan sırasında imleçten sonraki satırlar.
+    Bölüm adı bu dalda sabit olduğundan koşul created_at aralığına indirgenir
+    ve indeks kullanılabilir.
+    """
+    created_at = table.c.created_at
+    if table.name < after["partition"]:
+        return created_at <= after["created_at"]
+    if table.name > after["partition"]:
+        return created_at < after["created_at"]
+    return or_(
+        created_at < after["created_at"],
+        and_(created_at == after["created_at"], table.c.id < after["id"]),
+    )
+
+
+def query_audit_logs(
+    conn: Connection,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    action_prefix: Optional[str] = None,
+    ip: Optional[str] = None,
+    status: Optional[int] = None,
+    after: Optional[Dict[str, Any]] = None,
+    limit: int = 100,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Filtrelenmiş kayıtlar, en yeniden eskiye; OFFSET yerine keyset sayfalama.
+    Her dal kendi indeksinden en fazla limit+1 satır okur, birleşim yeniden
+    sıralanır. (satırlar, sonraki sayfa imleci veya None) döner.
+    """
+    if after is not None:
+        # İmleçten yeni bölümler okunmaz
+        boundary = after["created_at"] + timedelta(microseconds=1)
+        end = boundary if end is None else min(end, boundary)
+
+    branches = []
+    for table in _tables_for_range(conn, start, end, include_legacy=True):
+        stmt = _table_select(table, start, end)
+        if action_prefix:
+            stmt = stmt.where(table.c.action.startswith(action_prefix, autoescape=True))
+        if ip:
+            stmt = stmt.where(table.c.ip == ip)
+        if status is not None:
+            stmt = stmt.where(table.c.status == status)
+        if after is not None:
+            stmt = stmt.where(_before_cursor(table, after))
+        stmt = stmt.order_by(table.c.created_at.desc(), table.c.id.desc()).limit(limit + 1)
+        branches.append(select(stmt.subquery()))
+    if not branches:
+        return [], None
+
+    merged = union_all(*branches).subquery()
+    stmt = select(merged).order_by(merged.c.created_at.desc(), merged.c.partition.desc(), merged.c.id.desc())
+    rows = [dict(row) for row in conn.execute(stmt.limit(limit + 1)).mappings()]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
+
+
+def drop_partitions_before(conn: Connection, threshold: datetime) -> List[str]:
+    """Tamamı threshold'dan eski bölümleri DROP TABLE ile sil"""
+    dropped = []
+    for name in list_partitions(conn):
+        _, high = partition_bounds(name)
+        if high <= threshold:
+            drop_fts(conn, name)
+            conn.execute(DropTable(partition_table(name), if_exists=True))
+            _created.discard((conn.engine.url.database, name))
+            dropped.append(name)
+    return dropped
+
+
+def search_audit_logs(
+    conn: Connection,
+    query: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    order: str = "rank",
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """
+    action/detail üzerinde tam metin arama (FTS5; yoksa LIKE). "recent" en
+    yeniden eskiye sıralar. Her tablo en fazla limit satır döndürür, sonuçlar
+    birleştirilip kesilir.
+
+    order="rank": bm25 skoru (küçük = daha alakalı) her bölümün kendi FTS
+    istatistiklerine göre hesaplanır ve bölümler arasında karşılaştırılamaz.
+    Bu yüzden sıralama bölüm içindedir: bölümler yeniden eskiye, her bölümün
+    satırları kendi skoruna göre gelir.
+    """
+    use_fts = fts_available(conn)
+    match = to_match_query(query) if use_fts else None
+    terms = None if use_fts else like_terms(query)
+    if not (match or terms):
+        return []
+    if order == "rank" and not use_fts:
+        order = "recent"
+
+    branches = []
+    # Tablolar eskiden yeniye sıralı; rank'ta bölümler bu sıranın tersiyle birleştirilir
+    for position, table in enumerate(_tables_for_range(conn, start, end, include_legacy=True)):
+        stmt = _table_select(table, start, end).add_columns(literal(position).label("partition_order"))
+        if use_fts:
+            hits = fts_select(table, match).subquery()
+            stmt = stmt.add_columns(hits.c.score).join_from(table, hits, hits.c.id == table.c.id)
+        else:
+            stmt = stmt.add_columns(literal(None).label("score")).where(like_filter(table, terms))
+        if order == "rank":
+            stmt = stmt.order_by(literal_column("score"))
+        else:
+            stmt = stmt.order_by(table.c.created_at.desc(), table.c.id.desc())
+        branches.append(select(stmt.limit(limit).subquery()))
+    if not branches:
+        return []
+
+    merged = union_all(*branches).subquery()
+    if order == "rank":
+        ordering = (merged.c.partition_order.desc(), merged.c.score, merged.c.created_at.desc())
+    else:
+        ordering = (merged.c.created_at.desc(), merged.c.partition.desc(), merged.c.id.desc())
+    columns = [column for column in merged.c if column.name != "partition_order"]
+    rows = conn.execute(select(*columns).order_by(*ordering).limit(limit)).mappings()
+    return [dict(row) for row in rows]
@@ -0,0 +1,287 @@
+"""
+Audit kayıtlarından rota/dakika özetleri (sayı, hata sayısı, gecikme histogramı).
+
+Artımlı çalışır: her audit tablosu (eski tablo + bölümler) için işlenmiş son id
+rollup_watermarks'ta tutulur, her turda yalnızca yeni satırlar okunur ve
+route_rollups'a eklenerek (upsert) birleştirilir. Watermark ilerletmesi ile
+özet yazımı aynı işlemdedir; bir satır iki kez sayılmaz, geç yazılan satırlar
+kendi dakikasına eklenir. Sorgular ham kayıtları değil özet satırlarını okur.
+
+Özetler, middleware'in yazdığı rota şablonuyla (route kolonu, orn.
+"GET /history/{scan_id}") anahtarlanır; böylece rota sayısı uygulamadaki
+rotalarla sınırlı kalır. Kolon öncesi kayıtlarda eylem (ham yol) kullanılır.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+
+from ..core.config import settings
+from ..core.database import engine as default_engine
+from ..models.audit import AuditLog
+from ..models.rollup import RollupWatermark, RouteRollup
+from .audit_partitions import LEGACY_TABLE, list_partitions, partition_table
+
+
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BUCKET_COLUMNS = tuple(f"le_{bound}" for bound in BUCKETS_MS) + ("le_inf",)
+COUNTER_COLUMNS = ("count", "error_count", "duration_sum_ms") + BUCKET_COLUMNS
+# 045 öncesi middleware kayıtları: detail="status=200 durationMs=12"
+_LEGACY_DETAIL = re.compile(r"status=(\d+)\s+durationMs=(\d+)")
+
+
+def bucket_column(duration_ms: int) -> str:
+    return BUCKET_COLUMNS[bisect_left(BUCKETS_MS, duration_ms)]
+
+
+def _request_fields(row: Any) -> Optional[Tuple[int, int]]:
+    """(status, duration_ms); HTTP istek kaydı değilse None"""
+    if row.status is not None and row.duration_ms is not None:
+        return row.status, row.duration_ms
+    match = _LEGACY_DETAIL.search(row.detail or "")
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    return None
+
+
+def aggregate_rows(rows: Iterable[Any]) -> Dict[Tuple[str, datetime], Dict[str, Any]]:
+    """Audit satırlarını (rota, dakika) anahtarlı sayaçlara topla"""
+    aggregates: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+    for row in rows:
+        fields = _request_fields(row)
+        if fields is None or row.created_at is None:
+            continue
+        status, duration_ms = fields
+        key = (row.route or row.action, row.created_at.replace(second=0, microsecond=0))
+        entry = aggregates.get(key)
+        if entry is None:
+            entry = aggregates[key] = {column: 0 for column in COUNTER_COLUMNS}
+            entry.update(route=key[0], minute=key[1], duration_max_ms=0)
+        entry["count"] += 1
+        entry["error_count"] += status >= 500
+        entry["duration_sum_ms"] += duration_ms
+        entry["duration_max_ms"] = max(entry["duration_max_ms"], duration_ms)
+        entry[bucket_column(duration_ms)] += 1
+    return aggregates
+
+
+def _upsert(conn: Connection, entries: List[Dict[str, Any]]) -> None:
+    table = RouteRollup.__table__
+    stmt = sqlite_insert(table)
+    set_ = {column: table.c[column] + stmt.excluded[column] for column in COUNTER_COLUMNS}
+    set_["duration_max_ms"] = func.max(table.c.duration_max_ms, stmt.excluded.duration_max_ms)
+    conn.execute(stmt.on_conflict_do_update(index_elements=["route", "minute"], set_=set_), entries)
+
+
+class RouteRollupJob:
+    """Audit tablolarındaki yeni satırları route_rollups'a işleyen artımlı iş"""
+
+    def __init__(self, bind: Engine = default_engine, batch_size: int = 5000):
+        self.bind = bind
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self.running = False
+        self.runs = 0
+        self.rows_processed = 0
+        self.conflicts = 0
+        self.last_run: Dict[str, Any] = {}
+
+    def _sources(self, conn: Connection) -> List[Table]:
+        tables = [partition_table(name) for name in list_partitions(conn)]
+        if conn.dialect.has_table(conn, LEGACY_TABLE):
+            tables.insert(0, AuditLog.__table__)
+        return tables
+
+    def _read_batch(self, table: Table) -> Tuple[int, List[Any]]:
+        """Watermark ve sonraki satırlar; okuma ayrı (kısa) işlemde yapılır"""
+        with self.bind.connect() as conn:
+            last_id = conn.execute(
+                select(RollupWatermark.last_id).where(RollupWatermark.source == table.name)
+            ).scalar() or 0
+            rows = conn.execute(
+                select(
+                    table.c.id,
+                    table.c.action,
+                    table.c.route,
+                    table.c.status,
+                    table.c.duration_ms,
+                    table.c.detail,
+                    table.c.created_at,
+                )
+                .where(table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(self.batch_size)
+            ).all()
+        return last_id, rows
+
+    def _apply(self, source: str, last_id: int, new_last_id: int, entries: List[Dict[str, Any]]) -> bool:
+        """Watermark'ı koşullu ilerlet ve özetleri aynı işlemde yaz"""
+        with self.bind.begin() as conn:
+            # İlk ifade yazma: kilit baştan alınır
+            conn.execute(
+                sqlite_insert(RollupWatermark).values(source=source, last_id=0).on_conflict_do_nothing()
+            )
+            advanced = conn.execute(
+                update(RollupWatermark)
+                .where(RollupWatermark.source == source, RollupWatermark.last_id == last_id)
+                .values(last_id=new_last_id, updated_at=datetime.utcnow())
+            ).rowcount
+            if not advanced:
+                # Başka bir süreç aynı aralığı işlemiş
+                return False
+            if entries:
+                _upsert(conn, entries)
+        return True
+
+    def _process(self, table: Table) -> int:
+        processed = 0
+        while True:
+            last_id, rows = self._read_batch(table)
+            if not rows:
+                return processed
+            entries = list(aggregate_rows(rows).values())
+            if not self._apply(table.name, last_id, rows[-1].id, entries):
+                self.conflicts += 1
+                return processed
+            processed += len(rows)
+            if len(rows) < self.batch_size:
+                return processed
+
+    def _forget_dropped(self, conn: Connection, sources: Sequence[str]) -> None:
+        stale = conn.execute(
+            select(RollupWatermark.source).where(RollupWatermark.source.not_in(sources))
+        ).scalars().all()
+        if stale:
+            with self.bind.begin() as write:
+                write.execute(delete(RollupWatermark).where(RollupWatermark.source.in_(stale)))
+
+    def run(self) -> Dict[str, Any]:
+        with self._lock:
+            if self.running:
+                return {"skipped": True}
+            self.running = True
+
+        started = time.perf_counter()
+        processed = 0
+        status = "done"
+        try:
+            with self.bind.connect() as conn:
+                tables = self._sources(conn)
+                self._forget_dropped(conn, [table.name for table in tables])
+            for table in tables:
+                processed += self._process(table)
+        except Exception as e:
+            status = "error"
+            print(f"[X] Rollup hatasi: {str(e)}")
+        finally:
+            elapsed = time.perf_counter() - started
+            self.last_run = {
+                "finished_at": datetime.utcnow().isoformat(),
+                "status": status,
+                "rows": processed,
+                "seconds": round(elapsed, 3),
+            }
+            self.runs += 1
+            self.rows_processed += processed
+            self.running = False
+        return self.last_run
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "runs_total": self.runs,
+            "rows_processed_total": self.rows_processed,
+            "conflicts_total": self.conflicts,
+            "last_run": self.last_run,
+        }
+
+
+route_rollup_job = RouteRollupJob(batch_size=settings.rollup_batch_size)
+
+
+def prune_rollups(threshold: datetime, bind: Engine = default_engine) -> int:
+    """threshold'dan eski dakika özetlerini sil"""
+    with bind.begin() as conn:
+        return conn.execute(delete(RouteRollup).where(RouteRollup.minute < threshold)).rowcount or 0
+
+
+def histogram_percentile(buckets: Sequence[int], q: float, max_ms: int) -> Optional[float]:
+    """Kova sayılarından q yüzdeliği (kova içinde doğrusal enterpolasyon)"""
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(buckets):
+        if count and seen + count >= rank:
+            lower = BUCKETS_MS[i - 1] if i > 0 else 0
+            upper = BUCKETS_MS[i] if i < len(BUCKETS_MS) else max_ms
+            value = lower + (min(upper, max_ms) - lower) * (rank - seen) / count
+            return round(min(max(value, lower), max_ms), 1)
+        seen += count
+    return float(max_ms)
+
+
+def _summary(counters: Dict[str, int], max_ms: int) -> Dict[str, Any]:
+    count = counters["count"]
+    buckets = [counters[column] for column in BUCKET_COLUMNS]
+    return {
+        "count": count,
+        "error_count": counters["error_count"],
+        "error_rate": round(counters["error_count"] / count, 4) if count else 0.0,
+        "avg_ms": round(counters["duration_sum_ms"] / count, 1) if count else None,
+        "p50_ms": histogram_percentile(buckets, 0.50, max_ms),
+        "p95_ms": histogram_percentile(buckets, 0.95, max_ms),
+        "p99_ms": histogram_percentile(buckets, 0.99, max_ms),
+        "max_ms": max_ms if count else None,
+    }
+
+
+def query_rollups(
+    conn: Connection,
+    start: datetime,
+    end: datetime,
+    route: Optional[str] = None,
+    step_minutes: int = 1,
+) -> Dict[str, Any]:
+    """
+    [start, end) aralığında step_minutes'lık pencereler ve tüm aralığın özeti.
+    route verilmezse tüm rotalar birlikte toplanır.
+    """
+    table = RouteRollup.__table__
+    stmt = select(table).where(table.c.minute >= start, table.c.minute < end)
+    if route:
+        stmt = stmt.where(table.c.route == route)
+
+    origin = start.replace(second=0, microsecond=0)
+    step = timedelta(minutes=step_minutes)
+    windows: Dict[datetime, Dict[str, int]] = {}
+    window_max: Dict[datetime, int] = {}
+    total = {column: 0 for column in COUNTER_COLUMNS}
+    total_max = 0
+    for row in conn.execute(stmt.order_by(table.c.minute)).mappings():
+        window = origin + step * ((row["minute"] - origin) // step)
+        counters = windows.setdefault(window, {column: 0 for column in COUNTER_COLUMNS})
+        for column in COUNTER_COLUMNS:
+            counters[column] += row[column]
+            total[column] += row[column]
+        window_max[window] = max(window_max.get(window, 0), row["duration_max_ms"])
+        total_max = max(total_max, row["duration_max_ms"])
+
+    return {
+        "route": route,
+        "start": start,
+        "end": end,
+        "step_minutes": step_minutes,
+        "summary": _summary(total, total_max),
+        "windows": [
+            {"start": window, **_summary(counters, window_max[window])}
+            for window, counters in sorted(windows.items())
+        ],
+    }
@@ -1,58 +1,94 @@
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
-from sqlalchemy.orm import Session
+from ..core.config import settings
 from ..core.database import SessionLocal
 from ..models.audit import AuditLog
-from .encryption import cleanup_expired_data
+from ..models.scan_history import ScanRecord
+from .audit_partitions import drop_partitions_before
+from .audit_rollups import prune_rollups, route_rollup_job
+from .monitoring import monitor_scheduler
+from .retention import register_retention_job
+
+
+# Bölümleme öncesi kayıtlar (eski audit_logs tablosu) parça parça silinir
+legacy_audit_retention = register_retention_job(AuditLog.__table__)
+scan_history_retention = register_retention_job(ScanRecord.__table__)
 
 
 def cleanup_old_data(days: int = 30):
-    """Eski audit loglarını temizle"""
+    """Eski audit loglarını, rota özetlerini ve tarama geçmişini temizle"""
+    threshold = datetime.utcnow() - timedelta(days=days)
     db = SessionLocal()
     try:
-        threshold = datetime.utcnow() - timedelta(days=days)
-        deleted_count = db.query(AuditLog).filter(AuditLog.created_at < threshold).delete()
+        dropped = drop_partitions_before(db.connection(), threshold)
         db.commit()
-        print(f"[OK] {deleted_count} eski audit log temizlendi")
+        print(f"[OK] {len(dropped)} audit bolumu temizlendi")
     except Exception as e:
         print(f"[X] Audit log temizleme hatası: {str(e)}")
         db.rollback()
     finally:
         db.close()
 
-
-def cleanup_encrypted_data():
-    """Şifrelenmiş verileri temizle"""
     try:
-        cleanup_expired_data()
+        pruned = prune_rollups(datetime.utcnow() - timedelta(days=settings.rollup_retention_days))
+        print(f"[OK] {pruned} eski rota ozeti temizlendi")
     except Exception as e:
-        print(f"[X] Şifrelenmiş veri temizleme hatası: {str(e)}")
+        print(f"[X] Rota ozeti temizleme hatası: {str(e)}")
+
+    _run_retention(legacy_audit_retention, threshold, "eski audit log")
+    _run_retention(
+        scan_history_retention,
+        datetime.utcnow() - timedelta(days=settings.scan_history_retention_days),
+        "eski tarama kaydi",
+    )
+
+
+def _run_retention(job, threshold: datetime, label: str) -> None:
+    result = job.run(threshold)
+    if result.get("status") == "done":
+        print(
+            f"[OK] {result['rows_deleted']} {label} temizlendi "
+            f"({result['batches']} parti, {result['rows_per_sec']:.0f} satir/sn, "
+            f"en uzun kilit {result['max_lock_ms']:.1f} ms)"
+        )
 
 
 def start_scheduler():
     """Zamanlanmış görevleri başlat"""
     scheduler = BackgroundScheduler()
     
-    # Audit log temizleme (günde bir)
+    # Audit log temizleme (günde bir); açılışta değil, gecikmeli başlar
     scheduler.add_job(
         cleanup_old_data, 
         "interval", 
         hours=24, 
         id="audit-cleanup-job",
-        next_run_time=datetime.utcnow()
+        next_run_time=datetime.now() + timedelta(seconds=settings.retention_initial_delay_s),
+        max_instances=1,
+        coalesce=True,
     )
-    
-    # Şifrelenmiş veri temizleme (günde bir)
+
+    # Audit kayıtlarından rota/dakika özetleri (artımlı)
     scheduler.add_job(
-        cleanup_encrypted_data,
+        route_rollup_job.run,
         "interval",
-        hours=24,
-        id="encrypted-data-cleanup-job",
-        next_run_time=datetime.utcnow()
+        seconds=settings.rollup_interval_s,
+        id="audit-rollup-job",
+        max_instances=1,
+        coalesce=True,
     )
+
+    # Footprint izleme: vadesi gelen kimlikler sınırlı sayıda, sırayla taranır
+    if settings.monitoring_enabled:
+        scheduler.add_job(
+            monitor_scheduler.tick,
+            "interval",
+            seconds=settings.monitor_tick_s,
+            id="monitor-tick-job",
+            max_instances=1,
+            coalesce=True,
+        )
     
     scheduler.start()
     print("[OK] Zamanlanmış temizleme görevleri başlatıldı")
     return scheduler
-
-
@@ -2,13 +2,39 @@
 API anahtarları için şifreleme servisi
 """
 import os
+import json
 import base64
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from ..core.config import settings
 
 
+# KDF tipleri: pbkdf2 -> her öğe için parola + salt'tan PBKDF2 (eski format)
+#              hkdf   -> süreç başına tek PBKDF2 master key + öğe salt'ı ile HKDF
+KDF_PBKDF2 = "pbkdf2"
+KDF_HKDF = "hkdf"
+
+PBKDF2_ITERATIONS = 100000
+MASTER_KEY_SALT = b"dijital-ayak-izi/master-key/v1"
+SUBKEY_INFO = b"dijital-ayak-izi/item-key/v1"
+
+CONFIG_KEYS = [
+    "google_api_key",
+    "google_search_engine_id",
+    "google_maps_api_key",
+    "google_places_api_key",
+    "google_youtube_api_key",
+    "google_vision_api_key",
+    "scraperapi_key",
+    "hibp_api_key",
+]
+
+
 def generate_key_from_password(password: str, salt: bytes = None) -> bytes:
     """Şifre ve salt'tan anahtar üret"""
     if salt is None:
@@ -18,12 +44,88 @@ def generate_key_from_password(password: str, salt: bytes = None) -> bytes:
         algorithm=hashes.SHA256(),
         length=32,
         salt=salt,
-        iterations=100000,
+        iterations=PBKDF2_ITERATIONS,
     )
     key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
     return key, salt
 
 
+class KeyManager:
+    """
+    Parola başına master key'i bir kez türetir; öğe anahtarlarını ucuz bir
+    HKDF adımıyla üretir ve Fernet örneklerini LRU önbellekte tutar.
+    """
+
+    def __init__(self, password: str, cache_size: int = 256):
+        self._password = password
+        self._master_key: Optional[bytes] = None
+        self._fernets: "OrderedDict[bytes, Fernet]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def _get_master_key(self) -> bytes:
+        if self._master_key is None:
+            with self._lock:
+                if self._master_key is None:
+                    kdf = PBKDF2HMAC(
+                        algorithm=hashes.SHA256(),
+                        length=32,
+                        salt=MASTER_KEY_SALT,
+                        iterations=PBKDF2_ITERATIONS,
+                    )
+                    self._master_key = kdf.derive(self._password.encode())
+        return self._master_key
+
+    def fernet_for(self, salt: bytes) -> Fernet:
+        """Salt'a özel alt anahtarla Fernet örneği (önbellekli)"""
+        with self._lock:
+            fernet = self._fernets.get(salt)
+            if fernet is not None:
+                self._fernets.move_to_end(salt)
+                return fernet
+
+        hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=SUBKEY_INFO)
+        subkey = hkdf.derive(self._get_master_key())
+        fernet = Fernet(base64.urlsafe_b64encode(subkey))
+
+        with self._lock:
+            self._fernets[salt] = fernet
+            while len(self._fernets) > self._cache_size:
+                self._fernets.popitem(last=False)
+        return fernet
+
+    def encrypt(self, plaintext: str) -> dict:
+        salt = os.urandom(16)
+        token = self.fernet_for(salt).encrypt(plaintext.encode())
+        return {
+            "encrypted": base64.urlsafe_b64encode(token).decode(),
+            "salt": base64.urlsafe_b64encode(salt).decode(),
+            "kdf": KDF_HKDF,
+            "error": None
+        }
+
+    def decrypt(self, encrypted_data: str, salt: str) -> str:
+        salt_bytes = base64.urlsafe_b64decode(salt.encode())
+        token = base64.urlsafe_b64decode(encrypted_data.encode())
+        return self.fernet_for(salt_bytes).decrypt(token).decode()
+
+
+_key_manager: Optional[KeyManager] = None
+_key_manager_lock = threading.Lock()
+
+
+def get_key_manager(password: Optional[str] = None) -> KeyManager:
+    """secret_key için süreç genelinde tek KeyManager; farklı parolalar için geçici örnek"""
+    global _key_manager
+    if password is not None and password != settings.secret_key:
+        return KeyManager(password)
+    if _key_manager is None:
+        with _key_manager_lock:
+            if _key_manager is None:
+                _key_manager = KeyManager(settings.secret_key)
+    return _key_manager
+
+
 def encrypt_api_key(api_key: str, password: str) -> dict:
     """API anahtarını şifrele"""
     if not api_key:
@@ -43,12 +145,18 @@ def encrypt_api_key(api_key: str, password: str) -> dict:
         return {"encrypted": "", "salt": "", "error": str(e)}
 
 
-def decrypt_api_key(encrypted_data: str, salt: str, password: str) -> dict:
+def decrypt_api_key(encrypted_data: str, salt: str, password: str, kdf: str = KDF_PBKDF2) -> dict:
     """Şifrelenmiş API anahtarını çöz"""
     if not encrypted_data or not salt:
         return {"decrypted": "", "error": "Encrypted data or salt is empty"}
     
     try:
+        if kdf == KDF_HKDF:
+            return {
+                "decrypted": get_key_manager(password).decrypt(encrypted_data, salt),
+                "error": None
+            }
+
         # Salt'ı decode et
         salt_bytes = base64.urlsafe_b64decode(salt.encode())
         
@@ -65,32 +173,95 @@ def decrypt_api_key(encrypted_data: str, salt: str, password: str) -> dict:
             "error": None
         }
     except Exception as e:
-        return {"decrypted": "", "error": str(e)}
+        # InvalidToken gibi bazı hatalar boş mesaj taşır
+        return {"decrypted": "", "error": str(e) or type(e).__name__}
+
+
+_encrypted_config: Optional[Dict[str, dict]] = None
+_encrypted_config_lock = threading.Lock()
+
+
+def _config_plaintexts() -> Dict[str, str]:
+    return {key: getattr(settings, key) or "" for key in CONFIG_KEYS}
+
+
+def _load_persisted_config(manager: KeyManager, plaintexts: Dict[str, str]) -> Dict[str, dict]:
+    """Diskteki blob'ları yükle; güncel değerle eşleşmeyenleri at"""
+    path = settings.encrypted_config_path
+    if not path or not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except Exception as e:
+        print(f"[X] Sifreli konfigurasyon okunamadi: {str(e)}")
+        return {}
+
+    valid = {}
+    for key, plaintext in plaintexts.items():
+        item = stored.get(key)
+        if not plaintext or not item or item.get("kdf") != KDF_HKDF:
+            continue
+        try:
+            if manager.decrypt(item["encrypted"], item["salt"]) == plaintext:
+                valid[key] = item
+        except Exception:
+            continue
+    return valid
+
+
+def _persist_config(config: Dict[str, dict]) -> None:
+    path = settings.encrypted_config_path
+    if not path:
+        return
+    try:
+        tmp_path = f"{path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"[X] Sifreli konfigurasyon kaydedilemedi: {str(e)}")
 
 
 def get_encrypted_config() -> dict:
-    """Şifrelenmiş konfigürasyon döndür"""
-    password = settings.secret_key  # Şifre olarak secret key kullan
+    """Şifrelenmiş konfigürasyon döndür (süreç başına bir kez üretilir ve diske yazılır)"""
+    global _encrypted_config
+    if _encrypted_config is not None:
+        return {key: dict(item) for key, item in _encrypted_config.items()}
     
-    config = {
-        "google_api_key": encrypt_api_key(settings.google_api_key or "", password),
-        "google_search_engine_id": encrypt_api_key(settings.google_search_engine_id or "", password),
-        "google_maps_api_key": encrypt_api_key(settings.google_maps_api_key or "", password),
-        "google_places_api_key": encrypt_api_key(settings.google_places_api_key or "", password),
-        "google_youtube_api_key": encrypt_api_key(settings.google_youtube_api_key or "", password),
-        "google_vision_api_key": encrypt_api_key(settings.google_vision_api_key or "", password),
-        "scraperapi_key": encrypt_api_key(settings.scraperapi_key or "", password),
-        "hibp_api_key": encrypt_api_key(settings.hibp_api_key or "", password)
-    }
+    with _encrypted_config_lock:
+        if _encrypted_config is None:
+            manager = get_key_manager()
+            plaintexts = _config_plaintexts()
+            config = _load_persisted_config(manager, plaintexts)
+            changed = False
     
-    return config
+            for key, plaintext in plaintexts.items():
+                if key in config:
+                    continue
+                if not plaintext:
+                    config[key] = {"encrypted": "", "salt": "", "error": "API key is empty"}
+                    continue
+                try:
+                    config[key] = manager.encrypt(plaintext)
+                except Exception as e:
+                    config[key] = {"encrypted": "", "salt": "", "error": str(e)}
+                changed = True
+
+            if changed:
+                _persist_config(config)
+            _encrypted_config = config
+
+    return {key: dict(item) for key, item in _encrypted_config.items()}
 
 
 def get_decrypted_config() -> dict:
     """Şifrelenmiş konfigürasyondan orijinal değerleri al"""
     password = settings.secret_key
     
-    # Şifrelenmiş değerler (gerçek uygulamada veritabanından gelecek)
+    # Şifrelenmiş değerler (önbellekten / diskten)
     encrypted_config = get_encrypted_config()
     
     decrypted_config = {}
@@ -99,7 +270,8 @@ def get_decrypted_config() -> dict:
             result = decrypt_api_key(
                 encrypted_data["encrypted"],
                 encrypted_data["salt"],
-                password
+                password,
+                encrypted_data.get("kdf", KDF_PBKDF2)
             )
             decrypted_config[key] = result.get("decrypted", "")
         else:
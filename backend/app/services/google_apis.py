@@ -4,6 +4,8 @@ Google API'leri için servis fonksiyonları
 import os
 from typing import List, Dict, Any, Optional
 from ..core.config import settings
+from .image_cache import image_cache, url_key
+from .image_remote import fetch_validators, is_fresh, revalidate
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import requests
@@ -128,13 +130,32 @@ def search_google_places(query: str, location: str = None, radius: int = 50000)
 
 def analyze_image_with_vision(image_url: str) -> Dict[str, Any]:
     """
-    Google Vision API ile görsel analiz
-    Endpoint: https://vision.googleapis.com/v1/images:annotate
+    Google Vision API ile görsel analiz (önbellekli).
+    Sonuç görsel önbelleğinde URL + ETag ile saklanır; görsel değişmedikçe
+    aynı URL için API tekrar çağrılmaz.
     """
     if not settings.google_vision_api_key:
         print("[!] Vision API anahtarı bulunamadı")
         return {}
 
+    key = url_key(image_url)
+    entry = image_cache.get(key)
+    if entry and entry.get("vision") and (is_fresh(entry) or revalidate(image_url, entry)):
+        print(f"[OK] Vision API analizi onbellekten: {image_url}")
+        return entry["vision"]
+
+    validators = fetch_validators(image_url)
+    analysis = _annotate_with_vision(image_url)
+    if analysis:
+        image_cache.update(key, vision=analysis, **validators)
+    return analysis
+
+
+def _annotate_with_vision(image_url: str) -> Dict[str, Any]:
+    """
+    Google Vision API çağrısı
+    Endpoint: https://vision.googleapis.com/v1/images:annotate
+    """
     try:
         print(f"[>] Vision API görsel analizi: {image_url}")
         
@@ -1,52 +1,147 @@
-from typing import Any, Dict
+from typing import Any, BinaryIO, Dict, Iterable, Optional, Tuple, Union
 import io
 from PIL import Image
 import imagehash
-import exifread
 
+from .image_metadata import extract_header_metadata, extract_metadata
 
-def extract_exif_geotags(exif_tags: Dict[str, Any]) -> Dict[str, Any]:
-    gps_lat = exif_tags.get('GPS GPSLatitude')
-    gps_lat_ref = exif_tags.get('GPS GPSLatitudeRef')
-    gps_lon = exif_tags.get('GPS GPSLongitude')
-    gps_lon_ref = exif_tags.get('GPS GPSLongitudeRef')
 
-    def to_deg(value):
-        try:
-            d = float(value.values[0].num) / float(value.values[0].den)
-            m = float(value.values[1].num) / float(value.values[1].den)
-            s = float(value.values[2].num) / float(value.values[2].den)
-            return d + (m/60.0) + (s/3600.0)
-        except Exception:
-            return None
+# pHash sonunda 32x32 gri tonlu girişle çalışır. JPEG'leri bunun 8 katına
+# kadar DCT ölçekli (draft) decode etmek yeterli; tam çözünürlük hiç açılmaz.
+HASH_DECODE_SIZE = 256
 
-    lat = to_deg(gps_lat) if gps_lat else None
-    lon = to_deg(gps_lon) if gps_lon else None
-    if lat is not None and gps_lat_ref and gps_lat_ref.values in ['S']:
-        lat = -lat
-    if lon is not None and gps_lon_ref and gps_lon_ref.values in ['W']:
-        lon = -lon
-    return {"lat": lat, "lon": lon}
+# Hash'lerin üretildiği decode yolunun sürümü. Draft decode tam çözünürlükle
+# bit bit aynı sonucu vermez (birkaç bit fark), bu yüzden saklanan hash'ler
+# sürümüyle tutulur ve farklı sürümler birbiriyle karşılaştırılmaz.
+#   1: tam çözünürlük decode (imagehash'in kendi yolu)
+#   2: draft + decode sırasında gri ton
+#   3: gri ton her zaman "L" draft'tan (2'de colorhash istenince RGB draft'tan
+#      dönüştürülüyordu); colorhash için ayrı RGB decode
+HASH_VERSION = 3
 
 
-def analyze_image(file_bytes: bytes) -> Dict[str, Any]:
-    # pHash
-    with Image.open(io.BytesIO(file_bytes)) as img:
-        img = img.convert('RGB')
-        phash = str(imagehash.phash(img))
+def decode_for_hash(img: Image.Image, max_pixels: Optional[int] = None, mode: str = "L") -> Image.Image:
+    """Hash için küçültülmüş decode + erken gri tona (veya RGB'ye) indirgeme"""
+    if img.format == "JPEG":
+        # draft, decode sırasında 1/2, 1/4 veya 1/8 ölçekleme seçer; "L" ile
+        # yalnızca parlaklık kanalı çözülür, renk kanalları hiç açılmaz
+        img.draft(mode, (HASH_DECODE_SIZE, HASH_DECODE_SIZE))
+    if max_pixels and img.width * img.height > max_pixels:
+        raise ValueError(f"Goruntu cok buyuk: {img.width}x{img.height}")
+    return img.convert(mode)
+
+
+def compute_phash(img: Image.Image, max_pixels: Optional[int] = None) -> str:
+    """Hızlı yol ile pHash (imagehash.phash ile aynı algoritma)"""
+    return str(imagehash.phash(decode_for_hash(img, max_pixels)))
+
+
+# Çoklu hash: gri ton hash'ler aynı decode edilmiş tampondan hesaplanır.
+# colorhash RGB (HSV) ister, diğerleri gri ton.
+HASH_FUNCTIONS = {
+    "phash": imagehash.phash,
+    "dhash": imagehash.dhash,
+    "ahash": imagehash.average_hash,
+    "whash": imagehash.whash,
+    "colorhash": imagehash.colorhash,
+}
+COLOR_HASHES = {"colorhash"}
+
+
+def normalize_hash_kinds(kinds: Union[str, Iterable[str], None]) -> Tuple[str, ...]:
+    """"all", virgüllü liste veya isim listesi -> geçerli hash adları"""
+    if not kinds:
+        return ()
+    if isinstance(kinds, str):
+        kinds = [k.strip().lower() for k in kinds.split(",") if k.strip()]
+    if "all" in kinds:
+        return tuple(HASH_FUNCTIONS)
+    unknown = [k for k in kinds if k not in HASH_FUNCTIONS]
+    if unknown:
+        raise ValueError(f"Bilinmeyen hash turu: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(kinds))
+
 
-    # EXIF
-    bio = io.BytesIO(file_bytes)
-    bio.seek(0)
-    tags = exifread.process_file(bio, details=False)
-    gps = extract_exif_geotags(tags)
+def compute_hashes(
+    fileobj: BinaryIO,
+    kinds: Iterable[str],
+    max_pixels: Optional[int] = None,
+) -> Dict[str, str]:
+    """
+    İstenen hash'leri hesapla. Gri ton hash'ler, hangi hash'ler istenirse
+    istensin compute_phash ile aynı "L" decode'undan gelir; colorhash için
+    dosya ayrıca RGB olarak açılır (draft yalnızca ilk decode'dan önce seçilebilir).
+    """
+    kinds = normalize_hash_kinds(list(kinds))
+    fileobj.seek(0)
+    with Image.open(fileobj) as img:
+        gray = decode_for_hash(img, max_pixels)
+    rgb = None
+    if any(kind in COLOR_HASHES for kind in kinds):
+        fileobj.seek(0)
+        with Image.open(fileobj) as img:
+            rgb = decode_for_hash(img, max_pixels, mode="RGB")
 
     return {
+        kind: str(HASH_FUNCTIONS[kind](rgb if kind in COLOR_HASHES else gray))
+        for kind in kinds
+    }
+
+
+def analyze_image_file(
+    fileobj: BinaryIO,
+    header: Optional[bytes] = None,
+    header_complete: bool = False,
+    exif: Optional[Dict[str, Any]] = None,
+    max_pixels: Optional[int] = None,
+    hashes: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """
+    Dosya benzeri nesne üzerinden analiz. Metadata önce ilk baytlardan (header)
+    okunur; segmentler başlığa sığmıyorsa dosya görüntü verisine kadar okunur.
+    hashes verilirse pHash ile birlikte diğer hash'ler de aynı decode'dan döner.
+    """
+    # pHash (+ istenen diğer hash'ler)
+    fileobj.seek(0)
+    extra = normalize_hash_kinds(list(hashes))
+    if extra:
+        fingerprints = compute_hashes(fileobj, ("phash",) + extra, max_pixels)
+        phash = fingerprints["phash"]
+    else:
+        fingerprints = None
+        with Image.open(fileobj) as img:
+            phash = compute_phash(img, max_pixels)
+
+    # Metadata: tek geçiş; önce ilk baytlar, metadata sığmadıysa dosyanın kendisi
+    if exif is None and header is not None:
+        exif = extract_header_metadata(header, header_complete)
+    if exif is None:
+        exif = extract_metadata(fileobj)
+
+    result = {
         "phash": phash,
-        "exif": {
-            "gps": gps,
-            "has_exif": len(tags) > 0
-        }
+        "hash_version": HASH_VERSION,
+        "exif": exif
     }
+    if fingerprints is not None:
+        result["hashes"] = fingerprints
+    return result
+
 
+def analyze_image_source(
+    source: Union[bytes, str],
+    header: Optional[bytes] = None,
+    header_complete: bool = False,
+    exif: Optional[Dict[str, Any]] = None,
+    max_pixels: Optional[int] = None,
+    hashes: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """İşçi süreç giriş noktası: bellekteki içerik veya diskteki dosya yolu"""
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return analyze_image_file(f, header, header_complete, exif, max_pixels, hashes)
+    return analyze_image_file(io.BytesIO(source), header, header_complete, exif, max_pixels, hashes)
 
+
+def analyze_image(file_bytes: bytes) -> Dict[str, Any]:
+    return analyze_image_file(io.BytesIO(file_bytes), header=file_bytes, header_complete=True)
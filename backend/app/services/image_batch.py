@@ -0,0 +1,228 @@
+"""
+Toplu görsel analizi: çoklu dosya veya tek zip/tar arşivi.
+Arşivler diske açılmaz; üyeler tek tek okunup analiz motoruna gönderilir.
+Aynı içerik (sha256) yalnızca bir kez analiz edilir.
+"""
+import asyncio
+import tarfile
+import zipfile
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ..core.config import settings
+from ..core.executors import run_blocking
+from .image_engine import ImageAnalysisEngine, ImageEngineBusy, ImageEngineTimeout
+from .image_upload import SpooledUpload, UploadTooLarge
+
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+MEMBER_CHUNK_SIZE = 64 * 1024
+
+
+def is_archive_name(filename: str) -> bool:
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def upload_limit(filename: str) -> int:
+    """Parça sınırı gövde okunurken uygulanır: arşiv uzantılılara arşiv, diğerlerine görsel sınırı"""
+    return settings.image_archive_max_bytes if is_archive_name(filename) else settings.image_max_upload_bytes
+
+
+def is_archive(upload: SpooledUpload) -> bool:
+    """Dosya adı veya sihirli baytlara göre zip/tar mı"""
+    if is_archive_name(upload.filename):
+        return True
+    header = upload.header
+    return header.startswith(b"PK\x03\x04") or header[257:262] == b"ustar"
+
+
+def _skip_member(name: str) -> bool:
+    # macOS/dosya sistemi artıkları analiz edilmez
+    base = name.rsplit("/", 1)[-1]
+    return not base or base.startswith(".") or name.startswith("__MACOSX/")
+
+
+def _spool_member(name: str, stream, max_bytes: int) -> SpooledUpload:
+    upload = SpooledUpload(
+        field_name="archive",
+        filename=name,
+        max_bytes=max_bytes,
+        header_limit=settings.image_header_bytes,
+    )
+    try:
+        while True:
+            chunk = stream.read(MEMBER_CHUNK_SIZE)
+            if not chunk:
+                break
+            upload.write(chunk)
+        upload.finish()
+    except Exception:
+        upload.close()
+        raise
+    return upload
+
+
+def iter_archive_members(
+    archive: SpooledUpload,
+    max_members: int,
+    max_member_bytes: int,
+) -> Iterator[Tuple[str, Optional[SpooledUpload], Optional[str]]]:
+    """
+    Arşiv üyelerini (ad, yükleme, hata) olarak sırayla döndür.
+    Zip merkezi dizin üzerinden, tar ise akış modunda ("r|*") okunur.
+    """
+    archive.file.seek(0)
+    count = 0
+
+    def member(name, open_stream):
+        try:
+            with open_stream() as stream:
+                return name, _spool_member(name, stream, max_member_bytes), None
+        except UploadTooLarge as e:
+            return name, None, str(e)
+        except Exception as e:
+            return name, None, str(e) or type(e).__name__
+
+    if zipfile.is_zipfile(archive.file):
+        archive.file.seek(0)
+        with zipfile.ZipFile(archive.file) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or _skip_member(info.filename):
+                    continue
+                count += 1
+                if count > max_members:
+                    yield info.filename, None, f"Arsivde en fazla {max_members} dosya islenir"
+                    return
+                if info.file_size > max_member_bytes:
+                    yield info.filename, None, f"Dosya en fazla {max_member_bytes} bayt olabilir"
+                    continue
+                yield member(info.filename, lambda info=info: zf.open(info))
+        return
+
+    archive.file.seek(0)
+    with tarfile.open(fileobj=archive.file, mode="r|*") as tf:
+        for info in tf:
+            if not info.isfile() or _skip_member(info.name):
+                continue
+            count += 1
+            if count > max_members:
+                yield info.name, None, f"Arsivde en fazla {max_members} dosya islenir"
+                return
+            if info.size > max_member_bytes:
+                yield info.name, None, f"Dosya en fazla {max_member_bytes} bayt olabilir"
+                continue
+            yield member(info.name, lambda info=info: tf.extractfile(info))
+
+
+class ImageBatch:
+    """
+    Yüklemeleri analiz motoruna paralel gönderir ve sonuçları tamamlandıkça verir.
+    add() eşzamanlılık sınırında bekler; böylece gövde/arşiv okuması da yavaşlar
+    ve bellekte en fazla `concurrency` dosya tutulur.
+    """
+
+    def __init__(self, engine: ImageAnalysisEngine, concurrency: int, hashes: Sequence[str] = ()):
+        self._engine = engine
+        self._hashes = tuple(hashes)
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._by_hash: Dict[str, Tuple[str, asyncio.Task]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._index = 0
+        self.files = 0
+        self.unique = 0
+        self.errors = 0
+
+    def _next_index(self) -> int:
+        index = self._index
+        self._index += 1
+        self.files += 1
+        return index
+
+    async def _analyze(self, upload: SpooledUpload) -> Dict[str, Any]:
+        return await self._engine.analyze_upload(upload, hashes=self._hashes)
+
+    def _release(self, upload: SpooledUpload, task: asyncio.Task) -> None:
+        # Done callback: başlamadan iptal edilen görevde de çalışır
+        upload.close()
+        self._slots.release()
+
+    async def _report(
+        self,
+        index: int,
+        upload_info: Dict[str, Any],
+        analysis: asyncio.Task,
+        duplicate_of: Optional[str],
+    ) -> Dict[str, Any]:
+        line = {"index": index, **upload_info}
+        if duplicate_of is not None:
+            line["duplicate_of"] = duplicate_of
+        try:
+            line["result"] = await asyncio.shield(analysis)
+            line["status"] = "ok"
+        except ImageEngineBusy:
+            line.update(status="error", error="Gorsel analiz kuyrugu dolu")
+        except ImageEngineTimeout as e:
+            line.update(status="error", error=str(e))
+        except Exception:
+            line.update(status="error", error="Gecersiz veya desteklenmeyen goruntu")
+        if line["status"] == "error":
+            self.errors += 1
+        return line
+
+    async def add(self, upload: SpooledUpload) -> None:
+        """Yüklemeyi kuyruğa al; sahipliği ImageBatch'e geçer"""
+        index = self._next_index()
+        upload_info = {"filename": upload.filename, "sha256": upload.sha256, "size": upload.size}
+
+        first = self._by_hash.get(upload.sha256)
+        if first is not None:
+            upload.close()
+            duplicate_of, analysis = first
+        else:
+            await self._slots.acquire()
+            duplicate_of = None
+            analysis = asyncio.create_task(self._analyze(upload))
+            analysis.add_done_callback(partial(self._release, upload))
+            self._by_hash[upload.sha256] = (upload.filename, analysis)
+            self.unique += 1
+        self._tasks.add(asyncio.create_task(self._report(index, upload_info, analysis, duplicate_of)))
+
+    def add_error(self, filename: str, error: str) -> None:
+        """Analize hiç gönderilemeyen dosya için hata satırı"""
+        line = {"index": self._next_index(), "filename": filename, "status": "error", "error": error}
+        self.errors += 1
+        self._tasks.add(asyncio.create_task(asyncio.sleep(0, result=line)))
+
+    async def add_archive(self, archive: SpooledUpload, max_members: int) -> None:
+        """Arşiv üyelerini io havuzunda sırayla oku ve kuyruğa al"""
+        members = iter_archive_members(archive, max_members, settings.image_max_upload_bytes)
+        try:
+            while True:
+                item = await run_blocking("io", next, members, None)
+                if item is None:
+                    break
+                name, upload, error = item
+                if upload is None:
+                    self.add_error(name, error)
+                else:
+                    await self.add(upload)
+        except Exception as e:
+            self.add_error(archive.filename, f"Arsiv okunamadi: {str(e) or type(e).__name__}")
+        finally:
+            members.close()
+
+    async def results(self) -> AsyncIterator[Dict[str, Any]]:
+        """Satırları tamamlanma sırasıyla, en sonda özet satırı ile döndür"""
+        try:
+            for task in asyncio.as_completed(list(self._tasks)):
+                yield await task
+            yield {"summary": {"files": self.files, "unique": self.unique, "errors": self.errors}}
+        finally:
+            self.cancel()
+
+    def cancel(self) -> None:
+        """İstemci koparsa bekleyen analizleri iptal et"""
+        pending: List[asyncio.Task] = [task for _, task in self._by_hash.values()] + list(self._tasks)
+        for task in pending:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,239 @@
+"""
+İçerik adresli görsel analiz önbelleği.
+
+Yüklenen görseller içeriğin SHA-256'sı ile, uzak görseller URL ile anahtarlanır;
+uzak kayıtlar ETag/Last-Modified doğrulayıcılarıyla birlikte saklanır ve
+doğrulayıcı değiştiğinde eski alanlar atılır. Bir kayıtta hash'ler, metadata
+özeti (exif) ve Vision etiketleri birikir.
+
+İki katman vardır: bellekte LRU, diskte anahtar başına bir JSON dosyası.
+Disk katmanı boyut sınırını aşınca en eski erişilen dosyalar silinir.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from .image_analyze import HASH_VERSION
+
+
+# Birleştirilirken iç içe güncellenen alanlar (diğerleri üzerine yazılır)
+MERGED_FIELDS = ("hashes",)
+VALIDATOR_FIELDS = ("etag", "last_modified")
+
+
+def content_key(sha256: str) -> str:
+    # Hash sürümü değişince eski kayıtlardaki hash'ler okunmaz
+    return f"sha256-v{HASH_VERSION}-{sha256.lower()}"
+
+
+def url_key(url: str) -> str:
+    return f"url-{hashlib.sha256(url.encode('utf-8')).hexdigest()}"
+
+
+class ImageCache:
+    """Bellek LRU + disk katmanlı anahtar -> kayıt (dict) önbelleği"""
+
+    def __init__(self, memory_items: int, disk_dir: Optional[str], disk_max_bytes: int):
+        self.memory_items = max(1, memory_items)
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self._disk_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+        self.disk_errors = 0
+
+    # --- bellek katmanı ---
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            return entry
+
+    def _memory_set(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    # --- disk katmanı ---
+
+    def _path(self, key: str) -> str:
+        digest = key.rpartition("-")[2]
+        return os.path.join(self.disk_dir, digest[:2], f"{key}.json")
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(f.read())
+            # mtime erişim zamanı olarak kullanılır (eviction sırası)
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.disk_errors += 1
+            print(f"[X] Gorsel onbellek okuma hatasi ({key}): {str(e)}")
+            return None
+
+    def _disk_set(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(key)
+        data = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                previous = os.path.getsize(path)
+            except OSError:
+                previous = 0
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.disk_errors += 1
+            print(f"[X] Gorsel onbellek yazma hatasi ({key}): {str(e)}")
+            return
+
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(data) - previous
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+
+    def _scan_disk_bytes(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+    def _evict_disk(self) -> None:
+        """En eski erişilen dosyaları sınırın %90'ına inene kadar sil (_disk_lock altında)"""
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        target = int(self.disk_max_bytes * 0.9)
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.disk_evictions += 1
+        self._disk_bytes = total
+
+    # --- genel arayüz ---
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Kayıt veya None; disk isabetleri belleğe alınır"""
+        entry = self._memory_get(key)
+        if entry is not None:
+            self.memory_hits += 1
+            return entry
+        if self.disk_dir:
+            entry = self._disk_get(key)
+            if entry is not None:
+                self.disk_hits += 1
+                self._memory_set(key, entry)
+                return entry
+        self.misses += 1
+        return None
+
+    def update(self, key: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Alanları mevcut kayda ekle. Doğrulayıcı (etag/last_modified) verilir ve
+        kayıttakinden farklıysa kayıt sıfırdan başlar.
+        """
+        current = self.get(key) or {}
+        if any(field in fields for field in VALIDATOR_FIELDS) and any(
+            fields.get(field) != current.get(field) for field in VALIDATOR_FIELDS
+        ):
+            current = {}
+
+        entry = dict(current)
+        for name, value in fields.items():
+            if name in MERGED_FIELDS and isinstance(value, dict):
+                entry[name] = {**(current.get(name) or {}), **value}
+            else:
+                entry[name] = value
+        entry["stored_at"] = time.time()
+
+        self._memory_set(key, entry)
+        if self.disk_dir:
+            self._disk_set(key, entry)
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_items": len(self._memory),
+            "max_memory_items": self.memory_items,
+            "disk_dir": self.disk_dir,
+            "disk_bytes": self._disk_bytes,
+            "max_disk_bytes": self.disk_max_bytes,
+            "memory_hits_total": self.memory_hits,
+            "disk_hits_total": self.disk_hits,
+            "misses_total": self.misses,
+            "disk_evictions_total": self.disk_evictions,
+            "disk_errors_total": self.disk_errors,
+        }
+
+
+image_cache = ImageCache(
+    memory_items=settings.image_cache_memory_items,
+    disk_dir=settings.image_cache_dir,
+    disk_max_bytes=settings.image_cache_disk_max_bytes,
+)
+
+
+def cached_analysis(sha256: str, hashes=()) -> Optional[Dict[str, Any]]:
+    """
+    Önbellekteki analiz sonucu (analyze_image_file çıktısı biçiminde).
+    İstenen hash'lerden biri eksikse None döner.
+    """
+    entry = image_cache.get(content_key(sha256))
+    if not entry or "exif" not in entry:
+        return None
+    fingerprints = entry.get("hashes") or {}
+    if "phash" not in fingerprints or any(kind not in fingerprints for kind in hashes):
+        return None
+    result = {"phash": fingerprints["phash"], "hash_version": HASH_VERSION, "exif": entry["exif"]}
+    if hashes:
+        result["hashes"] = {kind: fingerprints[kind] for kind in ("phash",) + tuple(hashes)}
+    return result
+
+
+def store_analysis(sha256: str, result: Dict[str, Any]) -> None:
+    """analyze_image_file sonucunu içerik anahtarıyla sakla"""
+    fingerprints = dict(result.get("hashes") or {})
+    fingerprints["phash"] = result["phash"]
+    image_cache.update(content_key(sha256), hashes=fingerprints, exif=result.get("exif"))
@@ -0,0 +1,312 @@
+"""
+Süreç havuzu tabanlı görsel analiz motoru.
+PIL decode, pHash ve EXIF ayrıştırma ayrı süreçlerde çalışır; API'nin event
+loop'u ve GIL'i bloklanmaz. Kuyruk sınırlıdır, her görevin zaman aşımı vardır
+ve PIL bellek büyümesini sınırlamak için işçiler N görevden sonra yenilenir.
+Yenilenen havuzun süreçleri süre sonunda hâlâ yaşıyorsa (takılmış görev)
+sonlandırılır; yeni havuzun işçileri ilk istekten önce başlatılır.
+
+Zaman aşımı görevin işçide başladığı andan sayılır: işçi görevi almadan önce
+görev id'sini başlangıç kuyruğuna yazar. Kuyrukta bekleyen görevler zaman
+aşımına uğramaz ve havuz yenilemesine yol açmaz.
+"""
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from ..core.config import settings
+from ..core.executors import run_blocking
+from .image_analyze import analyze_image_source
+from .image_cache import cached_analysis, store_analysis
+from .image_upload import SpooledUpload
+
+
+class ImageEngineBusy(Exception):
+    """Bekleyen görev sınırı aşıldı"""
+
+
+class ImageEngineTimeout(Exception):
+    """Görev zaman aşımına uğradı"""
+
+
+class _NotStarted(Exception):
+    """Görev, çalışmaya başlamadan havuzu kırıldı"""
+
+
+# İşçi süreçte: görev başlangıçlarının bildirildiği kuyruk (initializer ile atanır)
+_start_queue = None
+
+
+def _init_worker(start_queue) -> None:
+    global _start_queue
+    _start_queue = start_queue
+
+
+def _run_task(task_id: int, fn: Callable[..., Any], *args: Any) -> Any:
+    """İşçi süreçte: başlangıcı bildir, sonra görevi çalıştır"""
+    _start_queue.put(task_id)
+    return fn(*args)
+
+
+def _warm_up() -> int:
+    """İşçiyi başlatıp modülleri yükletmek için boş görev"""
+    return os.getpid()
+
+
+def _terminate_processes(processes: Sequence[multiprocessing.Process]) -> int:
+    """Hâlâ yaşayan süreçleri sonlandır (SIGTERM, olmazsa SIGKILL)"""
+    killed = 0
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+            killed += 1
+    for process in processes:
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()
+    return killed
+
+
+class ImageAnalysisEngine:
+    """ProcessPoolExecutor üzerinde sınırlı kuyruklu analiz motoru"""
+
+    def __init__(
+        self,
+        workers: int,
+        max_pending: int,
+        task_timeout: float,
+        max_tasks_per_pool: int,
+        kill_grace: float = 5.0,
+    ):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.task_timeout = task_timeout
+        self.max_tasks_per_pool = max_tasks_per_pool
+        self.kill_grace = kill_grace
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks_on_executor = 0
+        self._lock = threading.Lock()
+        # Havuz -> başlangıç kuyruğu; görev id -> (loop, başladı olayı)
+        self._start_queues: Dict[int, Any] = {}
+        self._starts: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+        self._task_ids = itertools.count(1)
+        self.pending = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.recycles = 0
+        self.terminated = 0
+        self.cache_hits = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn: işçiler ana süreçteki thread/kilit durumunu devralmaz
+        context = multiprocessing.get_context("spawn")
+        start_queue = context.SimpleQueue()
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(start_queue,),
+        )
+        self._start_queues[id(executor)] = start_queue
+        watcher = threading.Thread(target=self._watch_starts, args=(start_queue,), daemon=True)
+        watcher.start()
+        # İşçi başına boş görev: süreçler ve importlar ilk istekten önce hazır
+        for _ in range(self.workers):
+            executor.submit(_warm_up)
+        return executor
+
+    def _watch_starts(self, start_queue) -> None:
+        """İşçilerin bildirdiği başlangıçları bekleyen run() çağrılarına ilet"""
+        while True:
+            task_id = start_queue.get()
+            if task_id is None:
+                return
+            with self._lock:
+                waiter = self._starts.get(task_id)
+            if waiter is not None:
+                loop, started = waiter
+                loop.call_soon_threadsafe(started.set)
+
+    def _close_start_queue(self, executor: ProcessPoolExecutor) -> None:
+        start_queue = self._start_queues.pop(id(executor), None)
+        if start_queue is not None:
+            start_queue.put(None)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor()
+                self._tasks_on_executor = 0
+            elif self.max_tasks_per_pool and self._tasks_on_executor >= self.max_tasks_per_pool:
+                self._recycle_locked()
+            self._tasks_on_executor += 1
+            return self._executor
+
+    def _recycle_locked(self, grace: Optional[float] = None) -> None:
+        old = self._executor
+        self._executor = self._new_executor()
+        self._tasks_on_executor = 0
+        self.recycles += 1
+        if old is None:
+            return
+        # shutdown süreç listesini bırakır; önce al
+        processes = list((old._processes or {}).values())
+        # Çalışan görevler biter, sonra eski işçiler kapanır
+        old.shutdown(wait=False)
+        # Takılmış görev shutdown'ı hiç bitirmez: süre sonunda kalan süreçler sonlandırılır
+        if grace is None:
+            grace = self.task_timeout + self.kill_grace
+        watchdog = threading.Timer(grace, self._reap, args=(old, processes))
+        watchdog.daemon = True
+        watchdog.start()
+
+    def _reap(self, executor: ProcessPoolExecutor, processes: Sequence[multiprocessing.Process]) -> None:
+        killed = _terminate_processes(processes)
+        self._close_start_queue(executor)
+        if killed:
+            self.terminated += killed
+            print(f"[X] Gorsel analiz motoru: {killed} kapanmayan surec sonlandirildi")
+
+    def recycle(self, grace: Optional[float] = None) -> None:
+        """
+        Havuzu yenile. grace: eski süreçlerin sonlandırılmadan önce bekleneceği
+        süre (varsayılan: çalışan görevler zaman aşımına kadar bitebilsin).
+        """
+        with self._lock:
+            self._recycle_locked(grace)
+
+    def _recycle_if_current(self, executor: ProcessPoolExecutor, grace: Optional[float] = None) -> bool:
+        """Yalnızca hâlâ kullanılan havuzu yenile; emekli havuzun hataları yeni havuzu yıkmaz"""
+        with self._lock:
+            if self._executor is not executor:
+                return False
+            self._recycle_locked(grace)
+            return True
+
+    def start(self) -> None:
+        """Havuzu başlangıçta oluştur ve işçileri ısıt"""
+        self._get_executor()
+        with self._lock:
+            self._tasks_on_executor = 0
+        print(f"[OK] Gorsel analiz motoru hazir: {self.workers} surec")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._close_start_queue(executor)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Fonksiyonu işçi süreçte çalıştır; event loop bloklanmaz"""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ImageEngineBusy("Gorsel analiz kuyrugu dolu")
+
+        self.pending += 1
+        try:
+            try:
+                return await self._run_once(fn, args)
+            except _NotStarted:
+                # Görev kapatılan havuzun kuyruğundaydı, hiç çalışmadı: yeni havuzda bir kez daha
+                return await self._run_once(fn, args, retry=False)
+        finally:
+            self.pending -= 1
+
+    async def _run_once(self, fn: Callable[..., Any], args: Tuple[Any, ...], retry: bool = True) -> Any:
+        task_id = next(self._task_ids)
+        started = asyncio.Event()
+        with self._lock:
+            self._starts[task_id] = (asyncio.get_running_loop(), started)
+        future = None
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_run_task, task_id, fn, *args)
+            analysis = asyncio.wrap_future(future)
+            # Kuyrukta bekleme süresi sayılmaz: süre işçi görevi aldığında başlar
+            waiter = asyncio.ensure_future(started.wait())
+            try:
+                await asyncio.wait({analysis, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                waiter.cancel()
+            result = await asyncio.wait_for(analysis, timeout=self.task_timeout)
+            self.completed += 1
+            return result
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            future.cancel()
+            # Takılan işçi havuzu tıkamasın diye havuzu yenile; takılan süreç
+            # kısa süre sonra sonlandırılır
+            self._recycle_if_current(executor, grace=self.kill_grace)
+            raise ImageEngineTimeout(f"Gorsel analizi {self.task_timeout}s icinde bitmedi")
+        except asyncio.CancelledError:
+            # İstemci koptu: kuyruktaki görev hiç çalışmasın
+            if future is not None:
+                future.cancel()
+            raise
+        except BrokenProcessPool:
+            self._recycle_if_current(executor, grace=self.kill_grace)
+            if retry and not started.is_set():
+                raise _NotStarted()
+            raise
+        finally:
+            with self._lock:
+                self._starts.pop(task_id, None)
+
+    async def analyze_upload(
+        self,
+        upload: SpooledUpload,
+        exif: Optional[Dict[str, Any]] = None,
+        hashes: Sequence[str] = (),
+    ) -> Dict[str, Any]:
+        """
+        Yüklemeyi analiz et; diske taşmış dosyalar yol olarak gönderilir.
+        Aynı içerik (sha256) daha önce analiz edildiyse sonuç önbellekten döner.
+        """
+        hashes = tuple(hashes)
+        cached = await run_blocking("io", cached_analysis, upload.sha256, hashes)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        source = upload.getvalue() if upload.in_memory else upload.path
+        result = await self.run(
+            analyze_image_source,
+            source,
+            upload.header,
+            upload.header_complete,
+            exif,
+            settings.image_max_pixels,
+            hashes,
+        )
+        await run_blocking("io", store_analysis, upload.sha256, result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed_total": self.completed,
+            "timeouts_total": self.timeouts,
+            "rejected_total": self.rejected,
+            "recycles_total": self.recycles,
+            "terminated_total": self.terminated,
+            "cache_hits_total": self.cache_hits,
+        }
+
+
+image_engine = ImageAnalysisEngine(
+    workers=settings.image_engine_workers,
+    max_pending=settings.image_engine_max_pending,
+    task_timeout=settings.image_engine_task_timeout_s,
+    max_tasks_per_pool=settings.image_engine_recycle_after,
+    kill_grace=settings.image_engine_kill_grace_s,
+)
@@ -0,0 +1,334 @@
+"""
+Algısal hash benzerlik indeksi (multi-index hashing).
+
+Hash'ler SQLite'ta (image_hashes) kalıcı tutulur; aramalar bu tablodan kurulan
+bellek içi yapıyla yapılır. 64-bit hash 4 adet 16-bit parçaya bölünür. İki
+hash arasındaki mesafe d ise güvercin yuvası ilkesine göre en az bir parçanın
+mesafesi <= d // 4 olur. Her parça için 65536 kovalık bir sayım dizisi tutulur;
+arama bu yarıçaptaki kovaları toplar ve adayları NumPy ile tam Hamming
+mesafesine göre süzer.
+
+Yeni satırlar (başka süreçlerin ekledikleri dahil) id üzerinden artımlı okunur
+ve tek bir bekleyen diziye eklenir; aramalar bu diziyi tek vektör işlemiyle
+tarar. Bekleyenler birikince yapı yeniden kurulur.
+
+İndekse yalnızca güncel hash sürümündeki (HASH_VERSION) satırlar alınır;
+eski decode yoluyla üretilmiş hash'ler yenileriyle karşılaştırılmaz.
+
+Eşleşmeler başka kullanıcıların yüklemeleri olabilir: dosya adı (ref), sha256
+ve hash yalnızca dosyanın sahibine (sha256'sını bilene) döner; diğerleri için
+mesafe ve opak bir id döner.
+"""
+import hashlib
+import threading
+import time
+from typing import Any, Collection, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import inspect, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.image_hash import ImageHashEntry
+from .image_analyze import HASH_VERSION
+
+
+HASH_BITS = 64
+CHUNK_COUNT = 4
+CHUNK_BITS = HASH_BITS // CHUNK_COUNT
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+# Parça yarıçapı 3'te parça başına 697 kova taranır; daha büyük mesafeler reddedilir
+MAX_CHUNK_RADIUS = 3
+MAX_DISTANCE = CHUNK_COUNT * (MAX_CHUNK_RADIUS + 1) - 1
+
+SOURCE_UPLOAD = "upload"
+SOURCE_SCAN = "scan"
+
+
+def parse_hash(value: str) -> int:
+    """16 haneli hex hash -> işaretsiz 64-bit tamsayı"""
+    value = value.strip().lower()
+    if not value or len(value) > HASH_BITS // 4:
+        raise ValueError("Hash 64 bit (en fazla 16 hex karakter) olmali")
+    return int(value, 16)
+
+
+def format_hash(value: int) -> str:
+    return f"{value & ((1 << HASH_BITS) - 1):0{HASH_BITS // 4}x}"
+
+
+def _to_signed(value: int) -> int:
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def hamming(a: int, b: int) -> int:
+    return ((a ^ b) & ((1 << HASH_BITS) - 1)).bit_count()
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    # NumPy < 2.0
+    bits = values.dtype.itemsize * 8
+    return np.unpackbits(values.view(np.uint8)).reshape(-1, bits).sum(axis=1)
+
+
+# Yarıçap r için popcount <= r olan 16-bit XOR maskeleri
+_ALL_CHUNKS = np.arange(1 << CHUNK_BITS, dtype=np.uint16)
+_CHUNK_MASKS = [
+    _ALL_CHUNKS[_popcount(_ALL_CHUNKS) <= radius].astype(np.int64)
+    for radius in range(MAX_CHUNK_RADIUS + 1)
+]
+
+
+class HammingIndex:
+    """SQLite'taki image_hashes tablosunun bellek içi multi-index görünümü"""
+
+    def __init__(self, refresh_interval: float = 1.0, rebuild_threshold: int = 20000, load_batch: int = 100000):
+        self.refresh_interval = refresh_interval
+        self.rebuild_threshold = rebuild_threshold
+        self.load_batch = load_batch
+        self._lock = threading.Lock()
+        self._ids = np.empty(0, np.int64)
+        self._hashes = np.empty(0, np.uint64)
+        # Parça başına (kovaya göre sıralı satır indeksleri, kova başlangıçları)
+        self._buckets: List[Tuple[np.ndarray, np.ndarray]] = []
+        # Yapıya henüz katılmamış satırlar (her yenilemede tek diziye birleştirilir)
+        self._pending_ids = np.empty(0, np.int64)
+        self._pending_hashes = np.empty(0, np.uint64)
+        self._last_id = 0
+        self._last_refresh = 0.0
+        self._dirty = True
+        self.rebuilds = 0
+
+    def mark_dirty(self) -> None:
+        """Bir sonraki aramada yeni satırları hemen oku"""
+        self._dirty = True
+
+    def _refresh(self, db: Session) -> None:
+        now = time.monotonic()
+        if not self._dirty and now - self._last_refresh < self.refresh_interval:
+            return
+        self._dirty = False
+        self._last_refresh = now
+
+        new_ids: List[np.ndarray] = []
+        new_hashes: List[np.ndarray] = []
+        while True:
+            rows = db.execute(
+                select(ImageHashEntry.id, ImageHashEntry.phash)
+                .where(ImageHashEntry.id > self._last_id, ImageHashEntry.hash_version == HASH_VERSION)
+                .order_by(ImageHashEntry.id)
+                .limit(self.load_batch)
+            ).tuples().all()
+            if not rows:
+                break
+            ids, hashes = zip(*rows)
+            new_ids.append(np.array(ids, dtype=np.int64))
+            new_hashes.append(np.array(hashes, dtype=np.int64).view(np.uint64))
+            self._last_id = ids[-1]
+            if len(rows) < self.load_batch:
+                break
+
+        if new_ids:
+            # Yeni dizi oluşturulur; eşzamanlı aramaların tuttuğu eski dizi değişmez
+            self._pending_ids = np.concatenate([self._pending_ids] + new_ids)
+            self._pending_hashes = np.concatenate([self._pending_hashes] + new_hashes)
+        if len(self._pending_ids) >= self.rebuild_threshold:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        ids = np.concatenate([self._ids, self._pending_ids])
+        hashes = np.concatenate([self._hashes, self._pending_hashes])
+        buckets = []
+        for i in range(CHUNK_COUNT):
+            chunks = ((hashes >> np.uint64(CHUNK_BITS * i)) & np.uint64(CHUNK_MASK)).astype(np.int64)
+            order = np.argsort(chunks, kind="stable")
+            offsets = np.zeros((1 << CHUNK_BITS) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(chunks, minlength=1 << CHUNK_BITS), out=offsets[1:])
+            buckets.append((order, offsets))
+        self._ids, self._hashes, self._buckets = ids, hashes, buckets
+        self._pending_ids = np.empty(0, np.int64)
+        self._pending_hashes = np.empty(0, np.uint64)
+        self.rebuilds += 1
+
+    def search(self, db: Session, target: int, max_distance: int) -> List[Tuple[int, int]]:
+        """(id, mesafe) çiftleri, mesafeye göre sıralı"""
+        with self._lock:
+            self._refresh(db)
+            ids, hashes, buckets = self._ids, self._hashes, self._buckets
+            pending_ids, pending_hashes = self._pending_ids, self._pending_hashes
+
+        target_u = np.uint64(target)
+        masks = _CHUNK_MASKS[max_distance // CHUNK_COUNT]
+        found_ids = []
+        found_distances = []
+
+        if buckets:
+            positions = []
+            for i, (order, offsets) in enumerate(buckets):
+                variants = ((target >> (CHUNK_BITS * i)) & CHUNK_MASK) ^ masks
+                starts = offsets[variants]
+                counts = offsets[variants + 1] - starts
+                total = int(counts.sum())
+                if total:
+                    # Her kovanın [start, start+count) aralığını tek vektörde topla
+                    shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+                    positions.append(order[shift + np.arange(total)])
+            if positions:
+                candidates = np.unique(np.concatenate(positions))
+                distances = _popcount(hashes[candidates] ^ target_u)
+                keep = distances <= max_distance
+                found_ids.append(ids[candidates[keep]])
+                found_distances.append(distances[keep])
+
+        # Henüz yapıya katılmamış satırlar tek vektör işlemiyle taranır
+        if len(pending_ids):
+            distances = _popcount(pending_hashes ^ target_u)
+            keep = distances <= max_distance
+            found_ids.append(pending_ids[keep])
+            found_distances.append(distances[keep])
+
+        if not found_ids:
+            return []
+        all_ids = np.concatenate(found_ids)
+        all_distances = np.concatenate(found_distances).astype(np.int64)
+        order = np.lexsort((all_ids, all_distances))
+        return list(zip(all_ids[order].tolist(), all_distances[order].tolist()))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "indexed": int(len(self._ids)),
+            "pending": int(len(self._pending_ids)),
+            "last_id": self._last_id,
+            "rebuilds_total": self.rebuilds,
+        }
+
+
+hash_index = HammingIndex()
+
+
+def upgrade_hash_schema(conn: Connection) -> None:
+    """Sürüm kolonundan önce oluşturulmuş image_hashes tablosunu güncelle (açılışta)"""
+    table = ImageHashEntry.__table__
+    if not inspect(conn).has_table(table.name):
+        return
+    columns = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    if "hash_version" not in columns:
+        conn.execute(text("ALTER TABLE image_hashes ADD COLUMN hash_version INTEGER NOT NULL DEFAULT 1"))
+    # Tekillik artık sürümü de kapsar: aynı ref yeni sürümle yeniden eklenebilmeli
+    conn.execute(text("DROP INDEX IF EXISTS ix_image_hashes_source_ref_phash"))
+    for index in table.indexes:
+        conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _row(phash: str, source: str, ref: str, sha256: str = "") -> Dict[str, Any]:
+    return {
+        "phash": _to_signed(parse_hash(phash)),
+        "hash_version": HASH_VERSION,
+        "sha256": sha256 or "",
+        "source": source,
+        "ref": ref[:1024],
+    }
+
+
+def _insert_rows(db: Session, rows: List[Dict[str, Any]]) -> int:
+    stmt = sqlite_insert(ImageHashEntry).on_conflict_do_nothing(
+        index_elements=["source", "ref", "hash_version", "phash"]
+    )
+    return db.connection().execute(stmt, rows).rowcount or 0
+
+
+def add_hash(db: Session, phash: str, source: str, ref: str, sha256: str = "") -> bool:
+    """Tek hash ekle; (source, ref, phash) zaten varsa eklenmez"""
+    inserted = _insert_rows(db, [_row(phash, source, ref, sha256)])
+    db.commit()
+    hash_index.mark_dirty()
+    return inserted > 0
+
+
+def bulk_load(
+    db: Session,
+    entries: Iterable[Tuple[str, str, str, str]],
+    batch_size: int = 5000,
+) -> int:
+    """(phash, source, ref, sha256) kayıtlarını tek işlemde, parti parti yükle"""
+    inserted = 0
+    batch: List[Dict[str, Any]] = []
+    for phash, source, ref, sha256 in entries:
+        batch.append(_row(phash, source, ref, sha256))
+        if len(batch) >= batch_size:
+            inserted += _insert_rows(db, batch)
+            batch = []
+    if batch:
+        inserted += _insert_rows(db, batch)
+    db.commit()
+    hash_index.mark_dirty()
+    return inserted
+
+
+def index_image_hashes(entries: Iterable[Tuple[str, str, str, str]]) -> int:
+    """Kendi oturumuyla toplu ekleme (handlers havuzundan çağrılır); hata yutulur"""
+    db = SessionLocal()
+    try:
+        return bulk_load(db, entries)
+    except Exception as e:
+        print(f"[X] Hash indeksleme hatasi: {str(e)}")
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+def opaque_id(entry_id: int) -> str:
+    """Kayıt id'sinin tuzlu özeti: sıralı id'ler dışarı verilmez"""
+    salted = f"image-hash:{entry_id}::{settings.secret_key}".encode("utf-8")
+    return hashlib.sha256(salted).hexdigest()[:16]
+
+
+def find_similar(
+    db: Session,
+    phash: str,
+    max_distance: int = 8,
+    limit: int = 50,
+    source: Optional[str] = None,
+    owned_sha256: Collection[str] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Hamming mesafesi max_distance içindeki kayıtlar, mesafeye göre sıralı.
+    phash güncel sürümle (HASH_VERSION) üretilmiş olmalıdır. Ayrıntılar
+    yalnızca sha256'sı owned_sha256 içinde olan kayıtlar için döner.
+    """
+    if not 0 <= max_distance <= MAX_DISTANCE:
+        raise ValueError(f"max_distance 0-{MAX_DISTANCE} arasinda olmali")
+    owned = {value.strip().lower() for value in owned_sha256 if value.strip()}
+
+    pairs = hash_index.search(db, parse_hash(phash), max_distance)
+
+    # Ayrıntılar sadece eşleşenler için, mesafe sırasıyla parça parça okunur
+    matches = []
+    for start in range(0, len(pairs), 500):
+        chunk = dict(pairs[start:start + 500])
+        stmt = select(ImageHashEntry).where(ImageHashEntry.id.in_(list(chunk)))
+        if source:
+            stmt = stmt.where(ImageHashEntry.source == source)
+        rows = sorted(db.execute(stmt).scalars(), key=lambda row: (chunk[row.id], row.id))
+        for row in rows:
+            match = {"id": opaque_id(row.id), "distance": chunk[row.id], "owned": False}
+            if row.sha256 and row.sha256 in owned:
+                match.update({
+                    "owned": True,
+                    "phash": format_hash(row.phash),
+                    "source": row.source,
+                    "ref": row.ref,
+                    "sha256": row.sha256,
+                    "created_at": row.created_at.isoformat() if row.created_at else None,
+                })
+            matches.append(match)
+        if len(matches) >= limit:
+            break
+    return matches[:limit]
@@ -0,0 +1,527 @@
+"""
+Tek geçişli görsel metadata çıkarıcı.
+
+JPEG segmentleri, PNG/WebP chunk'ları veya TIFF IFD'leri sırayla okunur;
+görüntü verisine (JPEG SOS, PNG IDAT) gelince okuma durur. EXIF (TIFF IFD0,
+Exif ve GPS IFD), XMP ve IPTC-IIM (Photoshop APP13) aynı geçişte toplanır.
+Desteklenmeyen biçimlerde exifread'e düşülür.
+"""
+import io
+import re
+import struct
+import xml.etree.ElementTree as ET
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+import exifread
+
+
+class MetadataIncomplete(Exception):
+    """Metadata segmentleri eldeki baytlardan daha uzun"""
+
+
+# TIFF alan tipleri -> bayt boyutu
+TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8}
+
+IFD0_TAGS = {
+    0x010F: "make",
+    0x0110: "model",
+    0x0112: "orientation",
+    0x0131: "software",
+    0x013B: "artist",
+}
+EXIF_IFD_POINTER = 0x8769
+GPS_IFD_POINTER = 0x8825
+EXIF_TAGS = {
+    0x9003: "datetime_original",
+    0x9011: "offset_time_original",
+    0xA431: "serial_number",
+}
+GPS_TAGS = {1: "lat_ref", 2: "lat", 3: "lon_ref", 4: "lon", 5: "alt_ref", 6: "alt"}
+
+# IPTC-IIM kayıt 2 veri kümeleri
+IPTC_FIELDS = {
+    80: "artist",
+    90: "city",
+    92: "sublocation",
+    95: "state",
+    100: "country_code",
+    101: "country",
+}
+
+# XMP yerel adı -> alan
+XMP_FIELDS = {
+    "City": "city",
+    "State": "state",
+    "Country": "country",
+    "CountryCode": "country_code",
+    "Location": "sublocation",
+    "GPSLatitude": "xmp_lat",
+    "GPSLongitude": "xmp_lon",
+    "DateTimeOriginal": "xmp_datetime",
+    "DateCreated": "xmp_datetime",
+    "CreatorTool": "xmp_software",
+    "Make": "xmp_make",
+    "Model": "xmp_model",
+    "creator": "xmp_artist",
+}
+
+XMP_APP1_PREFIX = b"http://ns.adobe.com/xap/1.0/\x00"
+XMP_PNG_KEYWORD = b"XML:com.adobe.xmp"
+
+
+def empty_summary() -> Dict[str, Any]:
+    return {
+        "format": None,
+        "gps": {"lat": None, "lon": None, "altitude": None},
+        "has_exif": False,
+        "has_xmp": False,
+        "has_iptc": False,
+        "datetime_original": None,
+        "make": None,
+        "model": None,
+        "software": None,
+        "orientation": None,
+        "artist": None,
+        "serial_number": None,
+        "location": {"city": None, "state": None, "country": None, "country_code": None, "sublocation": None},
+        "privacy_flags": [],
+    }
+
+
+def privacy_flags(summary: Dict[str, Any]) -> List[str]:
+    """Özetteki gizlilik açısından hassas alan grupları"""
+    flags = []
+    if summary["gps"]["lat"] is not None and summary["gps"]["lon"] is not None:
+        flags.append("gps")
+    if any(summary["location"].values()):
+        flags.append("location")
+    if summary["datetime_original"]:
+        flags.append("timestamp")
+    if summary["make"] or summary["model"] or summary["serial_number"]:
+        flags.append("device")
+    if summary["artist"]:
+        flags.append("author")
+    return flags
+
+
+class _Collector:
+    """Tek geçişte bulunan ham alanlar"""
+
+    def __init__(self, fmt: str):
+        self.format = fmt
+        self.fields: Dict[str, Any] = {}
+        self.has_exif = False
+        self.has_xmp = False
+        self.has_iptc = False
+
+    def set(self, key: str, value: Any) -> None:
+        if value not in (None, "", b"") and key not in self.fields:
+            self.fields[key] = value
+
+    def summary(self) -> Dict[str, Any]:
+        f = self.fields
+        summary = empty_summary()
+        summary["format"] = self.format
+        summary["has_exif"] = self.has_exif
+        summary["has_xmp"] = self.has_xmp
+        summary["has_iptc"] = self.has_iptc
+
+        lat = _gps_degrees(f.get("lat"), f.get("lat_ref"))
+        lon = _gps_degrees(f.get("lon"), f.get("lon_ref"))
+        if lat is None or lon is None:
+            lat, lon = _xmp_coordinate(f.get("xmp_lat")), _xmp_coordinate(f.get("xmp_lon"))
+        summary["gps"] = {"lat": lat, "lon": lon, "altitude": _gps_altitude(f.get("alt"), f.get("alt_ref"))}
+
+        datetime_original = f.get("datetime_original") or f.get("xmp_datetime")
+        if f.get("datetime_original") and f.get("offset_time_original"):
+            datetime_original = f"{datetime_original}{f['offset_time_original']}"
+        summary["datetime_original"] = datetime_original
+        summary["make"] = f.get("make") or f.get("xmp_make")
+        summary["model"] = f.get("model") or f.get("xmp_model")
+        summary["software"] = f.get("software") or f.get("xmp_software")
+        summary["artist"] = f.get("artist") or f.get("xmp_artist")
+        summary["serial_number"] = f.get("serial_number")
+        orientation = f.get("orientation")
+        summary["orientation"] = orientation if isinstance(orientation, int) and 1 <= orientation <= 8 else None
+        summary["location"] = {key: f.get(key) for key in summary["location"]}
+        summary["privacy_flags"] = privacy_flags(summary)
+        return summary
+
+
+def _gps_degrees(value: Any, ref: Any) -> Optional[float]:
+    try:
+        d, m, s = value[:3]
+        degrees = d + m / 60.0 + s / 3600.0
+    except Exception:
+        return None
+    if isinstance(ref, str) and ref.upper().startswith(("S", "W")):
+        degrees = -degrees
+    return round(degrees, 7)
+
+
+def _gps_altitude(value: Any, ref: Any) -> Optional[float]:
+    try:
+        altitude = float(value[0])
+    except Exception:
+        return None
+    if ref == 1 or (isinstance(ref, (list, tuple)) and ref and ref[0] == 1):
+        altitude = -altitude
+    return round(altitude, 2)
+
+
+_XMP_COORD = re.compile(r"^\s*(\d+(?:\.\d+)?)(?:,(\d+(?:\.\d+)?))?(?:,(\d+(?:\.\d+)?))?\s*([NSEW])\s*$", re.I)
+
+
+def _xmp_coordinate(value: Optional[str]) -> Optional[float]:
+    """XMP "DDD,MM.mmN" / "DDD,MM,SSN" biçimi"""
+    if not value:
+        return None
+    match = _XMP_COORD.match(value)
+    if not match:
+        return None
+    d, m, s, ref = match.groups()
+    degrees = float(d) + float(m or 0) / 60.0 + float(s or 0) / 3600.0
+    return round(-degrees if ref.upper() in ("S", "W") else degrees, 7)
+
+
+def _clean_text(raw: bytes) -> Optional[str]:
+    text = raw.split(b"\x00", 1)[0].strip()
+    if not text:
+        return None
+    return text.decode("utf-8", "replace")
+
+
+# --- TIFF / EXIF -----------------------------------------------------------------
+
+def _parse_tiff(read_at: Callable[[int, int], bytes], out: _Collector) -> None:
+    """
+    TIFF başlığından başlayarak IFD0, Exif ve GPS IFD'lerindeki ilgili etiketleri oku.
+    read_at(offset, size) TIFF başlığına göreli okur; eksik veri MetadataIncomplete atar.
+    """
+    header = read_at(0, 8)
+    if header[:2] == b"II":
+        endian = "<"
+    elif header[:2] == b"MM":
+        endian = ">"
+    else:
+        return
+    if struct.unpack(endian + "H", header[2:4])[0] != 42:
+        return
+    out.has_exif = True
+
+    def values(field_type: int, count: int, raw: bytes) -> Any:
+        if field_type == 2:
+            return _clean_text(raw)
+        if field_type in (1, 6, 7):
+            return list(raw[:count])
+        if field_type == 3:
+            return list(struct.unpack(f"{endian}{count}H", raw[:2 * count]))
+        if field_type == 4:
+            return list(struct.unpack(f"{endian}{count}I", raw[:4 * count]))
+        if field_type == 9:
+            return list(struct.unpack(f"{endian}{count}i", raw[:4 * count]))
+        if field_type in (5, 10):
+            fmt = "I" if field_type == 5 else "i"
+            parts = struct.unpack(f"{endian}{2 * count}{fmt}", raw[:8 * count])
+            return [num / den if den else 0.0 for num, den in zip(parts[::2], parts[1::2])]
+        return None
+
+    def read_ifd(offset: int, wanted: Dict[int, str]) -> Dict[int, Any]:
+        found: Dict[int, Any] = {}
+        count = struct.unpack(endian + "H", read_at(offset, 2))[0]
+        entries = read_at(offset + 2, 12 * count)
+        for i in range(count):
+            tag, field_type, n, inline = struct.unpack(endian + "HHI4s", entries[12 * i:12 * i + 12])
+            if tag not in wanted or field_type not in TIFF_TYPE_SIZES or n > 4096:
+                continue
+            size = TIFF_TYPE_SIZES[field_type] * n
+            if size <= 4:
+                raw = inline
+            else:
+                raw = read_at(struct.unpack(endian + "I", inline)[0], size)
+            found[tag] = values(field_type, n, raw)
+        return found
+
+    ifd0_offset = struct.unpack(endian + "I", header[4:8])[0]
+    ifd0 = read_ifd(ifd0_offset, {**IFD0_TAGS, EXIF_IFD_POINTER: "exif", GPS_IFD_POINTER: "gps"})
+    for tag, key in IFD0_TAGS.items():
+        value = ifd0.get(tag)
+        out.set(key, value[0] if isinstance(value, list) and key == "orientation" else value)
+
+    if ifd0.get(EXIF_IFD_POINTER):
+        exif_ifd = read_ifd(ifd0[EXIF_IFD_POINTER][0], EXIF_TAGS)
+        for tag, key in EXIF_TAGS.items():
+            out.set(key, exif_ifd.get(tag))
+
+    if ifd0.get(GPS_IFD_POINTER):
+        gps_ifd = read_ifd(ifd0[GPS_IFD_POINTER][0], GPS_TAGS)
+        for tag, key in GPS_TAGS.items():
+            out.set(key, gps_ifd.get(tag))
+
+
+def _bytes_reader(data: bytes) -> Callable[[int, int], bytes]:
+    def read_at(offset: int, size: int) -> bytes:
+        chunk = data[offset:offset + size]
+        if len(chunk) < size:
+            raise MetadataIncomplete("TIFF verisi eksik")
+        return chunk
+    return read_at
+
+
+def _file_reader(fileobj: BinaryIO, base: int = 0) -> Callable[[int, int], bytes]:
+    def read_at(offset: int, size: int) -> bytes:
+        fileobj.seek(base + offset)
+        chunk = fileobj.read(size)
+        if len(chunk) < size:
+            raise MetadataIncomplete("TIFF verisi eksik")
+        return chunk
+    return read_at
+
+
+# --- XMP / IPTC -------------------------------------------------------------------
+
+def _parse_xmp(packet: bytes, out: _Collector) -> None:
+    out.has_xmp = True
+    start = packet.find(b"<x:xmpmeta")
+    end = packet.rfind(b"</x:xmpmeta>")
+    if start < 0 or end < 0:
+        return
+    try:
+        root = ET.fromstring(packet[start:end + len(b"</x:xmpmeta>")])
+    except ET.ParseError:
+        return
+
+    def local(name: str) -> str:
+        return name.rsplit("}", 1)[-1]
+
+    for element in root.iter():
+        # Özellikler hem rdf:Description öznitelikleri hem alt öğeler olarak yazılabilir
+        for attr, value in element.attrib.items():
+            key = XMP_FIELDS.get(local(attr))
+            if key:
+                out.set(key, value.strip())
+        key = XMP_FIELDS.get(local(element.tag))
+        if key:
+            text = (element.text or "").strip()
+            if not text:
+                # rdf:Seq/rdf:Alt içindeki ilk rdf:li
+                for child in element.iter():
+                    if local(child.tag) == "li" and (child.text or "").strip():
+                        text = child.text.strip()
+                        break
+            out.set(key, text)
+
+
+def _parse_iptc(data: bytes, out: _Collector) -> None:
+    """IPTC-IIM kayıtları: 0x1C, kayıt, veri kümesi, uzunluk, değer"""
+    out.has_iptc = True
+    pos = 0
+    while pos + 5 <= len(data):
+        if data[pos] != 0x1C:
+            break
+        record, dataset, length = data[pos + 1], data[pos + 2], struct.unpack(">H", data[pos + 3:pos + 5])[0]
+        pos += 5
+        if length & 0x8000:
+            # Genişletilmiş uzunluk; metadata alanlarında beklenmez
+            size = length & 0x7FFF
+            length = int.from_bytes(data[pos:pos + size], "big")
+            pos += size
+        if record == 2 and dataset in IPTC_FIELDS:
+            out.set(IPTC_FIELDS[dataset], _clean_text(data[pos:pos + length]))
+        pos += length
+
+
+def _parse_photoshop_irb(data: bytes, out: _Collector) -> None:
+    """Photoshop 3.0 APP13 görüntü kaynakları; 0x0404 IPTC-IIM'dir"""
+    pos = data.find(b"8BIM")
+    while 0 <= pos and pos + 12 <= len(data) and data[pos:pos + 4] == b"8BIM":
+        resource_id = struct.unpack(">H", data[pos + 4:pos + 6])[0]
+        name_length = data[pos + 6]
+        pos += 7 + name_length
+        pos += pos % 2
+        size = struct.unpack(">I", data[pos:pos + 4])[0]
+        pos += 4
+        if resource_id == 0x0404:
+            _parse_iptc(data[pos:pos + size], out)
+        pos += size + size % 2
+
+
+# --- Biçimler ---------------------------------------------------------------------
+
+def _read_exact(fileobj: BinaryIO, size: int) -> bytes:
+    data = fileobj.read(size)
+    if len(data) < size:
+        raise MetadataIncomplete("Dosya metadata bitmeden sona erdi")
+    return data
+
+
+def _parse_jpeg(fileobj: BinaryIO, out: _Collector) -> None:
+    fileobj.seek(2)
+    while True:
+        marker = _read_exact(fileobj, 2)
+        while marker[0] == 0xFF and marker[1] == 0xFF:
+            # Dolgu baytları
+            marker = marker[1:] + _read_exact(fileobj, 1)
+        if marker[0] != 0xFF:
+            return
+        code = marker[1]
+        if code in (0xD9, 0xDA):
+            # EOI / SOS: görüntü verisi başladı, metadata bitti
+            return
+        if 0xD0 <= code <= 0xD7 or code == 0x01:
+            continue
+        length = struct.unpack(">H", _read_exact(fileobj, 2))[0] - 2
+        if code in (0xE1, 0xED):
+            segment = _read_exact(fileobj, length)
+            if code == 0xE1 and segment.startswith(b"Exif\x00\x00"):
+                _parse_tiff(_bytes_reader(segment[6:]), out)
+            elif code == 0xE1 and segment.startswith(XMP_APP1_PREFIX):
+                _parse_xmp(segment[len(XMP_APP1_PREFIX):], out)
+            elif code == 0xED and segment.startswith(b"Photoshop 3.0\x00"):
+                _parse_photoshop_irb(segment[14:], out)
+        else:
+            fileobj.seek(length, io.SEEK_CUR)
+
+
+def _parse_png(fileobj: BinaryIO, out: _Collector) -> None:
+    fileobj.seek(8)
+    while True:
+        length, chunk_type = struct.unpack(">I4s", _read_exact(fileobj, 8))
+        if chunk_type in (b"IDAT", b"IEND"):
+            return
+        if chunk_type == b"eXIf":
+            _parse_tiff(_bytes_reader(_read_exact(fileobj, length)), out)
+            fileobj.seek(4, io.SEEK_CUR)
+        elif chunk_type == b"iTXt":
+            data = _read_exact(fileobj, length)
+            fileobj.seek(4, io.SEEK_CUR)
+            keyword, _, rest = data.partition(b"\x00")
+            # sıkıştırma bayrağı, yöntem, dil etiketi, çevrilmiş anahtar kelime, metin
+            if keyword == XMP_PNG_KEYWORD and len(rest) > 2 and rest[0] == 0:
+                _, _, rest = rest[2:].partition(b"\x00")
+                _, _, text = rest.partition(b"\x00")
+                _parse_xmp(text, out)
+        else:
+            fileobj.seek(length + 4, io.SEEK_CUR)
+
+
+def _parse_webp(fileobj: BinaryIO, out: _Collector) -> None:
+    # WebP'de EXIF/XMP görüntü verisinden sonra gelir; görüntü chunk'ları atlanır.
+    # Sınır RIFF boyutundan alınır: ondan önce biten veri eksik sayılır.
+    fileobj.seek(4)
+    end = 8 + struct.unpack("<I", _read_exact(fileobj, 4))[0]
+    fileobj.seek(12)
+    while fileobj.tell() + 8 <= end:
+        chunk_type, length = struct.unpack("<4sI", _read_exact(fileobj, 8))
+        padded = length + length % 2
+        if chunk_type == b"EXIF":
+            data = _read_exact(fileobj, length)
+            if data.startswith(b"Exif\x00\x00"):
+                data = data[6:]
+            _parse_tiff(_bytes_reader(data), out)
+            fileobj.seek(padded - length, io.SEEK_CUR)
+        elif chunk_type == b"XMP ":
+            _parse_xmp(_read_exact(fileobj, length), out)
+            fileobj.seek(padded - length, io.SEEK_CUR)
+        else:
+            fileobj.seek(padded, io.SEEK_CUR)
+
+
+def detect_format(head: bytes) -> Optional[str]:
+    if head.startswith(b"\xff\xd8"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+EXIFREAD_TEXT_TAGS = {
+    "Image Make": "make",
+    "Image Model": "model",
+    "Image Software": "software",
+    "Image Artist": "artist",
+    "EXIF DateTimeOriginal": "datetime_original",
+    "EXIF OffsetTimeOriginal": "offset_time_original",
+    "EXIF BodySerialNumber": "serial_number",
+    "GPS GPSLatitudeRef": "lat_ref",
+    "GPS GPSLongitudeRef": "lon_ref",
+}
+EXIFREAD_NUMERIC_TAGS = {
+    "GPS GPSLatitude": "lat",
+    "GPS GPSLongitude": "lon",
+    "GPS GPSAltitude": "alt",
+    "GPS GPSAltitudeRef": "alt_ref",
+    "Image Orientation": "orientation",
+}
+
+
+def _ratio(value: Any) -> float:
+    try:
+        return float(value)
+    except TypeError:
+        return float(value.num) / float(value.den) if value.den else 0.0
+
+
+def summarize_exif_tags(tags: Dict[str, Any]) -> Dict[str, Any]:
+    """exifread etiketlerinden aynı biçimde özet (desteklenmeyen biçimler için)"""
+    out = _Collector(None)
+    out.has_exif = len(tags) > 0
+    for name, key in EXIFREAD_TEXT_TAGS.items():
+        tag = tags.get(name)
+        if tag is not None:
+            out.set(key, str(tag.printable).strip())
+    for name, key in EXIFREAD_NUMERIC_TAGS.items():
+        tag = tags.get(name)
+        if tag is None:
+            continue
+        try:
+            values = [_ratio(v) for v in tag.values]
+        except Exception:
+            continue
+        out.set(key, int(values[0]) if key in ("orientation", "alt_ref") and values else values)
+    return out.summary()
+
+
+def extract_metadata(fileobj: BinaryIO, allow_partial: bool = True) -> Dict[str, Any]:
+    """
+    Dosyadan tek geçişte metadata özeti çıkar.
+    allow_partial=False iken veri metadata bitmeden biterse MetadataIncomplete atılır
+    (yalnızca dosya başı okunmuşsa çağıran tam dosyayla tekrar dener).
+    """
+    fileobj.seek(0)
+    fmt = detect_format(fileobj.read(12))
+    if fmt is None:
+        if not allow_partial:
+            raise MetadataIncomplete("Desteklenmeyen bicim")
+        fileobj.seek(0)
+        return summarize_exif_tags(exifread.process_file(fileobj, details=False))
+
+    out = _Collector(fmt)
+    try:
+        if fmt == "jpeg":
+            _parse_jpeg(fileobj, out)
+        elif fmt == "png":
+            _parse_png(fileobj, out)
+        elif fmt == "webp":
+            _parse_webp(fileobj, out)
+        else:
+            _parse_tiff(_file_reader(fileobj), out)
+    except MetadataIncomplete:
+        if not allow_partial:
+            raise
+    except (struct.error, ValueError, IndexError):
+        # Bozuk segment: o ana kadar bulunanlar döner
+        pass
+    return out.summary()
+
+
+def extract_header_metadata(header: bytes, header_complete: bool) -> Optional[Dict[str, Any]]:
+    """Dosyanın ilk baytlarından özet; metadata başlığa sığmıyorsa None"""
+    try:
+        return extract_metadata(io.BytesIO(header), allow_partial=header_complete)
+    except MetadataIncomplete:
+        return None
@@ -0,0 +1,220 @@
+"""
+Uzak görsellerden metadata: HTTP Range ile sadece dosya başı indirilir.
+
+Önce ilk `remote_image_range_bytes` bayt istenir; metadata segmentleri buna
+sığmıyorsa (veya sunucu Range desteklemiyorsa) boyutu sınırlı tam indirmeye
+düşülür. Sonuçlar (bulunamayanlar dahil) görsel önbelleğinde URL + ETag ile
+tutulur; süresi geçen kayıtlar koşullu istekle (304) yeniden doğrulanır.
+"""
+import io
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+from ..core.config import settings
+from ..core.executors import get_executor
+from .image_cache import image_cache, url_key
+from .image_metadata import extract_header_metadata, extract_metadata
+
+
+def _session() -> requests.Session:
+    # selfscan'in bağlantı havuzlu oturumu (döngüsel import olmaması için geç import)
+    from .selfscan import get_session
+    return get_session()
+
+
+def _read_limited(response: requests.Response, limit: int) -> bytes:
+    data = bytearray()
+    for chunk in response.iter_content(chunk_size=16 * 1024):
+        data.extend(chunk)
+        if len(data) >= limit:
+            break
+    return bytes(data[:limit])
+
+
+def _is_image(response: requests.Response) -> bool:
+    content_type = response.headers.get("Content-Type", "").lower()
+    # Bazı CDN'ler tip göndermez; biçim tespiti sonra yapılır
+    return not content_type or content_type.startswith(("image/", "application/octet-stream"))
+
+
+# Koşullu isteğe 304 dönüldü: önbellekteki özet geçerli
+NOT_MODIFIED = object()
+
+
+def _validators(response: requests.Response) -> Dict[str, Optional[str]]:
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+def _conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def is_fresh(entry: Dict[str, Any]) -> bool:
+    """Kayıt doğrulama gerekmeden kullanılabilir mi"""
+    return time.time() - entry.get("stored_at", 0) < settings.remote_image_cache_ttl_s
+
+
+def _head(url: str, headers: Optional[Dict[str, str]] = None) -> Optional[requests.Response]:
+    try:
+        return _session().head(url, headers=headers, timeout=settings.remote_image_timeout_s, allow_redirects=True)
+    except Exception:
+        return None
+
+
+def fetch_validators(url: str) -> Dict[str, Optional[str]]:
+    """Görselin ETag/Last-Modified değerleri (HEAD); alınamazsa boş"""
+    r = _head(url)
+    return _validators(r) if r is not None and r.status_code == 200 else {}
+
+
+def revalidate(url: str, entry: Dict[str, Any]) -> bool:
+    """
+    Süresi geçmiş kaydı HEAD + koşullu başlıklarla doğrula. Görsel değişmediyse
+    kaydın süresi yenilenir ve True döner.
+    """
+    headers = _conditional_headers(entry)
+    if not headers:
+        return False
+    r = _head(url, headers)
+    if r is None:
+        return False
+    validators = _validators(r)
+    unchanged = r.status_code == 304 or (
+        r.status_code == 200
+        and any(validators.values())
+        and all(validators[name] == entry.get(name) for name in validators)
+    )
+    if unchanged:
+        image_cache.update(url_key(url), etag=entry.get("etag"), last_modified=entry.get("last_modified"))
+    return unchanged
+
+
+def _fetch_metadata(url: str, entry: Optional[Dict[str, Any]]):
+    """(özet, doğrulayıcılar) veya (NOT_MODIFIED, None)"""
+    session = _session()
+    range_bytes = settings.remote_image_range_bytes
+    timeout = settings.remote_image_timeout_s
+    headers = {"Range": f"bytes=0-{range_bytes - 1}", **_conditional_headers(entry)}
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as r:
+        if r.status_code == 304:
+            return NOT_MODIFIED, None
+        validators = _validators(r)
+        if r.status_code not in (200, 206) or not _is_image(r):
+            return None, validators
+        head = _read_limited(r, range_bytes)
+        if r.status_code == 206:
+            total = r.headers.get("Content-Range", "").rpartition("/")[2]
+            complete = total.isdigit() and int(total) <= len(head)
+        else:
+            # Range yok sayıldı: gövde zaten akıyor, okunan kısım yetmezse devam edilir
+            complete = len(head) < range_bytes
+        summary = extract_header_metadata(head, complete)
+        if summary is not None or complete:
+            return summary, validators
+        if r.status_code == 200:
+            rest = _read_limited(r, settings.remote_image_max_bytes - len(head))
+            return extract_metadata(io.BytesIO(head + rest)), validators
+
+    # Metadata ilk parçaya sığmadı: boyutu sınırlı tam indirme
+    with session.get(url, stream=True, timeout=timeout) as r:
+        if r.status_code != 200:
+            return None, validators
+        return extract_metadata(io.BytesIO(_read_limited(r, settings.remote_image_max_bytes))), validators
+
+
+def fetch_image(url: str, max_bytes: int) -> Optional[tuple]:
+    """Küçük görseli (avatar vb.) indir: (baytlar, doğrulayıcılar); sınırı aşarsa None"""
+    with _session().get(url, stream=True, timeout=settings.remote_image_timeout_s) as r:
+        if r.status_code != 200 or not _is_image(r):
+            return None
+        data = _read_limited(r, max_bytes + 1)
+        if len(data) > max_bytes:
+            return None
+        return data, _validators(r)
+
+
+def _cached_entry(url: str) -> Optional[Dict[str, Any]]:
+    entry = image_cache.get(url_key(url))
+    return entry if entry and "exif" in entry else None
+
+
+def fetch_remote_metadata(url: str) -> Optional[Dict[str, Any]]:
+    """Tek URL için metadata özeti (önbellekli); alınamazsa None"""
+    if not url or not url.startswith(("http://", "https://")):
+        return None
+    entry = _cached_entry(url)
+    if entry is not None and is_fresh(entry):
+        return entry["exif"]
+    return _fetch_and_cache(url, entry)
+
+
+def _fetch_and_cache(url: str, entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    key = url_key(url)
+    try:
+        summary, validators = _fetch_metadata(url, entry)
+    except Exception as e:
+        print(f"[X] Uzak gorsel metadata hatasi ({url[:80]}): {str(e)}")
+        if entry is not None:
+            # Geçici hata: eski özet korunur, sonraki çağrıda yeniden denenir
+            return entry["exif"]
+        image_cache.update(key, exif=None)
+        return None
+
+    if summary is NOT_MODIFIED:
+        image_cache.update(key, etag=entry.get("etag"), last_modified=entry.get("last_modified"))
+        return entry["exif"]
+    image_cache.update(key, exif=summary, **validators)
+    return summary
+
+
+def fetch_remote_metadata_many(urls: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """URL'leri io havuzunda paralel işle; tekrar eden URL'ler bir kez indirilir"""
+    unique = list(dict.fromkeys(url for url in urls if url and url.startswith(("http://", "https://"))))
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    pending: List[tuple] = []
+    for url in unique:
+        entry = _cached_entry(url)
+        if entry is not None and is_fresh(entry):
+            results[url] = entry["exif"]
+        else:
+            pending.append((url, entry))
+
+    if len(pending) == 1:
+        results[pending[0][0]] = _fetch_and_cache(*pending[0])
+    elif pending:
+        executor = get_executor("io")
+        futures = {url: executor.submit(_fetch_and_cache, url, entry) for url, entry in pending}
+        for url, future in futures.items():
+            results[url] = future.result()
+    return results
+
+
+def location_from_metadata(summary: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Metadata özetinden sonuçlara eklenen konum; GPS veya XMP/IPTC yer adı yoksa None"""
+    if not summary:
+        return None
+    gps = summary.get("gps") or {}
+    place = summary.get("location") or {}
+    names = [place.get(key) for key in ("sublocation", "city", "state", "country") if place.get(key)]
+    lat, lon = gps.get("lat"), gps.get("lon")
+    if (lat is None or lon is None) and not names:
+        return None
+    address = ", ".join(names) if names else f"{lat:.5f}, {lon:.5f}"
+    return {
+        "lat": lat,
+        "lon": lon,
+        "address": address,
+        "datetime_original": summary.get("datetime_original"),
+        "source": "exif_gps" if lat is not None and lon is not None else "xmp_iptc",
+    }
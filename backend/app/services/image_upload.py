@@ -0,0 +1,269 @@
+"""
+Akış (streaming) tabanlı, boyut sınırlı görsel yükleme.
+İstek gövdesi parça parça okunur; dosya önce bellekte, sınırı aşınca diskte tutulur,
+ilk baytlar EXIF için ayrıca tutulur ve sınırı aşan yüklemeler gövdenin
+tamamı beklenmeden reddedilir.
+"""
+import asyncio
+import hashlib
+import io
+import tempfile
+from typing import AsyncIterator, BinaryIO, Callable, Dict, List, Optional
+
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from ..core.config import settings
+from ..core.executors import run_blocking
+
+
+class UploadTooLarge(Exception):
+    """Yükleme izin verilen boyutu aştı"""
+
+
+class InvalidUpload(Exception):
+    """Gövde multipart/form-data değil veya bozuk"""
+
+
+class SpooledUpload:
+    """
+    Bellekte başlayıp büyüyünce diske taşan, boyutu sınırlı yükleme.
+    Diske taşınca isimli geçici dosya kullanılır; böylece işçi süreçlere
+    içerik yerine dosya yolu gönderilebilir.
+    """
+
+    def __init__(
+        self,
+        field_name: str,
+        filename: str,
+        max_bytes: int,
+        header_limit: int,
+        on_header: Optional[Callable[[bytes], None]] = None,
+    ):
+        self.field_name = field_name
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.header_limit = header_limit
+        self.size = 0
+        self.sha256 = ""
+        self.file: BinaryIO = io.BytesIO()
+        self.path: Optional[str] = None
+        self._memory_limit = settings.image_spool_memory_bytes
+        self._header = bytearray()
+        self._header_done = False
+        self._on_header = on_header
+        self._hash = hashlib.sha256()
+        # discard() ile sınırı aşıp atlanan parça: içerik tutulmaz, hata yanıtta bildirilir
+        self.error: Optional[str] = None
+
+    @property
+    def header(self) -> bytes:
+        """Dosyanın ilk baytları (EXIF/metadata ayrıştırma için)"""
+        return bytes(self._header)
+
+    @property
+    def header_complete(self) -> bool:
+        """Başlık tamponu dosyanın tamamını kapsıyor mu"""
+        return self.size <= len(self._header)
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadTooLarge(f"Dosya en fazla {self.max_bytes} bayt olabilir")
+
+        if not self._header_done:
+            remaining = self.header_limit - len(self._header)
+            self._header.extend(data[:remaining])
+            if len(self._header) >= self.header_limit:
+                self._finish_header()
+
+        self._hash.update(data)
+        if self.path is None and self.size > self._memory_limit:
+            self._rollover()
+        self.file.write(data)
+
+    def _rollover(self) -> None:
+        disk_file = tempfile.NamedTemporaryFile(
+            prefix="upload-",
+            dir=settings.image_spool_dir or None,
+        )
+        disk_file.write(self.file.getvalue())
+        self.file = disk_file
+        self.path = disk_file.name
+
+    @property
+    def in_memory(self) -> bool:
+        return self.path is None
+
+    def getvalue(self) -> bytes:
+        """Bellekteki içerik (sadece diske taşmamış yüklemeler için)"""
+        return self.file.getvalue()
+
+    def _finish_header(self) -> None:
+        self._header_done = True
+        if self._on_header is not None:
+            # Başlık tamamlanınca metadata, dosyanın geri kalanı gelmeden çıkarılır
+            self._on_header(self.header)
+
+    def discard(self, error: str) -> None:
+        """İçeriği bırak (geçici dosya silinir); parçanın kalanı okunup atılır"""
+        self.error = error
+        self.file.close()
+
+    def finish(self) -> None:
+        if self.error is not None:
+            return
+        if not self._header_done:
+            self._finish_header()
+        self.sha256 = self._hash.hexdigest()
+        self.file.flush()
+        self.file.seek(0)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+async def stream_uploads(
+    request: Request,
+    max_bytes: Optional[int] = None,
+    max_files: int = 1,
+    on_header: Optional[Callable[[SpooledUpload, bytes], None]] = None,
+    max_total_bytes: Optional[int] = None,
+    max_bytes_for: Optional[Callable[[str], int]] = None,
+    skip_oversize: bool = False,
+) -> AsyncIterator[SpooledUpload]:
+    """
+    multipart/form-data gövdesindeki dosya parçalarını tamamlandıkça döndür.
+    Dosya olmayan alanlar yok sayılır.
+
+    Dönen her yükleme çağırana aittir ve çağıran tarafından kapatılmalıdır.
+    Akış tamamlanmadan biterse (sınır, bozuk gövde, iptal, erken bırakma) daha
+    önce dönenler dahil tüm yüklemeler burada kapatılır.
+
+    on_header(upload, header): başlık tamponu dolunca cpu havuzunda çalışır
+    (gövde okunmaya devam eder); yükleme, çağrı bitmeden döndürülmez.
+
+    max_total_bytes: gövdenin tamamı için sınır (aşılırsa UploadTooLarge).
+    max_bytes_for: dosya adına göre parça sınırı (yoksa max_bytes).
+    skip_oversize: sınırı aşan parça isteği bozmaz; içeriği atılır ve
+    upload.error dolu olarak döner.
+    """
+    max_bytes = max_bytes or settings.image_max_upload_bytes
+    max_total_bytes = max_total_bytes or max_bytes * max_files
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise InvalidUpload("multipart/form-data bekleniyor")
+
+    # Content-Length belliyse gövdeyi okumadan reddet
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_total_bytes + 64 * 1024:
+        raise UploadTooLarge(f"Istek govdesi en fazla {max_total_bytes} bayt olabilir")
+
+    completed: List[SpooledUpload] = []
+    open_uploads: List[SpooledUpload] = []
+    yielded: List[SpooledUpload] = []
+    # Yükleme -> başlık ayrıştırma görevi (parser.write olay döngüsünde çalışır)
+    header_tasks: Dict[int, asyncio.Future] = {}
+    state = {"current": None, "header_name": b"", "header_value": b"", "disposition": b"", "files": 0}
+
+    def on_part_begin() -> None:
+        state["current"] = None
+        state["disposition"] = b""
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        state["header_name"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        state["header_value"] += data[start:end]
+
+    def on_header_end() -> None:
+        if state["header_name"].lower() == b"content-disposition":
+            state["disposition"] = state["header_value"]
+        state["header_name"] = b""
+        state["header_value"] = b""
+
+    def on_headers_finished() -> None:
+        _, options = parse_options_header(state["disposition"])
+        if b"filename" not in options:
+            return
+        state["files"] += 1
+        if state["files"] > max_files:
+            raise InvalidUpload(f"En fazla {max_files} dosya yuklenebilir")
+        filename = options[b"filename"].decode("utf-8", "replace")
+        upload = SpooledUpload(
+            field_name=options.get(b"name", b"").decode("utf-8", "replace"),
+            filename=filename,
+            max_bytes=max_bytes_for(filename) if max_bytes_for is not None else max_bytes,
+            header_limit=settings.image_header_bytes,
+        )
+        if on_header is not None:
+            upload._on_header = lambda header, _upload=upload: header_tasks.__setitem__(
+                id(_upload), asyncio.ensure_future(run_blocking("cpu", on_header, _upload, header))
+            )
+        open_uploads.append(upload)
+        state["current"] = upload
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        upload = state["current"]
+        if upload is None or upload.error is not None:
+            return
+        try:
+            upload.write(data[start:end])
+        except UploadTooLarge as e:
+            if not skip_oversize:
+                raise
+            upload.discard(str(e))
+
+    def on_part_end() -> None:
+        upload = state["current"]
+        if upload is not None:
+            upload.finish()
+            open_uploads.remove(upload)
+            completed.append(upload)
+        state["current"] = None
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+    })
+
+    async def headers_parsed() -> None:
+        # Tamamlanan yüklemeler, başlık ayrıştırması bitmeden döndürülmez
+        for upload in completed:
+            task = header_tasks.pop(id(upload), None)
+            if task is not None:
+                await task
+
+    received = 0
+    finished = False
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_total_bytes + 64 * 1024:
+                raise UploadTooLarge(f"Istek govdesi en fazla {max_total_bytes} bayt olabilir")
+            parser.write(chunk)
+            await headers_parsed()
+            while completed:
+                yielded.append(completed[0])
+                yield completed.pop(0)
+        parser.finalize()
+        await headers_parsed()
+        while completed:
+            yielded.append(completed[0])
+            yield completed.pop(0)
+        finished = True
+    except (UploadTooLarge, InvalidUpload):
+        raise
+    except Exception as e:
+        raise InvalidUpload(str(e)) from e
+    finally:
+        for task in header_tasks.values():
+            task.cancel()
+        for upload in open_uploads + completed + ([] if finished else yielded):
+            upload.close()
@@ -0,0 +1,310 @@
+"""
+Artımlı detaylı tarama: yalnızca değişmiş olabilecek kaynakları yeniden sorgular.
+
+Kimliğin son detaylı taraması (tarama geçmişi) yüklenir; sonuçlar kaynak
+grubuna göre (`scan_source`) ayrılır ve her grup için tazelik politikası
+uygulanır:
+
+  - social / web / images: süre dolmadıysa önceki sonuçlar aynen kullanılır
+  - webarchive: link başına son snapshot zamanı tutulur; süre dolunca CDX
+    `from=` ile yalnızca sonraki snapshot'lar çekilir
+  - hibp: HIBP ihlal kataloğu (latestbreach) değişmediyse e-posta yeniden
+    sorgulanmaz; yine de en geç scan_fresh_hibp_max_s'de bir kontrol edilir
+
+Her grubun durumu (ne zaman, hangi girdiyle çekildi) sonuçla birlikte
+`sources` altında saklanır; sonraki artımlı tarama bunu okur. Yanıtta önceki
+taramaya göre eklenen/kaybolan sonuçlar `diff` altında döner.
+
+Kaynaklar strict=True ile çağrılır: upstream hatası boş sonuçtan ayrılır,
+grup "failed" olur, önceki sonuçlar ve durum (fetched_at, katalog) korunur.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from ..core.config import settings
+from .selfscan import (
+    UPSTREAM_HIBP,
+    UpstreamError,
+    UpstreamRateLimited,
+    attach_image_locations,
+    before_upstream_request,
+    detailed_scan,
+    search_childhood_photos,
+    search_facebook_photos,
+    search_google_images,
+    search_hibp,
+    search_serpapi,
+    search_social_media,
+    search_webarchive,
+)
+
+
+SOURCE_WEBARCHIVE = "webarchive"
+SOURCE_IMAGES = "images"
+SOURCE_HIBP = "hibp"
+SOURCE_SOCIAL = "social"
+SOURCE_WEB = "web"
+# detailed_scan ile aynı sıra
+SOURCE_ORDER = (SOURCE_WEBARCHIVE, SOURCE_IMAGES, SOURCE_HIBP, SOURCE_SOCIAL, SOURCE_WEB)
+
+ACTION_REUSED = "reused"
+ACTION_NARROWED = "narrowed"
+ACTION_REFRESHED = "refreshed"
+ACTION_FAILED = "failed"
+# Çağıranın hız sınırı izin vermedi: önceki sonuçlar korunur, durum ilerlemez
+ACTION_DEFERRED = "deferred"
+
+HIBP_LATEST_BREACH_URL = "https://haveibeenpwned.com/api/v3/latestbreach"
+
+_catalog_lock = threading.Lock()
+_catalog: Dict[str, Any] = {"marker": None, "checked_at": 0.0}
+
+
+def freshness_policies() -> Dict[str, int]:
+    """Kaynak grubu -> önceki sonucun yeniden kullanılabileceği süre (sn)"""
+    return {
+        SOURCE_WEBARCHIVE: settings.scan_fresh_archive_s,
+        SOURCE_IMAGES: settings.scan_fresh_images_s,
+        SOURCE_HIBP: settings.scan_fresh_hibp_max_s,
+        SOURCE_SOCIAL: settings.scan_fresh_social_s,
+        SOURCE_WEB: settings.scan_fresh_web_s,
+    }
+
+
+def breach_catalog_marker() -> Optional[str]:
+    """
+    HIBP kataloğuna en son eklenen ihlalin adı + eklenme zamanı. Değişmediyse
+    hiçbir e-postanın ihlal listesi değişmemiştir. hibp_catalog_ttl_s boyunca
+    bellekte tutulur; alınamazsa None (katalog değişmiş sayılır).
+    """
+    with _catalog_lock:
+        if _catalog["marker"] and time.monotonic() - _catalog["checked_at"] < settings.hibp_catalog_ttl_s:
+            return _catalog["marker"]
+    try:
+        before_upstream_request(UPSTREAM_HIBP)
+        r = requests.get(HIBP_LATEST_BREACH_URL, headers={"user-agent": "dijital-ayak-izi/0.1"}, timeout=10)
+        if not r.ok:
+            print(f"[X] HIBP katalog hatasi: {r.status_code}")
+            return None
+        breach = r.json()
+        marker = f"{breach.get('Name')}@{breach.get('AddedDate')}"
+    except Exception as e:
+        print(f"[X] HIBP katalog hatasi: {str(e)}")
+        return None
+    with _catalog_lock:
+        _catalog.update(marker=marker, checked_at=time.monotonic())
+    return marker
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """Sonucun taramalar arası kimliği (link; ihlallerde kaynak + ad)"""
+    link = item.get("link") or item.get("url")
+    if link:
+        return link
+    return f"{item.get('source')}:{item.get('name') or item.get('domain') or item.get('title')}"
+
+
+def diff_results(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Dict[str, Any]:
+    before = {item_key(item): item for item in previous}
+    after = {item_key(item): item for item in current}
+    added = [item for key, item in after.items() if key not in before]
+    removed = [item for key, item in before.items() if key not in after]
+    return {
+        "added": added,
+        "removed": removed,
+        "added_count": len(added),
+        "removed_count": len(removed),
+        "unchanged_count": len(after) - len(added),
+    }
+
+
+def _age(state: Optional[Dict[str, Any]]) -> Optional[float]:
+    if not state or not state.get("fetched_at"):
+        return None
+    try:
+        return (datetime.utcnow() - datetime.fromisoformat(state["fetched_at"])).total_seconds()
+    except ValueError:
+        return None
+
+
+def _is_fresh(state: Optional[Dict[str, Any]], group: str, scan_input: Any) -> bool:
+    age = _age(state)
+    return age is not None and state.get("input") == scan_input and age < freshness_policies()[group]
+
+
+def _tag(items: List[Dict[str, Any]], group: str, scan_input: Optional[str] = None) -> List[Dict[str, Any]]:
+    for item in items:
+        item["scan_source"] = group
+        if scan_input is not None:
+            item["scan_input"] = scan_input
+    return items
+
+
+def _fetch_images(full_name: str, found: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    items = attach_image_locations(search_google_images(full_name, strict=True))
+    items.extend(search_childhood_photos(full_name, strict=True))
+    for fb_profile in [r for r in found + items if r.get("source") == "facebook"]:
+        username = fb_profile.get("link", "").split("/")[-1]
+        if username:
+            items.extend(search_facebook_photos(fb_profile.get("link", ""), username, strict=True))
+    return items
+
+
+def _scan_webarchive(
+    links: List[str],
+    previous: List[Dict[str, Any]],
+    state: Dict[str, Any],
+    allow: Optional[Callable[[str], bool]] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any], str]:
+    """Link başına: taze ise önceki snapshot'lar, değilse from= ile yalnızca yeniler"""
+    items: List[Dict[str, Any]] = []
+    new_state: Dict[str, Any] = {}
+    actions = set()
+    now = datetime.utcnow().isoformat()
+    for link in links:
+        link_state = (state or {}).get(link)
+        kept = [item for item in previous if item.get("scan_input") == link]
+        if _is_fresh(link_state, SOURCE_WEBARCHIVE, link):
+            items.extend(kept)
+            new_state[link] = link_state
+            actions.add(ACTION_REUSED)
+            continue
+        if allow is not None and not allow(SOURCE_WEBARCHIVE):
+            items.extend(kept)
+            if link_state:
+                new_state[link] = link_state
+            actions.add(ACTION_DEFERRED)
+            continue
+        since = link_state.get("last_timestamp") if link_state and link_state.get("input") == link else None
+        try:
+            fetched = _tag(search_webarchive(link, since=since, strict=True), SOURCE_WEBARCHIVE, link)
+        except UpstreamError as e:
+            # Boş sonuç sayılmaz: önceki snapshot'lar ve durum korunur
+            items.extend(kept)
+            if link_state:
+                new_state[link] = link_state
+            actions.add(ACTION_DEFERRED if isinstance(e, UpstreamRateLimited) else ACTION_FAILED)
+            continue
+        if since:
+            known = {item_key(item) for item in kept}
+            fetched = kept + [item for item in fetched if item_key(item) not in known]
+            actions.add(ACTION_NARROWED)
+        else:
+            actions.add(ACTION_REFRESHED)
+        items.extend(fetched)
+        timestamps = [item.get("date") for item in fetched if item.get("date")]
+        new_state[link] = {
+            "input": link,
+            "fetched_at": now,
+            "last_timestamp": max(timestamps) if timestamps else since,
+        }
+    if not actions:
+        return items, new_state, ACTION_REUSED
+    # Link'lerden biri bile yeniden çekildiyse grup o eylemle raporlanır
+    action = next(
+        a for a in (ACTION_REFRESHED, ACTION_NARROWED, ACTION_FAILED, ACTION_DEFERRED, ACTION_REUSED) if a in actions
+    )
+    return items, new_state, action
+
+
+def incremental_detailed_scan(
+    full_name: str,
+    email: str | None = None,
+    confirmed_links: List[str] = None,
+    previous: Optional[Dict[str, Any]] = None,
+    allow: Optional[Callable[[str], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    detailed_scan'in artımlı karşılığı. previous: tarama geçmişindeki son
+    detaylı tarama ({"id", "created_at", "result", ...}) veya None.
+    allow: kaynak grubu yeniden sorgulanmadan önce çağrılır (örn. upstream
+    hız sınırı); False dönerse grup ertelenir.
+    """
+    confirmed_links = confirmed_links or []
+    previous_result = (previous or {}).get("result") or {}
+    previous_items = previous_result.get("results") or []
+    previous_sources = previous_result.get("sources") or {}
+
+    if settings.synthetic_mode or settings.offline_mode:
+        result = detailed_scan(full_name, email, confirmed_links)
+        result["diff"] = diff_results(previous_items, result.get("results", []))
+        return result
+
+    by_group: Dict[str, List[Dict[str, Any]]] = {}
+    for item in previous_items:
+        by_group.setdefault(item.get("scan_source"), []).append(item)
+
+    name_input = " ".join(full_name.split()).lower()
+    email_input = email.strip().lower() if email and email.strip() else None
+    now = datetime.utcnow().isoformat()
+    results: List[Dict[str, Any]] = []
+    sources: Dict[str, Any] = {}
+    actions: Dict[str, str] = {}
+
+    def run(group: str, scan_input: Any, fetch: Callable[[], List[Dict[str, Any]]], **state_fields: Any) -> None:
+        state = previous_sources.get(group)
+        if _is_fresh(state, group, scan_input) and all(state.get(k) == v for k, v in state_fields.items()):
+            results.extend(by_group.get(group, []))
+            sources[group] = state
+            actions[group] = ACTION_REUSED
+            return
+        if allow is not None and not allow(group):
+            results.extend(by_group.get(group, []))
+            if state:
+                sources[group] = state
+            actions[group] = ACTION_DEFERRED
+            return
+        try:
+            items = _tag(fetch(), group)
+        except Exception as e:
+            # Kaynak hatası taramayı bozmaz: varsa önceki sonuçlar korunur
+            print(f"[X] Artimli tarama kaynagi hatasi ({group}): {str(e)}")
+            results.extend(by_group.get(group, []))
+            if state:
+                sources[group] = state
+            actions[group] = ACTION_DEFERRED if isinstance(e, UpstreamRateLimited) else ACTION_FAILED
+            return
+        results.extend(items)
+        sources[group] = {"input": scan_input, "fetched_at": now, **state_fields}
+        actions[group] = ACTION_REFRESHED
+
+    print(f"[>>] Artimli detayli tarama basladi: {full_name}")
+    if confirmed_links:
+        items, archive_state, actions[SOURCE_WEBARCHIVE] = _scan_webarchive(
+            confirmed_links, by_group.get(SOURCE_WEBARCHIVE, []), previous_sources.get(SOURCE_WEBARCHIVE) or {}, allow
+        )
+        results.extend(items)
+        sources[SOURCE_WEBARCHIVE] = archive_state
+        run(SOURCE_IMAGES, name_input, lambda: _fetch_images(full_name, list(results)))
+
+    if email_input:
+        # API anahtarı yoksa search_hibp ağa çıkmaz; katalog kontrolüne gerek yok
+        has_key = settings.hibp_api_key and settings.hibp_api_key != "your-hibp-api-key-here"
+        catalog = breach_catalog_marker() if has_key else None
+        run(
+            SOURCE_HIBP, email_input, lambda: search_hibp(email.strip(), strict=True), catalog=catalog or f"unknown@{now}"
+        )
+
+    run(SOURCE_SOCIAL, name_input, lambda: search_social_media(full_name, strict=True))
+    run(SOURCE_WEB, name_input, lambda: search_serpapi(full_name, strict=True))
+
+    fetched = [group for group, action in actions.items() if action in (ACTION_REFRESHED, ACTION_NARROWED)]
+    print(f"[<<] Artimli detayli tarama tamamlandi: {len(results)} sonuc, yeniden sorgulanan: {fetched or 'yok'}")
+
+    return {
+        "query": {"full_name": full_name, "email": email},
+        "results": results,
+        "offline": False,
+        "stage": "detailed",
+        "sources": sources,
+        "incremental": {
+            "previous_scan_id": (previous or {}).get("id"),
+            "previous_scanned_at": (previous or {}).get("created_at"),
+            "actions": actions,
+        },
+        "diff": diff_results(previous_items, results),
+    }
@@ -0,0 +1,452 @@
+"""
+Ayak izi izleme: onay veren kimlikler kendi aralıklarıyla artımlı yeniden
+taranır, yeni sonuç çıkınca veritabanına bildirim yazılır.
+
+Zamanlama:
+  - İlk çalışma [0, aralık) içinde rastgele bir ana yerleştirilir; sonraki
+    çalışmalar önceki planlanan zamana aralık (± jitter) eklenerek bulunur,
+    böylece işler saat başında yığılmaz, zamana yayılır.
+  - Her turda (monitor_tick_s) en fazla monitor_max_per_tick kimlik, sırayla
+    taranır. Vadesi gelen kayıt next_run_at koşullu güncellenerek sahiplenilir;
+    birden çok süreç aynı kimliği iki kez taramaz.
+  - Upstream başına (arama, WebArchive, HIBP) token bucket. Her dış istek
+    (upstream_gate) bir token harcar; kova boşsa en fazla
+    monitor_rate_max_wait_s beklenir. Grubun tahmini istek sayısı kadar token
+    yoksa grup hiç başlamadan ertelenir, önceki sonuçlar korunur ve kısa süre
+    sonra yeniden denenir.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.monitoring import MonitoredIdentity, MonitorNotification
+from .encryption import get_key_manager
+from .incremental_scan import (
+    ACTION_DEFERRED, ACTION_NARROWED, ACTION_REFRESHED, SOURCE_HIBP, SOURCE_IMAGES, SOURCE_SOCIAL, SOURCE_WEB, SOURCE_WEBARCHIVE,
+    incremental_detailed_scan,
+)
+from .risk import classify, score_results
+from .scan_history import STAGE_DETAILED, identity_hash, latest_scan_result, record_scan
+from .selfscan import UPSTREAM_HIBP, UPSTREAM_SEARCH, UPSTREAM_WEBARCHIVE, UpstreamRateLimited, upstream_gate
+
+
+# Kaynak grubu -> (sorguladığı upstream, tahmini istek sayısı). Sayılar
+# selfscan yardımcılarından: sosyal medya 12 site: araması, görseller
+# Google Images + 6 çocukluk fotoğrafı sorgusu (Facebook fotoğrafları ayrıca
+# istek başına ödenir), WebArchive link başına bir istek.
+SOURCE_UPSTREAMS = {
+    SOURCE_SOCIAL: (UPSTREAM_SEARCH, 12),
+    SOURCE_WEB: (UPSTREAM_SEARCH, 1),
+    SOURCE_IMAGES: (UPSTREAM_SEARCH, 7),
+    SOURCE_WEBARCHIVE: (UPSTREAM_WEBARCHIVE, 1),
+    SOURCE_HIBP: (UPSTREAM_HIBP, 1),
+}
+
+
+class TokenBucket:
+    """Dakikada rate_per_min istek; en fazla bir dakikalık birikim"""
+
+    def __init__(self, rate_per_min: float):
+        self.rate = max(rate_per_min, 0.0) / 60.0
+        self.capacity = max(rate_per_min, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+    def try_acquire(self) -> float:
+        """Token alındıysa 0, değilse bir token için beklenecek süre (sn)"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate if self.rate else float("inf")
+
+
+class UpstreamLimiter:
+    """
+    allow(group): incremental_detailed_scan'e verilir, grubun tahmini istek
+    sayısı kadar token yoksa grup ertelenir (token harcanmaz).
+    acquire(upstream): upstream_gate ile her dış istekten önce çağrılır.
+    """
+
+    def __init__(self, rates: Dict[str, float], max_wait_s: float = 30.0):
+        self.buckets = {upstream: TokenBucket(rate) for upstream, rate in rates.items()}
+        self.max_wait_s = max_wait_s
+        self.requests: Counter = Counter()
+        self.waits: Counter = Counter()
+        self.rejected: Counter = Counter()
+        self.deferred: Counter = Counter()
+
+    def allow(self, source: str) -> bool:
+        upstream, cost = SOURCE_UPSTREAMS.get(source, (source, 1))
+        bucket = self.buckets.get(upstream)
+        # Kapasiteden pahalı gruplar dolu kovayla başlar, kalanı acquire'da beklenir
+        if bucket is None or bucket.available() >= min(cost, bucket.capacity):
+            return True
+        self.deferred[upstream] += 1
+        return False
+
+    def acquire(self, upstream: str) -> None:
+        bucket = self.buckets.get(upstream)
+        if bucket is None:
+            return
+        waited = 0.0
+        while True:
+            wait = bucket.try_acquire()
+            if not wait:
+                self.requests[upstream] += 1
+                return
+            if waited + wait > self.max_wait_s:
+                self.rejected[upstream] += 1
+                raise UpstreamRateLimited(f"{upstream} istek tavani asildi")
+            self.waits[upstream] += 1
+            time.sleep(wait)
+            waited += wait
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            upstream: {
+                "rate_per_min": round(bucket.rate * 60, 2),
+                "requests_total": self.requests[upstream],
+                "waits_total": self.waits[upstream],
+                "rejected_total": self.rejected[upstream],
+                "deferred_groups_total": self.deferred[upstream],
+            }
+            for upstream, bucket in self.buckets.items()
+        }
+
+
+def encrypt_subject(full_name: str, email: Optional[str], confirmed_links: List[str]) -> Tuple[str, str]:
+    subject = {"full_name": full_name, "email": email, "confirmed_links": confirmed_links}
+    encrypted = get_key_manager().encrypt(json.dumps(subject, ensure_ascii=False))
+    return encrypted["encrypted"], encrypted["salt"]
+
+
+def decrypt_subject(monitor: MonitoredIdentity) -> Dict[str, Any]:
+    return json.loads(get_key_manager().decrypt(monitor.subject_encrypted, monitor.subject_salt))
+
+
+def first_run_at(interval_s: int, now: Optional[datetime] = None) -> datetime:
+    """İlk çalışmayı aralığın içine rastgele yay"""
+    return (now or datetime.utcnow()) + timedelta(seconds=random.uniform(0, interval_s))
+
+
+def next_run_after(scheduled: datetime, interval_s: int, now: Optional[datetime] = None) -> datetime:
+    """Planlanan zamandan bir aralık sonra (± jitter); geride kaldıysa şimdiden itibaren yay"""
+    now = now or datetime.utcnow()
+    jitter = interval_s * settings.monitor_jitter_fraction
+    candidate = scheduled + timedelta(seconds=interval_s + random.uniform(-jitter, jitter))
+    if candidate <= now:
+        # Uzun kesinti sonrası birikmiş işler aynı ana düşmesin
+        candidate = now + timedelta(seconds=random.uniform(0, max(jitter, settings.monitor_tick_s)))
+    return candidate
+
+
+def upsert_monitor(
+    db: Session,
+    full_name: str,
+    email: Optional[str],
+    confirmed_links: List[str],
+    interval_s: int,
+) -> MonitoredIdentity:
+    """Kimliği izlemeye al veya ayarlarını güncelle"""
+    identity = identity_hash(email=email, full_name=full_name)
+    encrypted, salt = encrypt_subject(full_name, email, confirmed_links)
+    monitor = db.execute(select(MonitoredIdentity).where(MonitoredIdentity.identity_hash == identity)).scalar()
+    if monitor is None:
+        monitor = MonitoredIdentity(identity_hash=identity, next_run_at=first_run_at(interval_s))
+        db.add(monitor)
+    elif monitor.interval_s != interval_s or not monitor.enabled:
+        monitor.next_run_at = first_run_at(interval_s)
+    monitor.subject_encrypted = encrypted
+    monitor.subject_salt = salt
+    monitor.interval_s = interval_s
+    monitor.enabled = True
+    db.commit()
+    db.refresh(monitor)
+    return monitor
+
+
+def get_monitor(db: Session, identity: str) -> Optional[MonitoredIdentity]:
+    return db.execute(select(MonitoredIdentity).where(MonitoredIdentity.identity_hash == identity)).scalar()
+
+
+def remove_monitor(db: Session, identity: str) -> bool:
+    """İzlemeyi bırak; şifreli tarama girdileri silinir, bildirimler kalır"""
+    monitor = get_monitor(db, identity)
+    if monitor is None:
+        return False
+    db.delete(monitor)
+    db.commit()
+    return True
+
+
+def monitor_info(monitor: MonitoredIdentity) -> Dict[str, Any]:
+    return {
+        "id": monitor.id,
+        "identity_hash": monitor.identity_hash,
+        "interval_s": monitor.interval_s,
+        "enabled": monitor.enabled,
+        "next_run_at": monitor.next_run_at,
+        "last_run_at": monitor.last_run_at,
+        "last_scan_id": monitor.last_scan_id,
+        "consecutive_failures": monitor.consecutive_failures,
+        "created_at": monitor.created_at,
+    }
+
+
+def _notification_info(notification: MonitorNotification) -> Dict[str, Any]:
+    return {
+        "id": notification.id,
+        "scan_id": notification.scan_id,
+        "previous_scan_id": notification.previous_scan_id,
+        "added_count": notification.added_count,
+        "removed_count": notification.removed_count,
+        "added_types": json.loads(notification.added_types or "{}"),
+        "risk_score": notification.risk_score,
+        "created_at": notification.created_at,
+        "read_at": notification.read_at,
+    }
+
+
+def list_notifications(
+    db: Session,
+    identity: str,
+    after_id: Optional[int] = None,
+    unread_only: bool = False,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """
+    Kimliğin bildirimleri. after_id verilirse yalnızca ondan yeniler (artan
+    sırada, UI yoklaması için), verilmezse en yeniler.
+    """
+    stmt = select(MonitorNotification).where(MonitorNotification.identity_hash == identity)
+    if unread_only:
+        stmt = stmt.where(MonitorNotification.read_at.is_(None))
+    if after_id is not None:
+        stmt = stmt.where(MonitorNotification.id > after_id).order_by(MonitorNotification.id)
+    else:
+        stmt = stmt.order_by(MonitorNotification.id.desc())
+    return [_notification_info(n) for n in db.execute(stmt.limit(limit)).scalars()]
+
+
+def mark_notification_read(db: Session, identity: str, notification_id: int) -> bool:
+    updated = db.execute(
+        update(MonitorNotification)
+        .where(MonitorNotification.id == notification_id, MonitorNotification.identity_hash == identity)
+        .values(read_at=datetime.utcnow())
+    ).rowcount
+    db.commit()
+    return bool(updated)
+
+
+def new_exposures(
+    added: List[Dict[str, Any]],
+    actions: Dict[str, str],
+    previous_sources: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """
+    Bildirime değer eklenen sonuçlar: grubu bu taramada gerçekten yeniden
+    sorgulanmış ve önceki taramada başarıyla çekilmiş (temel çizgisi var)
+    olmalı. Ertelenen/başarısız grup sonradan çekildiğinde eski sonuçları
+    "yeni" görünür; bunlar temel çizgiye eklenir, bildirilmez.
+    """
+    fetched = {group for group, action in actions.items() if action in (ACTION_REFRESHED, ACTION_NARROWED)}
+    exposures = []
+    for item in added:
+        group = item.get("scan_source")
+        if group not in fetched:
+            continue
+        state = previous_sources.get(group)
+        if group == SOURCE_WEBARCHIVE:
+            # WebArchive durumu link başına tutulur
+            state = (state or {}).get(item.get("scan_input"))
+        if state:
+            exposures.append(item)
+    return exposures
+
+
+class MonitorScheduler:
+    """Vadesi gelen kimlikleri sınırlı sayıda, sırayla yeniden tarar"""
+
+    def __init__(self, limiter: UpstreamLimiter, max_per_tick: int = 5):
+        self.limiter = limiter
+        self.max_per_tick = max(1, max_per_tick)
+        self._lock = threading.Lock()
+        self.running = False
+        self.ticks = 0
+        self.scans = 0
+        self.skipped = 0
+        self.failures = 0
+        self.notifications = 0
+        self.last_tick: Dict[str, Any] = {}
+
+    def _claim(self) -> List[int]:
+        """Vadesi gelenleri next_run_at'i ilerleterek sahiplen"""
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            due = db.execute(
+                select(MonitoredIdentity.id, MonitoredIdentity.next_run_at, MonitoredIdentity.interval_s)
+                .where(MonitoredIdentity.enabled.is_(True), MonitoredIdentity.next_run_at <= now)
+                .order_by(MonitoredIdentity.next_run_at)
+                .limit(self.max_per_tick)
+            ).all()
+            db.commit()
+            claimed = []
+            for monitor_id, scheduled, interval_s in due:
+                updated = db.execute(
+                    update(MonitoredIdentity)
+                    .where(MonitoredIdentity.id == monitor_id, MonitoredIdentity.next_run_at == scheduled)
+                    .values(next_run_at=next_run_after(scheduled, interval_s, now))
+                ).rowcount
+                db.commit()
+                if updated:
+                    claimed.append(monitor_id)
+            return claimed
+        finally:
+            db.close()
+
+    def rescan(self, monitor_id: int) -> Optional[Dict[str, Any]]:
+        """Tek kimliği artımlı tara; yeni sonuç varsa bildirim yaz"""
+        db = SessionLocal()
+        try:
+            monitor = db.get(MonitoredIdentity, monitor_id)
+            if monitor is None or not monitor.enabled:
+                return None
+            subject = decrypt_subject(monitor)
+            started = time.perf_counter()
+            previous = latest_scan_result(monitor.identity_hash, STAGE_DETAILED)
+            with upstream_gate(self.limiter.acquire):
+                result = incremental_detailed_scan(
+                    subject["full_name"],
+                    subject.get("email"),
+                    subject.get("confirmed_links") or [],
+                    previous,
+                    allow=self.limiter.allow,
+                )
+            monitor.last_run_at = datetime.utcnow()
+            monitor.consecutive_failures = 0
+
+            actions = (result.get("incremental") or {}).get("actions") or {}
+            if ACTION_DEFERRED in actions.values():
+                # Ertelenen kaynaklar bir aralık beklemez; kova dolunca yeniden denenir
+                retry_at = datetime.utcnow() + timedelta(seconds=random.uniform(60, 120))
+                monitor.next_run_at = min(monitor.next_run_at, retry_at)
+            if previous is not None and not any(a in (ACTION_REFRESHED, ACTION_NARROWED) for a in actions.values()):
+                # Hiçbir kaynak yeniden sorgulanmadı: geçmişe aynı sonucu tekrar yazma
+                self.skipped += 1
+                db.commit()
+                return result
+
+            score = score_results(result.get("results", []))
+            result["risk_score"] = score
+            result["risk_level"] = classify(score)
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            scan_id = record_scan(
+                STAGE_DETAILED, monitor.identity_hash, result, duration_ms, score, result["risk_level"]
+            )
+            result["scan_id"] = scan_id
+            monitor.last_scan_id = scan_id or monitor.last_scan_id
+            self.scans += 1
+
+            diff = result.get("diff") or {}
+            # İlk tarama (ve ilk kez çekilen her grup) temel çizgidir
+            previous_sources = ((previous or {}).get("result") or {}).get("sources") or {}
+            exposures = new_exposures(diff.get("added", []), actions, previous_sources)
+            if previous is not None and exposures:
+                added_types = Counter(item.get("type") or "other" for item in exposures)
+                db.add(MonitorNotification(
+                    monitor_id=monitor.id,
+                    identity_hash=monitor.identity_hash,
+                    scan_id=scan_id,
+                    previous_scan_id=previous.get("id"),
+                    added_count=len(exposures),
+                    removed_count=diff.get("removed_count", 0),
+                    added_types=json.dumps(dict(added_types)),
+                    risk_score=score,
+                ))
+                self.notifications += 1
+            db.commit()
+            return result
+        except Exception as e:
+            db.rollback()
+            self.failures += 1
+            print(f"[X] Izleme taramasi hatasi (monitor {monitor_id}): {str(e)}")
+            db.execute(
+                update(MonitoredIdentity)
+                .where(MonitoredIdentity.id == monitor_id)
+                .values(consecutive_failures=MonitoredIdentity.consecutive_failures + 1)
+            )
+            db.commit()
+            return None
+        finally:
+            db.close()
+
+    def tick(self) -> Dict[str, Any]:
+        with self._lock:
+            if self.running:
+                return {"skipped": True}
+            self.running = True
+        started = time.perf_counter()
+        claimed: List[int] = []
+        try:
+            claimed = self._claim()
+            for monitor_id in claimed:
+                self.rescan(monitor_id)
+        except Exception as e:
+            print(f"[X] Izleme zamanlayici hatasi: {str(e)}")
+        finally:
+            self.ticks += 1
+            self.last_tick = {
+                "finished_at": datetime.utcnow().isoformat(),
+                "claimed": len(claimed),
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+            self.running = False
+        return self.last_tick
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "ticks_total": self.ticks,
+            "scans_total": self.scans,
+            "unchanged_skipped_total": self.skipped,
+            "failures_total": self.failures,
+            "notifications_total": self.notifications,
+            "upstreams": self.limiter.stats(),
+            "last_tick": self.last_tick,
+        }
+
+
+monitor_scheduler = MonitorScheduler(
+    UpstreamLimiter(
+        {
+            UPSTREAM_SEARCH: settings.monitor_rate_search_per_min,
+            UPSTREAM_WEBARCHIVE: settings.monitor_rate_webarchive_per_min,
+            UPSTREAM_HIBP: settings.monitor_rate_hibp_per_min,
+        },
+        max_wait_s=settings.monitor_rate_max_wait_s,
+    ),
+    max_per_tick=settings.monitor_max_per_tick,
+)
@@ -0,0 +1,196 @@
+"""
+Platformlar arası profil fotoğrafı korelasyonu.
+
+Sonuçlardaki avatar URL'leri (mümkünse küçük boyutlu varyantları) io havuzunda
+paralel indirilir, pHash + dHash ile parmak izi çıkarılır ve neredeyse aynı
+fotoğrafı paylaşan hesaplar union-find ile kümelenir. Her sonuca `cluster_id`
+(kümesi yoksa None) ve kümedeki en yakın fotoğrafa `similarity` (0-1) eklenir.
+
+Parmak izleri görsel önbelleğinde tutulur (URL -> sha256 -> hash'ler); aynı
+avatar tekrar indirilmez ve decode edilmez.
+"""
+import hashlib
+import io
+import re
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+
+from ..core.config import settings
+from ..core.executors import get_executor
+from .image_analyze import compute_hashes
+from .image_cache import content_key, image_cache, url_key as cache_key
+from .image_index import SOURCE_SCAN, hamming, index_image_hashes, parse_hash
+from .image_remote import fetch_image, is_fresh
+
+
+FINGERPRINT_HASHES = ("phash", "dhash")
+# pHash 32x32 girişle çalışır; bundan büyük avatar indirmeye gerek yok
+AVATAR_SIZE = 96
+_TWITTER_SIZE = re.compile(r"_(?:normal|bigger|mini|200x200|400x400)(\.\w+)$")
+
+
+def _with_query(url: str, **params: Any) -> str:
+    parsed = urlparse(url)
+    query = dict(parse_qsl(parsed.query))
+    query.update({key: str(value) for key, value in params.items()})
+    return parsed._replace(query=urlencode(query)).geturl()
+
+
+def small_avatar_url(url: str) -> str:
+    """Bilinen avatar servisleri için küçük boyutlu varyantın URL'i"""
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    path = parsed.path
+    if host == "github.com" and path.endswith(".png"):
+        return _with_query(url, size=AVATAR_SIZE)
+    if host.endswith("avatars.githubusercontent.com") or host.endswith("gravatar.com"):
+        return _with_query(url, s=AVATAR_SIZE)
+    if host == "avatars.io" and path.endswith("/large"):
+        return parsed._replace(path=path[: -len("large")] + "small").geturl()
+    if host == "pbs.twimg.com":
+        return parsed._replace(path=_TWITTER_SIZE.sub(r"_bigger\1", path)).geturl()
+    return url
+
+
+def _cached_fingerprint(sha256: str) -> Optional[Dict[str, str]]:
+    hashes = (image_cache.get(content_key(sha256)) or {}).get("hashes") or {}
+    if all(kind in hashes for kind in FINGERPRINT_HASHES):
+        return {kind: hashes[kind] for kind in FINGERPRINT_HASHES}
+    return None
+
+
+def fingerprint_avatar(url: str) -> Optional[Dict[str, str]]:
+    """Avatarın {phash, dhash, sha256} parmak izi; indirilemez/decode edilemezse None"""
+    key = cache_key(url)
+    entry = image_cache.get(key)
+    if entry and "sha256" in entry and is_fresh(entry):
+        if entry["sha256"] is None:
+            return None
+        cached = _cached_fingerprint(entry["sha256"])
+        if cached is not None:
+            return {**cached, "sha256": entry["sha256"]}
+
+    try:
+        fetched = fetch_image(url, settings.avatar_max_bytes)
+    except Exception as e:
+        print(f"[X] Avatar indirme hatasi ({url[:80]}): {str(e)}")
+        return None
+    if fetched is None:
+        image_cache.update(key, sha256=None)
+        return None
+
+    data, validators = fetched
+    sha256 = hashlib.sha256(data).hexdigest()
+    fingerprint = _cached_fingerprint(sha256)
+    if fingerprint is None:
+        try:
+            fingerprint = compute_hashes(io.BytesIO(data), FINGERPRINT_HASHES, settings.image_max_pixels)
+        except Exception:
+            image_cache.update(key, sha256=None, **validators)
+            return None
+        image_cache.update(content_key(sha256), hashes=fingerprint)
+    image_cache.update(key, sha256=sha256, **validators)
+    return {**fingerprint, "sha256": sha256}
+
+
+def fingerprint_avatars(urls: Sequence[str]) -> Dict[str, Optional[Dict[str, str]]]:
+    """URL'leri (küçük varyantlarıyla) io havuzunda paralel işle"""
+    unique = list(dict.fromkeys(url for url in urls if url and url.startswith(("http://", "https://"))))
+    if not unique:
+        return {}
+    if len(unique) == 1:
+        return {unique[0]: fingerprint_avatar(small_avatar_url(unique[0]))}
+    executor = get_executor("io")
+    futures = {url: executor.submit(fingerprint_avatar, small_avatar_url(url)) for url in unique}
+    return {url: future.result() for url, future in futures.items()}
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def _distance(a: Dict[str, str], b: Dict[str, str]) -> Optional[int]:
+    """Toplam pHash + dHash mesafesi; hash'lerden biri eşiği aşarsa None"""
+    limit = settings.photo_match_max_distance
+    total = 0
+    for kind in FINGERPRINT_HASHES:
+        distance = hamming(parse_hash(a[kind]), parse_hash(b[kind]))
+        if distance > limit:
+            return None
+        total += distance
+    return total
+
+
+def correlate_profile_photos(
+    items: List[Dict[str, Any]],
+    url_key: str = "profile_photo",
+    index: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Sonuçları profil fotoğrafına göre kümele; her sonuca cluster_id ve similarity
+    eklenir. Dönen liste iki veya daha fazla üyeli kümelerdir:
+    {"cluster_id", "members": [sonuç indeksleri], "size"}
+    """
+    if settings.offline_mode:
+        return []
+
+    fingerprints = fingerprint_avatars([item.get(url_key) or "" for item in items])
+    prints = [fingerprints.get(item.get(url_key) or "") for item in items]
+
+    groups = _UnionFind(len(items))
+    best = [None] * len(items)
+    max_total = 64 * len(FINGERPRINT_HASHES)
+    for i in range(len(items)):
+        if prints[i] is None:
+            continue
+        for j in range(i + 1, len(items)):
+            if prints[j] is None:
+                continue
+            distance = _distance(prints[i], prints[j])
+            if distance is None:
+                continue
+            groups.union(i, j)
+            similarity = round(1 - distance / max_total, 3)
+            best[i] = max(best[i] or 0.0, similarity)
+            best[j] = max(best[j] or 0.0, similarity)
+
+    members: Dict[int, List[int]] = {}
+    for i in range(len(items)):
+        members.setdefault(groups.find(i), []).append(i)
+
+    clusters = []
+    for root in sorted(members):
+        indexes = members[root]
+        cluster_id = f"photo-{len(clusters) + 1}" if len(indexes) > 1 else None
+        for i in indexes:
+            items[i]["cluster_id"] = cluster_id
+            items[i]["similarity"] = best[i] if cluster_id else None
+        if cluster_id:
+            clusters.append({"cluster_id": cluster_id, "members": indexes, "size": len(indexes)})
+
+    if index:
+        # Taramalar arası benzerlik araması (/image/similar) için
+        entries = [
+            (fingerprint["phash"], SOURCE_SCAN, url, fingerprint["sha256"])
+            for url, fingerprint in fingerprints.items()
+            if fingerprint is not None
+        ]
+        if entries:
+            index_image_hashes(entries)
+
+    if clusters:
+        print(f"[OK] Profil fotografi korelasyonu: {len(clusters)} kume")
+    return clusters
@@ -11,10 +11,12 @@ from typing import Dict, List, Optional, Any
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 import threading
 
 from ..core.config import settings
+from ..core.executors import get_executor
+from .photo_correlation import correlate_profile_photos
 
 
 class ProfileAnalysisEngine:
@@ -196,6 +198,7 @@ def analyze_profile(profile_url: str) -> Dict[str, Any]:
         "analysis_timestamp": time.time(),
         "profile_details": {},
         "reverse_image_results": [],
+        "photo_matches": [],
         "other_accounts": [],
         "public_email": None,
         "public_photos": [],
@@ -207,17 +210,21 @@ def analyze_profile(profile_url: str) -> Dict[str, Any]:
         # 1. Profil detaylarını çek
         analysis_result["profile_details"] = fetch_profile_details(profile_url)
         
-        # 2. Ters görsel arama
-        if analysis_result["profile_details"].get("profile_picture"):
-            analysis_result["reverse_image_results"] = reverse_image_search(
-                analysis_result["profile_details"]["profile_picture"]
-            )
-        
-        # 3. Diğer hesapları keşfet
+        # 2. Diğer hesapları keşfet
         username = analysis_result["profile_details"].get("username")
         if username:
             analysis_result["other_accounts"] = discover_other_accounts(username)
         
+        # 3. Profil fotoğrafı: önce bulunan hesapların avatarlarıyla karşılaştır,
+        # eşleşme yoksa (kotalı ve yavaş) ters görsel aramaya geç
+        profile_picture = analysis_result["profile_details"].get("profile_picture")
+        if profile_picture:
+            analysis_result["photo_matches"] = _match_profile_photo(
+                profile_picture, analysis_result["other_accounts"]
+            )
+            if not analysis_result["photo_matches"]:
+                analysis_result["reverse_image_results"] = reverse_image_search(profile_picture)
+        
         # 4. Bio'dan e-posta bul
         bio_text = analysis_result["profile_details"].get("bio", "")
         if bio_text:
@@ -238,6 +245,19 @@ def analyze_profile(profile_url: str) -> Dict[str, Any]:
         return analysis_result
 
 
+def _match_profile_photo(profile_picture: str, other_accounts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Profil fotoğrafıyla aynı kümeye düşen diğer hesaplar"""
+    profile = {"profile_picture": profile_picture}
+    correlate_profile_photos([profile] + other_accounts, url_key="profile_picture")
+    if profile["cluster_id"] is None:
+        return []
+    return [
+        {"platform": account.get("platform"), "url": account.get("url"), "similarity": account["similarity"]}
+        for account in other_accounts
+        if account.get("cluster_id") == profile["cluster_id"]
+    ]
+
+
 def fetch_profile_details(url: str) -> Dict[str, Any]:
     """
     Profil detaylarını çek
@@ -453,18 +473,19 @@ def discover_other_accounts(username: str) -> List[Dict[str, Any]]:
             print(f"[X] Platform kontrol hatası ({platform_info['name']}): {str(e)}")
             return None
     
-    # Paralel platform kontrolü
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_platform = {
-            executor.submit(check_platform, platform): platform 
-            for platform in engine.platforms[:20]  # İlk 20 platformu kontrol et
-        }
-        
-        for future in as_completed(future_to_platform):
-            result = future.result()
-            if result:
-                found_accounts.append(result)
+    # Paralel platform kontrolü - paylaşımlı io havuzu
+    executor = get_executor("io")
+    future_to_platform = {
+        executor.submit(check_platform, platform): platform 
+        for platform in engine.platforms[:20]  # İlk 20 platformu kontrol et
+    }
     
+    for future in as_completed(future_to_platform):
+        result = future.result()
+        if result:
+            found_accounts.append(result)
+    
+    correlate_profile_photos(found_accounts, url_key="profile_picture")
     print(f"[OK] Diğer hesaplar keşfedildi: {len(found_accounts)} hesap bulundu")
     return found_accounts
 
@@ -725,6 +746,10 @@ def _assess_profile_risk(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
         risk_score += 30
         risk_factors.append("Profil fotoğrafı başka sitelerde kullanılıyor")
     
+    if analysis_result.get("photo_matches"):
+        risk_score += 30
+        risk_factors.append("Profil fotoğrafı diğer hesaplarda da kullanılıyor")
+    
     # Çoklu hesap varlığı
     other_accounts = len(analysis_result.get("other_accounts", []))
     if other_accounts > 5:
@@ -0,0 +1,229 @@
+"""
+Parça parça, kısılmış saklama (retention) işleri.
+
+Tek seferlik büyük DELETE yerine satırlar birincil anahtar aralıkları halinde
+silinir: her parti kısa bir yazma işlemidir, partiler arasında beklenir ve
+ilerleme (son işlenen id) aynı işlemde retention_progress tablosuna yazılır;
+iş kesilirse kaldığı yerden devam eder. Parti boyutu, yazma kilidinin tutulma
+süresine göre küçültülür/büyütülür.
+
+Tabloların id sırasıyla zaman sırasında eklendiği varsayılır (audit gibi
+append-only tablolar): süresi dolmamış ilk satıra ulaşıldığında iş biter.
+
+Her partiden sonra imlecin altında satır kalmaz. SQLite (AUTOINCREMENT
+olmayan tablolarda) tablo boşalınca id'leri yeniden kullanır; işe başlarken
+imlecin altında satır varsa id'ler yeniden kullanılmıştır ve tarama baştan
+başlar. İmleç, işin başındaki en büyük id'yi geçmez.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import Table, delete, func, select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.retention import RetentionProgress
+
+
+class ChunkedRetentionJob:
+    """Bir tablonun süresi dolan satırlarını id aralıkları halinde silen iş"""
+
+    def __init__(
+        self,
+        name: str,
+        table: Table,
+        time_column: str = "created_at",
+        batch_size: int = 1000,
+        min_batch_size: int = 50,
+        pause: float = 0.05,
+        max_lock: float = 0.05,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.name = name
+        self.table = table
+        self.pk = next(iter(table.primary_key.columns))
+        self.time_column = table.c[time_column]
+        self.max_batch_size = max(1, batch_size)
+        self.min_batch_size = max(1, min(min_batch_size, self.max_batch_size))
+        self.batch_size = self.max_batch_size
+        self.pause = pause
+        self.max_lock = max_lock
+        self.session_factory = session_factory
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.running = False
+        self.runs = 0
+        self.batches = 0
+        self.rows_deleted = 0
+        self.lock_time_total = 0.0
+        self.max_lock_time = 0.0
+        self.last_run: Dict[str, Any] = {}
+
+    def stop(self) -> None:
+        """Çalışan işi bir sonraki partide durdur (ilerleme kayıtlı kalır)"""
+        self._stop.set()
+
+    def _progress(self, db: Session) -> RetentionProgress:
+        progress = db.get(RetentionProgress, self.name)
+        if progress is None:
+            progress = RetentionProgress(job=self.name, cursor=0, rows_deleted=0, status="idle")
+            db.add(progress)
+        return progress
+
+    def _batch(self, cursor: int, threshold: datetime, end: int) -> Dict[str, Any]:
+        """Tek parti: (cursor, cursor + batch] aralığında sil, ilerlemeyi kaydet"""
+        upper = min(cursor + self.batch_size, end)
+        in_window = (self.pk > cursor) & (self.pk <= upper)
+        db = self.session_factory()
+        started = time.perf_counter()
+        try:
+            # İlk ifade yazma: kilit baştan alınır (okuma->yazma yükseltmesi yok)
+            deleted = db.execute(
+                delete(self.table).where(in_window & (self.time_column < threshold))
+            ).rowcount or 0
+            boundary = db.execute(
+                select(func.min(self.pk)).where(in_window & (self.time_column >= threshold))
+            ).scalar()
+            if boundary is not None:
+                next_cursor = boundary - 1
+            else:
+                next_cursor = upper
+                if not deleted:
+                    # Boş aralık (eski silmelerden kalan boşluk): sonraki mevcut id'ye atla
+                    following = db.execute(
+                        select(func.min(self.pk)).where((self.pk > upper) & (self.pk <= end))
+                    ).scalar()
+                    next_cursor = following - 1 if following is not None else upper
+
+            progress = self._progress(db)
+            progress.cursor = next_cursor
+            progress.threshold = threshold
+            progress.rows_deleted = (progress.rows_deleted or 0) + deleted
+            progress.status = "running"
+            progress.updated_at = datetime.utcnow()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return {
+            "deleted": deleted,
+            "cursor": next_cursor,
+            "done": boundary is not None,
+            "lock_time": time.perf_counter() - started,
+        }
+
+    def _adapt(self, lock_time: float) -> None:
+        if lock_time > self.max_lock:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+        elif lock_time < self.max_lock / 4:
+            self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+
+    def run(self, threshold: datetime) -> Dict[str, Any]:
+        """threshold'dan eski satırları sil; kayıtlı ilerlemeden devam eder"""
+        with self._lock:
+            if self.running:
+                return {"skipped": True}
+            self.running = True
+        self._stop.clear()
+
+        started = time.perf_counter()
+        deleted = 0
+        batches = 0
+        max_lock = 0.0
+        status = "done"
+        try:
+            db = self.session_factory()
+            try:
+                cursor = self._progress(db).cursor or 0
+                if cursor and db.execute(select(self.pk).where(self.pk <= cursor).limit(1)).first() is not None:
+                    # İmlecin altında satır var: tablo boşalmış ve id'ler yeniden kullanılmış
+                    cursor = 0
+                end = db.execute(select(func.max(self.pk))).scalar() or 0
+                db.commit()
+            finally:
+                db.close()
+
+            while cursor < end:
+                if self._stop.is_set():
+                    status = "stopped"
+                    break
+                result = self._batch(cursor, threshold, end)
+                cursor = result["cursor"]
+                deleted += result["deleted"]
+                batches += 1
+                max_lock = max(max_lock, result["lock_time"])
+                self._record_batch(result)
+                if result["done"]:
+                    break
+                self._adapt(result["lock_time"])
+                # Partiler arasında diğer yazıcılara yer aç
+                self._stop.wait(self.pause)
+
+            self._set_status(status)
+        except Exception as e:
+            status = "error"
+            print(f"[X] Retention hatasi ({self.name}): {str(e)}")
+        finally:
+            elapsed = time.perf_counter() - started
+            self.last_run = {
+                "finished_at": datetime.utcnow().isoformat(),
+                "status": status,
+                "rows_deleted": deleted,
+                "batches": batches,
+                "seconds": round(elapsed, 3),
+                "rows_per_sec": round(deleted / elapsed, 1) if elapsed > 0 else 0.0,
+                "max_lock_ms": round(max_lock * 1000, 2),
+            }
+            self.runs += 1
+            self.running = False
+        return self.last_run
+
+    def _record_batch(self, result: Dict[str, Any]) -> None:
+        self.batches += 1
+        self.rows_deleted += result["deleted"]
+        self.lock_time_total += result["lock_time"]
+        self.max_lock_time = max(self.max_lock_time, result["lock_time"])
+
+    def _set_status(self, status: str) -> None:
+        db = self.session_factory()
+        try:
+            progress = self._progress(db)
+            progress.status = status
+            progress.updated_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "batch_size": self.batch_size,
+            "runs_total": self.runs,
+            "batches_total": self.batches,
+            "rows_deleted_total": self.rows_deleted,
+            "avg_lock_ms": round(self.lock_time_total / self.batches * 1000, 2) if self.batches else 0.0,
+            "max_lock_ms": round(self.max_lock_time * 1000, 2),
+            "last_run": self.last_run,
+        }
+
+
+retention_jobs: Dict[str, ChunkedRetentionJob] = {}
+
+
+def register_retention_job(table: Table, name: Optional[str] = None, **options: Any) -> ChunkedRetentionJob:
+    """Ayarlardaki parti/bekleme değerleriyle iş oluştur ve kaydet"""
+    options.setdefault("batch_size", settings.retention_batch_size)
+    options.setdefault("pause", settings.retention_batch_pause_ms / 1000)
+    options.setdefault("max_lock", settings.retention_max_lock_ms / 1000)
+    job = ChunkedRetentionJob(name or table.name, table, **options)
+    retention_jobs[job.name] = job
+    return job
+
+
+def retention_stats() -> Dict[str, Any]:
+    return {name: job.stats() for name, job in retention_jobs.items()}
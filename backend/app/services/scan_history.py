@@ -0,0 +1,223 @@
+"""
+Tarama geçmişi: initial/detailed/platform taramaları ve profil analizleri.
+
+Her kayıtta sorgulanabilir metadata kolonları (kimlik hash'i, aşama, süre,
+sonuç sayısı, risk) ve zlib ile sıkıştırılıp KeyManager alt anahtarıyla
+(Fernet) şifrelenmiş JSON sonucu tutulur. Şifreleme sıkıştırmadan sonra
+yapılır; şifreli veri sıkışmaz. Geçmiş ve karşılaştırma sorguları indeksten
+metadata okur, payload yalnızca açıkça istendiğinde çözülür.
+"""
+import base64
+import hashlib
+import json
+import os
+import zlib
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, undefer
+
+from ..core.config import settings
+from ..core.database import ReadSessionLocal, SessionLocal
+from ..models.scan_history import ScanRecord
+from .encryption import get_key_manager
+from .security import hash_email_for_storage
+
+
+CODEC_ZLIB = "zlib"
+STAGE_INITIAL = "initial"
+STAGE_DETAILED = "detailed"
+STAGE_PLATFORM = "platform"
+STAGE_PROFILE = "profile"
+
+METADATA_COLUMNS = (
+    ScanRecord.id,
+    ScanRecord.identity_hash,
+    ScanRecord.stage,
+    ScanRecord.created_at,
+    ScanRecord.duration_ms,
+    ScanRecord.result_count,
+    ScanRecord.risk_score,
+    ScanRecord.risk_level,
+    ScanRecord.results_digest,
+    ScanRecord.payload_size,
+)
+
+
+def identity_hash(email: Optional[str] = None, full_name: Optional[str] = None, profile_url: Optional[str] = None) -> str:
+    """
+    Taramanın kimliği: e-posta varsa users tablosuyla aynı hash, yoksa
+    normalize edilmiş isim veya profil URL'inin tuzlu hash'i.
+    """
+    if email:
+        return hash_email_for_storage(email)
+    if profile_url:
+        value = f"url:{profile_url.strip().rstrip('/').lower()}"
+    elif full_name:
+        value = f"name:{' '.join(full_name.split()).lower()}"
+    else:
+        raise ValueError("email, full_name veya profile_url gerekli")
+    return hash_email_for_storage(value)
+
+
+def _links(result: Dict[str, Any]) -> List[str]:
+    return sorted({item.get("link") or item.get("url") for item in result.get("results") or [] if isinstance(item, dict)} - {None})
+
+
+def results_digest(result: Dict[str, Any]) -> Optional[str]:
+    links = _links(result)
+    if not links:
+        return None
+    return hashlib.sha256("\n".join(links).encode()).hexdigest()
+
+
+def pack_payload(result: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON -> zlib -> Fernet (kayıt başına rastgele salt'lı alt anahtar)"""
+    raw = json.dumps(result, ensure_ascii=False, default=str).encode()
+    salt = os.urandom(16)
+    token = get_key_manager().fernet_for(salt).encrypt(zlib.compress(raw, settings.scan_history_compress_level))
+    return {
+        "codec": CODEC_ZLIB,
+        "payload": token,
+        "payload_salt": base64.urlsafe_b64encode(salt).decode(),
+        "payload_size": len(raw),
+    }
+
+
+def unpack_payload(record: ScanRecord) -> Dict[str, Any]:
+    salt = base64.urlsafe_b64decode(record.payload_salt.encode())
+    data = get_key_manager().fernet_for(salt).decrypt(record.payload)
+    if record.codec == CODEC_ZLIB:
+        data = zlib.decompress(data)
+    return json.loads(data)
+
+
+def record_scan(
+    stage: str,
+    identity: str,
+    result: Dict[str, Any],
+    duration_ms: int,
+    risk_score: Optional[int] = None,
+    risk_level: Optional[str] = None,
+) -> Optional[int]:
+    """Taramayı geçmişe yaz; hata taramayı bozmaz (None döner)"""
+    results = result.get("results")
+    db = SessionLocal()
+    try:
+        record = ScanRecord(
+            identity_hash=identity,
+            stage=stage,
+            duration_ms=duration_ms,
+            result_count=len(results) if isinstance(results, list) else None,
+            risk_score=risk_score,
+            risk_level=risk_level,
+            results_digest=results_digest(result),
+            **pack_payload(result),
+        )
+        db.add(record)
+        db.commit()
+        return record.id
+    except Exception as e:
+        db.rollback()
+        print(f"[X] Tarama gecmisi yazma hatasi: {str(e)}")
+        return None
+    finally:
+        db.close()
+
+
+def _metadata(row: Any) -> Dict[str, Any]:
+    return {column.key: getattr(row, column.key) for column in METADATA_COLUMNS}
+
+
+def list_scans(
+    db: Session,
+    identity: str,
+    stage: Optional[str] = None,
+    before_id: Optional[int] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """Kimliğin taramaları, en yeniden eskiye (yalnızca metadata)"""
+    stmt = select(*METADATA_COLUMNS).where(ScanRecord.identity_hash == identity)
+    if stage:
+        stmt = stmt.where(ScanRecord.stage == stage)
+    if before_id is not None:
+        stmt = stmt.where(ScanRecord.id < before_id)
+    rows = db.execute(stmt.order_by(ScanRecord.id.desc()).limit(limit)).all()
+    return [_metadata(row) for row in rows]
+
+
+def get_scan(
+    db: Session,
+    scan_id: int,
+    include_payload: bool = False,
+    identity: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """identity verilirse yalnızca o kimliğin kaydı döner (başkasınınki None)"""
+    where = [ScanRecord.id == scan_id]
+    if identity is not None:
+        where.append(ScanRecord.identity_hash == identity)
+    if not include_payload:
+        row = db.execute(select(*METADATA_COLUMNS).where(*where)).first()
+        return _metadata(row) if row else None
+    record = db.execute(select(ScanRecord).options(undefer(ScanRecord.payload)).where(*where)).scalar()
+    if record is None:
+        return None
+    return {**_metadata(record), "result": unpack_payload(record)}
+
+
+def latest_scan_result(identity: str, stage: str) -> Optional[Dict[str, Any]]:
+    """Kimliğin son taramasının metadata'sı ve çözülmüş sonucu (artımlı tarama için)"""
+    db = ReadSessionLocal()
+    try:
+        scan_id = db.execute(
+            select(ScanRecord.id)
+            .where(ScanRecord.identity_hash == identity, ScanRecord.stage == stage)
+            .order_by(ScanRecord.id.desc())
+            .limit(1)
+        ).scalar()
+        return get_scan(db, scan_id, include_payload=True) if scan_id is not None else None
+    except Exception as e:
+        print(f"[X] Tarama gecmisi okuma hatasi: {str(e)}")
+        return None
+    finally:
+        db.close()
+
+
+def compare_scans(
+    db: Session,
+    base_id: int,
+    other_id: int,
+    include_results: bool = False,
+    identity: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    İki taramanın farkı. Metadata farkı ve sonuçların değişip değişmediği
+    (results_digest) payload açmadan hesaplanır; include_results ile
+    eklenen/kaybolan linkler de döner. identity verilirse iki kayıt da o
+    kimliğe ait olmalı.
+    """
+    base = get_scan(db, base_id, include_payload=include_results, identity=identity)
+    other = get_scan(db, other_id, include_payload=include_results, identity=identity)
+    if base is None or other is None:
+        return None
+
+    def delta(key: str) -> Optional[int]:
+        if base[key] is None or other[key] is None:
+            return None
+        return other[key] - base[key]
+
+    comparison = {
+        "base": {key: value for key, value in base.items() if key != "result"},
+        "other": {key: value for key, value in other.items() if key != "result"},
+        "same_identity": base["identity_hash"] == other["identity_hash"],
+        "results_changed": base["results_digest"] != other["results_digest"],
+        "risk_score_delta": delta("risk_score"),
+        "result_count_delta": delta("result_count"),
+        "duration_ms_delta": delta("duration_ms"),
+        "elapsed_seconds": (other["created_at"] - base["created_at"]).total_seconds(),
+    }
+    if include_results:
+        before, after = set(_links(base["result"])), set(_links(other["result"]))
+        comparison["added_links"] = sorted(after - before)
+        comparison["removed_links"] = sorted(before - after)
+    return comparison
@@ -32,3 +32,10 @@ def verify_email_token(token: str, max_age_seconds: int) -> str | None:
         return None
 
 
+def verified_email(token: str | None) -> str | None:
+    # Sahiplik kaniti: /register'in verdigi imzali token'daki e-posta (yoksa/gecersizse None)
+    if not token:
+        return None
+    return verify_email_token(token, max_age_seconds=settings.email_verify_exp_hours * 3600)
+
+
@@ -1,21 +1,67 @@
-from typing import Any, Dict, List
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
 import requests
 import time
 import asyncio
 import aiohttp
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 import threading
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from .google_apis import search_youtube_videos, search_google_places, analyze_image_with_vision, get_geolocation_info
 
 from ..core.config import settings
+from ..core.executors import get_executor
+from .image_remote import fetch_remote_metadata, fetch_remote_metadata_many, location_from_metadata
+from .photo_correlation import correlate_profile_photos
 
 
 class SelfScanResult(Dict[str, Any]):
     pass
 
 
+class UpstreamError(Exception):
+    """Upstream isteği başarısız; strict=True çağrılarda boş sonuçtan ayırt etmek için"""
+
+
+class UpstreamRateLimited(UpstreamError):
+    """upstream_gate istek iznini vermedi (istek yapılmadı)"""
+
+
+UPSTREAM_SEARCH = "search"
+UPSTREAM_WEBARCHIVE = "webarchive"
+UPSTREAM_HIBP = "hibp"
+
+# Her dış istekten önce çağrılır (izleme zamanlayıcısının hız sınırı);
+# izin yoksa UpstreamError fırlatır
+_upstream_gate: ContextVar[Optional[Callable[[str], None]]] = ContextVar("upstream_gate", default=None)
+
+
+@contextmanager
+def upstream_gate(acquire: Callable[[str], None]):
+    """Bu bağlamdaki her upstream isteği için acquire(upstream) çağrılır"""
+    token = _upstream_gate.set(acquire)
+    try:
+        yield
+    finally:
+        _upstream_gate.reset(token)
+
+
+def before_upstream_request(upstream: str) -> None:
+    acquire = _upstream_gate.get()
+    if acquire is not None:
+        acquire(upstream)
+
+
+def _upstream_failed(strict: bool, message: str) -> List[dict]:
+    """Hatayı yazdır; strict ise UpstreamError fırlat, değilse boş liste dön"""
+    print(f"[X] {message}")
+    if strict:
+        raise UpstreamError(message)
+    return []
+
+
 # Global session for connection pooling
 _session = None
 _lock = threading.Lock()
@@ -38,7 +84,7 @@ def get_session():
     return _session
 
 
-def fast_search_scraperapi(query: str, num: int = 3) -> List[dict]:
+def fast_search_scraperapi(query: str, num: int = 3, *, strict: bool = False) -> List[dict]:
     """ScraperAPI ile Google araması"""
     if not settings.scraperapi_key:
         return []
@@ -53,19 +99,18 @@ def fast_search_scraperapi(query: str, num: int = 3) -> List[dict]:
     
     try:
         print(f"[>] ScraperAPI çağrısı: {query}")
+        before_upstream_request(UPSTREAM_SEARCH)
         r = session.get(url, params=params, timeout=10)
         
         print(f"[<] ScraperAPI yanıt kodu: {r.status_code}")
         print(f"[<] Content-Type: {r.headers.get('content-type', 'unknown')}")
         
         if not r.ok:
-            print(f"[X] HTTP error: {r.status_code}")
             print(f"[X] Response: {r.text[:200]}")
-            return []
+            return _upstream_failed(strict, f"HTTP error: {r.status_code}")
         
         if 'application/json' not in r.headers.get('content-type', ''):
-            print(f"[X] JSON değil: {r.text[:200]}")
-            return []
+            return _upstream_failed(strict, f"JSON değil: {r.text[:200]}")
         
         # ScraperAPI HTML yanıt döndürür, JSON değil
         if 'text/html' in r.headers.get('content-type', ''):
@@ -97,18 +142,17 @@ def fast_search_scraperapi(query: str, num: int = 3) -> List[dict]:
             print(f"[OK] ScraperAPI: {len(results)} sonuç parse edildi")
             return results
         else:
-            print(f"[X] ScraperAPI beklenmeyen content-type: {r.headers.get('content-type')}")
-            return []
+            return _upstream_failed(strict, f"ScraperAPI beklenmeyen content-type: {r.headers.get('content-type')}")
         
+    except UpstreamError:
+        raise
     except requests.exceptions.RequestException as e:
-        print(f"[X] ScraperAPI network hatası: {str(e)}")
-        return []
+        return _upstream_failed(strict, f"ScraperAPI network hatası: {str(e)}")
     except Exception as e:
-        print(f"[X] ScraperAPI exception: {str(e)}")
-        return []
+        return _upstream_failed(strict, f"ScraperAPI exception: {str(e)}")
 
 
-def fast_search_google_api(query: str, num: int = 3) -> List[dict]:
+def fast_search_google_api(query: str, num: int = 3, *, strict: bool = False) -> List[dict]:
     """Google Custom Search API ile arama"""
     if not settings.google_api_key or not settings.google_search_engine_id:
         return []
@@ -116,6 +160,7 @@ def fast_search_google_api(query: str, num: int = 3) -> List[dict]:
     try:
         print(f"[>] Google Custom Search API çağrısı: {query}")
         
+        before_upstream_request(UPSTREAM_SEARCH)
         # Google Custom Search API servisini oluştur
         service = build("customsearch", "v1", developerKey=settings.google_api_key)
         
@@ -139,16 +184,16 @@ def fast_search_google_api(query: str, num: int = 3) -> List[dict]:
         print(f"[OK] Google API: {len(results)} sonuç bulundu")
         return results
         
+    except UpstreamError:
+        raise
     except HttpError as e:
-        print(f"[X] Google API HTTP error: {e}")
-        return []
+        return _upstream_failed(strict, f"Google API HTTP error: {e}")
     except Exception as e:
-        print(f"[X] Google API error: {str(e)}")
-        return []
+        return _upstream_failed(strict, f"Google API error: {str(e)}")
 
 
 def parallel_search_platforms(query: str, platforms: List[str]) -> Dict[str, List[dict]]:
-    """Platformları paralel olarak ara - ThreadPoolExecutor ile"""
+    """Platformları paralel olarak ara - paylaşımlı io havuzu ile"""
     results = {}
     
     def search_platform(platform):
@@ -171,17 +216,17 @@ def parallel_search_platforms(query: str, platforms: List[str]) -> Dict[str, Lis
             print(f"[X] Platform search error ({platform}): {str(e)}")
             return platform, []
     
-    # Daha az worker ile daha hızlı
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        future_to_platform = {
-            executor.submit(search_platform, platform): platform 
-            for platform in platforms
-        }
-        
-        for future in as_completed(future_to_platform):
-            platform, platform_results = future.result()
-            if platform_results:
-                results[platform] = platform_results
+    # Paylaşımlı io havuzu - her çağrıda yeni havuz açılmaz
+    executor = get_executor("io")
+    future_to_platform = {
+        executor.submit(search_platform, platform): platform 
+        for platform in platforms
+    }
+    
+    for future in as_completed(future_to_platform):
+        platform, platform_results = future.result()
+        if platform_results:
+            results[platform] = platform_results
     
     return results
 
@@ -204,13 +249,13 @@ def extract_username_from_url(url: str) -> str:
     return ""
 
 
-def search_google_images(query: str) -> List[dict]:
+def search_google_images(query: str, *, strict: bool = False) -> List[dict]:
     """Google Images hızlı araması"""
     if not settings.serpapi_key:
         return []
     
     print(f"[>] Google Images: {query}")
-    results = fast_search_google_api(query, num=5)  # 5 görsel
+    results = fast_search_google_api(query, num=5, strict=strict)  # 5 görsel
     
     # Sonuçları işle
     image_results = []
@@ -229,13 +274,17 @@ def search_google_images(query: str) -> List[dict]:
     return image_results
 
 
-def search_webarchive(url: str) -> List[dict]:
-    """WebArchive'den geçmiş versiyonları ara"""
+def search_webarchive(url: str, since: str | None = None, *, strict: bool = False) -> List[dict]:
+    """WebArchive'den geçmiş versiyonları ara (since: yalnızca bu zaman damgasından sonrakiler)"""
     try:
         # WebArchive API'si
         archive_url = f"https://web.archive.org/cdx/search/cdx?url={url}&output=json&limit=5"
+        if since:
+            # from= dahil edicidir; son görülen kayıt aşağıda elenir
+            archive_url += f"&from={since}"
         print(f"[>] WebArchive aramasi: {url}")
         
+        before_upstream_request(UPSTREAM_WEBARCHIVE)
         r = requests.get(archive_url, timeout=10)
         if r.ok:
             data = r.json()
@@ -244,6 +293,8 @@ def search_webarchive(url: str) -> List[dict]:
                 for row in data[1:]:  # Skip header
                     timestamp = row[1]
                     original_url = row[2]
+                    if since and timestamp <= since:
+                        continue
                     archive_url = f"https://web.archive.org/web/{timestamp}/{original_url}"
                     
                     results.append({
@@ -257,12 +308,16 @@ def search_webarchive(url: str) -> List[dict]:
                 
                 print(f"[OK] WebArchive: {len(results)} arsiv bulundu")
                 return results
+        elif strict:
+            _upstream_failed(strict, f"WebArchive HTTP {r.status_code}")
+    except UpstreamError:
+        raise
     except Exception as e:
-        print(f"[X] WebArchive error: {str(e)}")
+        return _upstream_failed(strict, f"WebArchive error: {str(e)}")
     return []
 
 
-def search_childhood_photos(query: str) -> List[dict]:
+def search_childhood_photos(query: str, *, strict: bool = False) -> List[dict]:
     """Çocukluk fotoğraflarını bul"""
     if not settings.serpapi_key:
         return []
@@ -288,6 +343,7 @@ def search_childhood_photos(query: str) -> List[dict]:
                 "num": 2
             }
             
+            before_upstream_request(UPSTREAM_SEARCH)
             r = requests.get(url, params=params, timeout=10)
             if r.ok:
                 data = r.json()
@@ -300,16 +356,18 @@ def search_childhood_photos(query: str) -> List[dict]:
                         "type": "image",
                         "thumbnail": img.get("thumbnail", ""),
                         "date": img.get("date", ""),
-                        "location": extract_location_from_image(img.get("original", ""))
                     })
+            elif strict:
+                _upstream_failed(strict, f"SerpAPI HTTP {r.status_code}")
             
             time.sleep(0.5)  # Rate limit
         
-        return results[:10]  # Maksimum 10 sonuç
+        return attach_image_locations(results[:10])  # Maksimum 10 sonuç
         
+    except UpstreamError:
+        raise
     except Exception as e:
-        print(f"[X] Childhood photos error: {str(e)}")
-    return []
+        return _upstream_failed(strict, f"Childhood photos error: {str(e)}")
 
 
 def check_account_status(url: str) -> dict:
@@ -336,7 +394,7 @@ def check_account_status(url: str) -> dict:
         return {"active": False, "deleted": True, "status_code": 0}
 
 
-def search_facebook_photos(profile_url: str, username: str) -> List[dict]:
+def search_facebook_photos(profile_url: str, username: str, *, strict: bool = False) -> List[dict]:
     """Facebook profilindeki fotoğrafları ayrı ayrı çek"""
     if not settings.serpapi_key or not profile_url:
         return []
@@ -360,6 +418,7 @@ def search_facebook_photos(profile_url: str, username: str) -> List[dict]:
                 "num": 3
             }
             
+            before_upstream_request(UPSTREAM_SEARCH)
             r = requests.get(url, params=params, timeout=10)
             if r.ok:
                 data = r.json()
@@ -372,20 +431,22 @@ def search_facebook_photos(profile_url: str, username: str) -> List[dict]:
                         "type": "image",
                         "thumbnail": img.get("thumbnail", ""),
                         "date": img.get("date", ""),
-                        "location": extract_location_from_image(img.get("original", "")),
                         "profile_url": profile_url
                     })
+            elif strict:
+                _upstream_failed(strict, f"SerpAPI HTTP {r.status_code}")
             
             time.sleep(0.5)  # Rate limit
         
-        return results[:12]  # Maksimum 12 fotoğraf
+        return attach_image_locations(results[:12])  # Maksimum 12 fotoğraf
         
+    except UpstreamError:
+        raise
     except Exception as e:
-        print(f"[X] Facebook photos error: {str(e)}")
-    return []
+        return _upstream_failed(strict, f"Facebook photos error: {str(e)}")
 
 
-def search_social_media(query: str) -> List[dict]:
+def search_social_media(query: str, *, strict: bool = False) -> List[dict]:
     """Sosyal medya profilleri için basit ve hızlı arama"""
     if not settings.serpapi_key:
         return []
@@ -402,7 +463,7 @@ def search_social_media(query: str) -> List[dict]:
     results = []
     for platform in platforms:
         search_query = f"{query} {platform}"
-        platform_results = fast_search_google_api(search_query, num=2)
+        platform_results = fast_search_google_api(search_query, num=2, strict=strict)
         
         for item in platform_results:
             # Platform ismini çıkar
@@ -433,10 +494,13 @@ def search_social_media(query: str) -> List[dict]:
                 "source": platform_name.lower(),
                 "type": "social",
                 "profile_photo": profile_photo,
-                "location": extract_location_from_image(link),
                 "account_status": {"active": True, "deleted": False}  # Basit kontrol
             })
     
+    # Profil sayfası görsel değil; konum profil fotoğrafının metadata'sından
+    attach_image_locations(results, url_key="profile_photo")
+    # Aynı fotoğrafı kullanan hesaplar aynı cluster_id ile işaretlenir
+    correlate_profile_photos(results, url_key="profile_photo")
     print(f"[OK] Social media: {len(results)} profil bulundu")
     return results
 
@@ -518,48 +582,57 @@ def get_profile_photo(profile_url: str, platform: str) -> str:
     return ""
 
 
-def search_google_api(query: str) -> List[dict]:
-    """Google araması - önce ScraperAPI, sonra SerpAPI dener"""
+def search_google_api(query: str, *, strict: bool = False) -> List[dict]:
+    """
+    Google araması - önce ScraperAPI, sonra SerpAPI dener.
+    strict: tüm sağlayıcılar başarısızsa UpstreamError (boş sonuç değil)
+    """
+    scraperapi_error = None
     
     # Önce ScraperAPI'yi dene
     if settings.scraperapi_key:
         try:
             print(f"[>] ScraperAPI ile arama yapiliyor: {query}")
-            results = fast_search_scraperapi(query, num=10)
+            results = fast_search_scraperapi(query, num=10, strict=strict)
             if results:
                 print(f"[OK] ScraperAPI basarili, {len(results)} sonuc bulundu")
                 return results
             else:
                 print(f"[X] ScraperAPI sonuc bulunamadi, SerpAPI deneniyor...")
         except Exception as e:
+            scraperapi_error = e
             print(f"[X] ScraperAPI hatasi: {str(e)}, SerpAPI deneniyor...")
     
     # ScraperAPI başarısız olursa Google API'yi dene
     if settings.google_api_key and settings.google_search_engine_id:
         try:
             print(f"[>] Google API ile arama yapiliyor: {query}")
-            results = fast_search_google_api(query, num=10)
+            results = fast_search_google_api(query, num=10, strict=strict)
             if results:
                 print(f"[OK] Google API basarili, {len(results)} sonuc bulundu")
             else:
                 print(f"[X] Google API sonuc bulunamadi")
             return results
         except Exception as e:
+            if strict:
+                raise
             print(f"[X] Google API exception: {str(e)}")
             import traceback
             traceback.print_exc()
             return []
     
+    if scraperapi_error is not None:
+        return _upstream_failed(strict, f"Arama basarisiz: {str(scraperapi_error)}")
     print("[!] Ne SCRAPERAPI_KEY ne de GOOGLE_API_KEY bulunamadi")
     return []
 
 
-def search_serpapi(query: str) -> List[dict]:
+def search_serpapi(query: str, *, strict: bool = False) -> List[dict]:
     """Geriye dönük uyumluluk için - artık search_google_api kullanılıyor"""
-    return search_google_api(query)
+    return search_google_api(query, strict=strict)
 
 
-def search_hibp(email: str) -> List[dict]:
+def search_hibp(email: str, *, strict: bool = False) -> List[dict]:
     if not settings.hibp_api_key or settings.hibp_api_key == "your-hibp-api-key-here":
         print(f"[!] HIBP API key yok veya placeholder, e-posta kontrol edilemiyor: {email}")
         # Demo için fake veri döndür
@@ -572,6 +645,7 @@ def search_hibp(email: str) -> List[dict]:
     
     try:
         print(f"[>] HIBP kontrolu: {email}")
+        before_upstream_request(UPSTREAM_HIBP)
         r = requests.get(url, headers=headers, timeout=10)
         print(f"[<] HIBP yanit kodu: {r.status_code}")
         
@@ -594,10 +668,11 @@ def search_hibp(email: str) -> List[dict]:
                 })
             return results
         else:
-            print(f"[X] HIBP hata: {r.status_code} - {r.text[:200]}")
+            return _upstream_failed(strict, f"HIBP hata: {r.status_code} - {r.text[:200]}")
+    except UpstreamError:
+        raise
     except Exception as e:
-        print(f"[X] HIBP exception: {str(e)}")
-    return []
+        return _upstream_failed(strict, f"HIBP exception: {str(e)}")
 
 
 def initial_scan(full_name: str, email: str | None = None) -> SelfScanResult:
@@ -710,10 +785,8 @@ def detailed_scan(full_name: str, email: str | None = None, confirmed_links: Lis
     
             # 2) Görseller (daha fazla)
             image_results = search_google_images(full_name)
-            for img in image_results:
-                # Görselden konum bilgisi çıkarmaya çalış
-                img["location"] = extract_location_from_image(img.get("link", ""))
-            results.extend(image_results)
+            # Görsellerin konumu: EXIF GPS / XMP-IPTC, paralel Range istekleriyle
+            results.extend(attach_image_locations(image_results))
             
             # 3) Çocukluk fotoğrafları
             childhood_results = search_childhood_photos(full_name)
@@ -749,27 +822,17 @@ def detailed_scan(full_name: str, email: str | None = None, confirmed_links: Lis
     }
 
 
-def extract_location_from_image(image_url: str) -> dict:
-    """Görselden konum bilgisi çıkarmaya çalış"""
-    # Fırat Üniversitesi için özel konum bilgisi
-    if "firat" in image_url.lower() or "campus" in image_url.lower():
-        return {
-            "lat": 38.4237,
-            "lon": 38.3856,
-            "address": "Fırat Üniversitesi Kampüsü, Elazığ, Turkey"
-        }
-    
-    # Demo için rastgele konumlar
-    import random
-    locations = [
-        {"lat": 41.0082, "lon": 28.9784, "address": "İstanbul, Turkey"},
-        {"lat": 39.9334, "lon": 32.8597, "address": "Ankara, Turkey"},
-        {"lat": 38.4237, "lon": 38.3856, "address": "Elazığ, Turkey"},
-        {"lat": 40.1826, "lon": 29.0665, "address": "Bursa, Turkey"},
-        {"lat": 36.8969, "lon": 30.7133, "address": "Antalya, Turkey"}
-    ]
-    
-    return random.choice(locations)
+def extract_location_from_image(image_url: str) -> dict | None:
+    """Görselin EXIF GPS / XMP-IPTC konumu (sadece dosya başı indirilir); yoksa None"""
+    return location_from_metadata(fetch_remote_metadata(image_url))
+
+
+def attach_image_locations(items: List[dict], url_key: str = "link") -> List[dict]:
+    """Sonuçlara konumu toplu ekle; görseller paralel işlenir, URL'ler önbelleklenir"""
+    metadata = fetch_remote_metadata_many(item.get(url_key, "") for item in items)
+    for item in items:
+        item["location"] = location_from_metadata(metadata.get(item.get(url_key, "")))
+    return items
 
 
 def self_scan(full_name: str, email: str | None = None) -> SelfScanResult:
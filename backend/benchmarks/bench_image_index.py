@@ -0,0 +1,98 @@
+"""
+pHash benzerlik indeksi benchmark'ı: toplu yükleme + Hamming aralık sorguları.
+
+Kullanım:
+    python -m benchmarks.bench_image_index            # 1.000.000 rastgele hash
+    python -m benchmarks.bench_image_index 200000     # farklı boyut
+
+Geçici bir SQLite dosyasına yükler; her max_distance için bellek içi indeks
+araması ve satır ayrıntılarıyla birlikte ortalama sorgu süresini, ayrıca
+doğruluğu (kaba tarama ile karşılaştırarak) raporlar. Son olarak tek tek
+ekleme + arama turlarında sorgu süresinin bekleyen satırlarla büyümediğini
+gösterir.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.image_hash import ImageHashEntry  # noqa: F401
+from app.services.image_index import (
+    SOURCE_SCAN, SOURCE_UPLOAD, add_hash, bulk_load, find_similar, format_hash, hamming, hash_index,
+)
+
+
+DISTANCES = [0, 4, 8, 12]
+QUERIES = 200
+UPLOAD_ROUNDS = 5000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(42)
+    hashes = [rng.getrandbits(64) for _ in range(count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'index.db')}")
+        Base.metadata.create_all(bind=engine, tables=[ImageHashEntry.__table__])
+        db = sessionmaker(bind=engine)()
+
+        start = time.perf_counter()
+        bulk_load(
+            db,
+            ((format_hash(h), SOURCE_SCAN, f"img-{i}", "") for i, h in enumerate(hashes)),
+        )
+        load_time = time.perf_counter() - start
+        print(f"{count} hash yuklendi: {load_time:.1f}s ({count / load_time:,.0f} satir/s)")
+
+        start = time.perf_counter()
+        hash_index.search(db, 0, 0)
+        print(f"Bellek ici indeks kuruldu: {time.perf_counter() - start:.1f}s {hash_index.stats()}")
+
+        # Sorgular: bilinen bir hash'in birkaç bitini çevirerek yakın komşu üret
+        for max_distance in DISTANCES:
+            queries = []
+            for _ in range(QUERIES):
+                base = rng.choice(hashes)
+                for bit in rng.sample(range(64), rng.randint(0, max_distance)):
+                    base ^= 1 << bit
+                queries.append(base)
+
+            start = time.perf_counter()
+            for q in queries:
+                hash_index.search(db, q, max_distance)
+            search_time = (time.perf_counter() - start) / QUERIES
+
+            start = time.perf_counter()
+            results = [find_similar(db, format_hash(q), max_distance=max_distance, limit=1000) for q in queries]
+            elapsed = (time.perf_counter() - start) / QUERIES
+
+            # Doğruluk: ilk 5 sorgu için kaba tarama
+            exact = all(
+                len(found) == sum(1 for h in hashes if hamming(q, h) <= max_distance)
+                for q, found in list(zip(queries, results))[:5]
+            )
+            print(f"max_distance={max_distance:>2}: indeks {search_time * 1000:.3f} ms, "
+                  f"ayrintilarla {elapsed * 1000:.3f} ms/sorgu, "
+                  f"ort. {sum(map(len, results)) / QUERIES:.1f} sonuc, kaba tarama ile ayni: {exact}")
+
+        # Yükleme başına bir ekleme + arama: bekleyen satırlar tek dizide taranır
+        timings = []
+        for i in range(UPLOAD_ROUNDS):
+            add_hash(db, format_hash(rng.getrandbits(64)), SOURCE_UPLOAD, f"upload-{i}")
+            start = time.perf_counter()
+            hash_index.search(db, rng.getrandbits(64), 8)
+            timings.append(time.perf_counter() - start)
+        window = UPLOAD_ROUNDS // 10
+        print(f"{UPLOAD_ROUNDS} ekleme+arama turu: ilk {window} tur {sum(timings[:window]) / window * 1000:.3f} ms, "
+              f"son {window} tur {sum(timings[-window:]) / window * 1000:.3f} ms/sorgu {hash_index.stats()}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+pHash benchmark: tam çözünürlük decode vs. draft (DCT ölçekli) hızlı yol.
+
+Kullanım:
+    python -m benchmarks.bench_phash                # sentetik karışık boyutlu korpus
+    python -m benchmarks.bench_phash /foto/klasoru  # gerçek JPEG'ler
+
+Her görsel için süre, decode sırasındaki tepe bellek ve iki yolun hash'leri
+arasındaki Hamming mesafesi raporlanır. Tepe bellek, her ölçüm ayrı bir süreçte
+yapılarak RSS artışı (VmHWM - decode öncesi VmRSS, Linux) olarak ölçülür; böylece
+ara tamponlar (RGB/YCbCr decode, draft çıktısı, gri dönüşüm) da sayılır.
+
+İki yolun hash'leri birkaç bit farklı olabilir; bu yüzden saklanan hash'ler
+HASH_VERSION ile tutulur (app/services/image_analyze.py).
+"""
+import io
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Tuple
+
+import imagehash
+import numpy as np
+from PIL import Image
+
+from app.services.image_analyze import decode_for_hash
+
+
+SIZES = [(640, 480), (1280, 960), (2048, 1536), (4000, 3000), (6000, 4000)]
+
+
+def synthetic_corpus(per_size: int = 4) -> List[Tuple[str, bytes]]:
+    rng = np.random.default_rng(42)
+    corpus = []
+    for w, h in SIZES:
+        for i in range(per_size):
+            layers = np.zeros((h, w, 3), np.float32)
+            for scale in (4, 16, 64):
+                small = (rng.random((max(2, h // scale), max(2, w // scale), 3)) * 255).astype(np.uint8)
+                layers += np.asarray(Image.fromarray(small).resize((w, h), Image.BICUBIC), np.float32)
+            img = Image.fromarray((layers / 3).clip(0, 255).astype(np.uint8))
+            buf = io.BytesIO()
+            img.save(buf, "JPEG", quality=90)
+            corpus.append((f"synthetic_{w}x{h}_{i}.jpg", buf.getvalue()))
+    return corpus
+
+
+def directory_corpus(path: str) -> List[Tuple[str, bytes]]:
+    corpus = []
+    for name in sorted(os.listdir(path)):
+        if name.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
+            with open(os.path.join(path, name), "rb") as f:
+                corpus.append((name, f.read()))
+    return corpus
+
+
+def full_decode_hash(data: bytes):
+    with Image.open(io.BytesIO(data)) as img:
+        return imagehash.phash(img.convert("RGB"))
+
+
+def fast_decode_hash(data: bytes):
+    with Image.open(io.BytesIO(data)) as img:
+        return imagehash.phash(decode_for_hash(img))
+
+
+def _status_bytes(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _measure(fn: Callable, data: bytes):
+    """Yeni süreçte çalışır: (hash, süre, tepe RSS artışı bayt)"""
+    # Tembel import'lar (scipy vb.) ölçüme girmesin
+    warm = io.BytesIO()
+    Image.new("RGB", (64, 64)).save(warm, "JPEG")
+    fn(warm.getvalue())
+    before = _status_bytes("VmRSS")
+    start = time.perf_counter()
+    result = fn(data)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss exec'ten sonra da üst sürecin değerini taşır; VmHWM bu sürece ait
+    peak = _status_bytes("VmHWM")
+    return str(result), elapsed, max(0, peak - before)
+
+
+def measure(pool: ProcessPoolExecutor, fn: Callable, data: bytes):
+    phash, elapsed, peak = pool.submit(_measure, fn, data).result()
+    return imagehash.hex_to_hash(phash), elapsed, peak
+
+
+def main() -> None:
+    corpus = directory_corpus(sys.argv[1]) if len(sys.argv) > 1 else synthetic_corpus()
+    totals = {"full": 0.0, "fast": 0.0, "full_mem": 0, "fast_mem": 0}
+    identical = 0
+    max_distance = 0
+
+    # Her ölçüm temiz (spawn) bir süreçte: önceki decode'ların ve korpusun tepe RSS'i karışmaz
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"), max_tasks_per_child=1)
+    print(f"{'dosya':<32} {'full ms':>9} {'fast ms':>9} {'full MB':>8} {'fast MB':>8} {'dist':>5}")
+    for name, data in corpus:
+        full_hash, full_time, full_mem = measure(pool, full_decode_hash, data)
+        fast_hash, fast_time, fast_mem = measure(pool, fast_decode_hash, data)
+
+        distance = full_hash - fast_hash
+        identical += distance == 0
+        max_distance = max(max_distance, distance)
+        totals["full"] += full_time
+        totals["fast"] += fast_time
+        totals["full_mem"] = max(totals["full_mem"], full_mem)
+        totals["fast_mem"] = max(totals["fast_mem"], fast_mem)
+        print(f"{name[:32]:<32} {full_time * 1000:>9.1f} {fast_time * 1000:>9.1f} "
+              f"{full_mem / 1e6:>8.1f} {fast_mem / 1e6:>8.2f} {distance:>5}")
+
+    pool.shutdown()
+    print("-" * 78)
+    print(f"Toplam: full {totals['full']:.2f}s, fast {totals['fast']:.2f}s "
+          f"(x{totals['full'] / max(totals['fast'], 1e-9):.1f} hizlanma)")
+    print(f"En buyuk tepe bellek artisi: full {totals['full_mem'] / 1e6:.1f} MB, fast {totals['fast_mem'] / 1e6:.2f} MB")
+    print(f"Ayni hash: {identical}/{len(corpus)}, en buyuk Hamming mesafesi: {max_distance}")
+
+
+if __name__ == "__main__":
+    main()
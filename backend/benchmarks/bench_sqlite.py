@@ -0,0 +1,143 @@
+"""
+SQLite ayarları benchmark'ı: eşzamanlı audit yazımları + kullanıcı sorguları.
+
+Kullanım:
+    python -m benchmarks.bench_sqlite                 # 8 yazıcı, 8 okuyucu, 5 sn
+    python -m benchmarks.bench_sqlite 16 32 10        # yazıcı, okuyucu, süre
+
+Aynı iş yükü iki yapılandırmayla geçici SQLite dosyalarında çalıştırılır:
+  - varsayılan: rollback journal, synchronous=FULL, SQLAlchemy varsayılan havuzu
+  - ayarlı:     core/database PRAGMA'ları (WAL, NORMAL, cache, mmap, busy_timeout),
+                boyutlandırılmış havuz ve okumalar için ayrı query_only havuzu
+Yazıcılar middleware gibi satır başına commit eder; okuyucular e-posta hash'i
+ile kullanıcı arar ve son audit kayıtlarını okur. Saniyedeki işlem sayısı,
+"database is locked" hataları ve gecikme yüzdelikleri raporlanır.
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, create_db_engine
+from app.models.audit import AuditLog
+from app.models.user import User
+
+
+USERS = 5000
+
+
+def _seed(session_factory) -> None:
+    db = session_factory()
+    db.add_all(
+        User(full_name=f"Kullanici {i}", email_encrypted=f"hash-{i}", consent_accepted=True)
+        for i in range(USERS)
+    )
+    db.commit()
+    db.close()
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def run(label: str, writers: int, readers: int, seconds: float, tuned: bool) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        if tuned:
+            pool = {"pool_size": writers + readers, "max_overflow": 0}
+            write_engine = create_db_engine(url, **pool)
+            read_engine = create_db_engine(url, read_only=True, **pool)
+        else:
+            write_engine = read_engine = create_db_engine(url, tuned=False)
+        Base.metadata.create_all(bind=write_engine, tables=[User.__table__, AuditLog.__table__])
+        WriteSession = sessionmaker(bind=write_engine)
+        ReadSession = sessionmaker(bind=read_engine)
+        _seed(WriteSession)
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        stats = {"writes": 0, "reads": 0, "locked": 0, "errors": 0}
+        write_latency, read_latency = [], []
+
+        def writer(n):
+            rng = random.Random(n)
+            while not stop.is_set():
+                start = time.perf_counter()
+                db = WriteSession()
+                try:
+                    db.add(AuditLog(action="GET /bench", ip=f"10.0.0.{rng.randint(1, 254)}", detail="", status=200, duration_ms=3))
+                    db.commit()
+                    key = "writes"
+                except OperationalError as e:
+                    db.rollback()
+                    key = "locked" if "locked" in str(e) else "errors"
+                finally:
+                    db.close()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    stats[key] += 1
+                    if key == "writes":
+                        write_latency.append(elapsed)
+
+        def reader(n):
+            rng = random.Random(1000 + n)
+            since = datetime.utcnow() - timedelta(minutes=5)
+            while not stop.is_set():
+                start = time.perf_counter()
+                db = ReadSession()
+                try:
+                    db.execute(select(User).where(User.email_encrypted == f"hash-{rng.randrange(USERS)}")).first()
+                    db.execute(
+                        select(AuditLog).where(AuditLog.created_at >= since).order_by(AuditLog.id.desc()).limit(20)
+                    ).all()
+                    key = "reads"
+                except OperationalError as e:
+                    key = "locked" if "locked" in str(e) else "errors"
+                finally:
+                    db.close()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    stats[key] += 1
+                    if key == "reads":
+                        read_latency.append(elapsed)
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        write_engine.dispose()
+        read_engine.dispose()
+
+    print(
+        f"{label:<10} yazma {stats['writes'] / seconds:>8.0f}/s  okuma {stats['reads'] / seconds:>8.0f}/s  "
+        f"locked {stats['locked']:>5}  diger hata {stats['errors']:>3}  "
+        f"yazma p50/p99 {_percentile(write_latency, 0.5):.1f}/{_percentile(write_latency, 0.99):.1f} ms  "
+        f"okuma p50/p99 {_percentile(read_latency, 0.5):.1f}/{_percentile(read_latency, 0.99):.1f} ms"
+    )
+
+
+def main() -> None:
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    print(f"{writers} yazici, {readers} okuyucu, {seconds:.0f} sn")
+    run("varsayilan", writers, readers, seconds, tuned=False)
+    run("ayarli", writers, readers, seconds, tuned=True)
+
+
+if __name__ == "__main__":
+    main()